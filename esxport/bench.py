@@ -0,0 +1,216 @@
+"""Probe the throughput a cluster sustains for a query before scheduling its export."""
+
+from __future__ import annotations
+
+import contextlib
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from elasticsearch import ApiError
+from loguru import logger
+from typing_extensions import Self
+
+from . import codec
+from .constant import BENCH_DURATION, BENCH_KEEP_ALIVE, BENCH_MARGIN, BENCH_PAGE_SIZES, BENCH_SLICES
+from .elastic import ElasticsearchClient
+from .strings import bench_probe, bench_probe_failed, bench_recommendation, bench_report_header, bench_report_row
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from .click_opt.cli_options import CliOptions
+
+BENCH_FILTER_PATH = "_scroll_id,pit_id,took,hits.hits._source,hits.hits.sort"
+
+
+class ProbeResult(object):
+    """Documents, bytes and server time read by one probe configuration."""
+
+    def __init__(self: Self, page_size: int, slices: int) -> None:
+        self.page_size = page_size
+        self.slices = slices
+        self.documents = 0
+        self.nbytes = 0
+        self.seconds = 0.0
+        self.took: list[int] = []
+        self.error = ""
+
+    @property
+    def docs_per_second(self: Self) -> float:
+        """Documents read per second of the probe."""
+        return self.documents / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_doc(self: Self) -> float:
+        """Response bytes of a document."""
+        return self.nbytes / self.documents if self.documents else 0.0
+
+    @property
+    def took_ms(self: Self) -> float:
+        """Median ``took`` the server reported for a page."""
+        return statistics.median(self.took) if self.took else 0.0
+
+    @property
+    def flags(self: Self) -> str:
+        """Export options reading the way this probe did."""
+        flags = f"--scroll-size {self.page_size}"
+        return f"{flags} --pit --slices {self.slices}" if self.slices > 1 else flags
+
+    def add(self: Self, documents: int, nbytes: int, took: list[int]) -> None:
+        """Add what one slice read."""
+        self.documents += documents
+        self.nbytes += nbytes
+        self.took.extend(took)
+
+
+class Bench(object):
+    """Read the query of ``opts`` for ``duration`` seconds with each page size and slice count, as an export would.
+
+    One slice scrolls like a plain export, more slices page a point in time with ``search_after`` like ``--pit
+    --slices``. Both read the ``_source`` of the fields to export. Pages are read and decoded but nothing is written.
+    Every probe clears the scrolls or the point in time it opened.
+    """
+
+    def __init__(
+        self: Self,
+        opts: CliOptions,
+        es_client: ElasticsearchClient | None = None,
+        *,
+        page_sizes: tuple[int, ...] = BENCH_PAGE_SIZES,
+        slices: tuple[int, ...] = BENCH_SLICES,
+        duration: float = BENCH_DURATION,
+    ) -> None:
+        self.opts = opts
+        self.es_client = es_client or ElasticsearchClient(opts)
+        self.page_sizes = page_sizes
+        self.slices = slices
+        self.duration = duration
+
+    def _body(self: Self, page_size: int, slice_id: int, slices: int, pit_id: str | None) -> dict[str, Any]:
+        """Search body of one slice of a probe, a point in time search when ``pit_id`` is given."""
+        body: dict[str, Any] = {
+            "query": self.opts.query.get("query", {"match_all": {}}),
+            "size": page_size,
+            "sort": self.opts.sort or ["_doc"],
+        }
+        fields = [field for field in self.opts.fields if field != "_all"]
+        if fields:
+            body["_source"] = fields
+        if pit_id is not None:
+            body["pit"] = {"id": pit_id, "keep_alive": BENCH_KEEP_ALIVE}
+            body["sort"] = self.opts.sort or ["_shard_doc"]
+            if slices > 1:
+                body["slice"] = {"id": slice_id, "max": slices}
+        return body
+
+    def _scroll_pages(self: Self, body: dict[str, Any]) -> Generator[tuple[str, dict[str, Any]], None, None]:
+        """Yield the raw and decoded pages of a scroll until it is exhausted, then clear it."""
+        index = ",".join(self.opts.index_prefixes)
+        raw = self.es_client.search_raw(index=index, body=body, scroll=BENCH_KEEP_ALIVE, filter_path=BENCH_FILTER_PATH)
+        scroll_id = None
+        try:
+            while True:
+                response = codec.loads(raw)
+                scroll_id = response.get("_scroll_id", scroll_id)
+                yield raw, response
+                if not response.get("hits", {}).get("hits") or scroll_id is None:
+                    return
+                raw = self.es_client.scroll_raw(scroll=BENCH_KEEP_ALIVE, scroll_id=scroll_id)
+        finally:
+            if scroll_id is not None:
+                with contextlib.suppress(Exception):
+                    self.es_client.clear_scroll(scroll_id=[scroll_id])
+
+    def _pit_pages(self: Self, body: dict[str, Any]) -> Generator[tuple[str, dict[str, Any]], None, None]:
+        """Yield the raw and decoded pages of a point in time slice, paged with ``search_after``, until a short page."""
+        while True:
+            raw = self.es_client.search_raw(body=body, filter_path=BENCH_FILTER_PATH)
+            response = codec.loads(raw)
+            yield raw, response
+            hits = response.get("hits", {}).get("hits", [])
+            if len(hits) < body["size"]:
+                return
+            pit = {**body["pit"], "id": response.get("pit_id", body["pit"]["id"])}
+            body = {**body, "pit": pit, "search_after": hits[-1]["sort"]}
+
+    def _scan(self: Self, body: dict[str, Any], deadline: float) -> tuple[int, int, list[int]]:
+        """Read one slice until it is exhausted or ``deadline``, return its documents, bytes and ``took``."""
+        documents, nbytes, took = 0, 0, []
+        pages = self._pit_pages(body) if "pit" in body else self._scroll_pages(body)
+        with contextlib.closing(pages):
+            for raw, response in pages:
+                documents += len(response.get("hits", {}).get("hits", []))
+                nbytes += len(raw.encode("utf-8"))
+                took.append(response.get("took", 0))
+                if time.perf_counter() >= deadline:
+                    break
+        return documents, nbytes, took
+
+    def probe(self: Self, page_size: int, slices: int) -> ProbeResult:
+        """Read with one configuration for ``duration`` seconds."""
+        result = ProbeResult(page_size, slices)
+        start = time.perf_counter()
+        deadline = start + self.duration
+        pit_id = None
+        try:
+            if slices > 1:
+                index = ",".join(self.opts.index_prefixes)
+                pit_id = self.es_client.open_point_in_time(index=index, keep_alive=BENCH_KEEP_ALIVE)
+            bodies = [self._body(page_size, slice_id, slices, pit_id) for slice_id in range(slices)]
+            with ThreadPoolExecutor(max_workers=slices, thread_name_prefix="esxport-bench") as pool:
+                for read in pool.map(lambda body: self._scan(body, deadline), bodies):
+                    result.add(*read)
+        except ApiError as e:
+            result.error = str(e)
+            logger.warning(bench_probe_failed.format(size=page_size, slices=slices, exc=e))
+        finally:
+            if pit_id is not None:
+                with contextlib.suppress(Exception):
+                    self.es_client.close_point_in_time(pit_id)
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def run(self: Self) -> list[ProbeResult]:
+        """Probe every configuration, one at a time so probes do not compete for the cluster."""
+        results = []
+        for slices in self.slices:
+            for page_size in self.page_sizes:
+                result = self.probe(page_size, slices)
+                logger.info(bench_probe.format(size=page_size, slices=slices, rate=result.docs_per_second))
+                results.append(result)
+        return results
+
+
+def recommend(results: list[ProbeResult], margin: float = BENCH_MARGIN) -> ProbeResult | None:
+    """The lightest configuration within ``margin`` of the best throughput, fewer slices and smaller pages first."""
+    succeeded = [result for result in results if not result.error and result.documents]
+    if not succeeded:
+        return None
+    best = max(result.docs_per_second for result in succeeded)
+    candidates = [result for result in succeeded if result.docs_per_second >= best * (1 - margin)]
+    return min(candidates, key=lambda result: (result.slices, result.page_size))
+
+
+def format_report(results: list[ProbeResult]) -> str:
+    """Summarise probe results as a table followed by the recommended setting."""
+    lines = [bench_report_header]
+    lines.extend(
+        bench_report_row.format(
+            size=result.page_size,
+            slices=result.slices,
+            docs=result.documents,
+            rate=result.docs_per_second,
+            bytes_per_doc=result.bytes_per_doc,
+            took=result.took_ms,
+            status="failed" if result.error else "ok",
+        )
+        for result in results
+    )
+    best = recommend(results)
+    if best is not None:
+        lines.append(
+            bench_recommendation.format(flags=best.flags, rate=best.docs_per_second),
+        )
+    return "\n".join(lines)
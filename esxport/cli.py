@@ -11,8 +11,30 @@ from click_params import UrlParamType
 from esxport import CliOptions, EsXport
 
 from .__init__ import __version__
-from .click_opt.click_custom import JSON, sort
-from .constant import META_FIELDS, default_config_fields
+from .bench import Bench
+from .bench import format_report as format_bench_report
+from .click_opt.click_custom import BYTE_SIZE, JSON, DefaultCommandGroup, sort
+from .constant import (
+    BENCH_DURATION,
+    BENCH_PAGE_SIZES,
+    BENCH_SLICES,
+    FAKE_DOCUMENT_SIZE,
+    FAKE_DOCUMENTS,
+    FAKE_ES_PORT,
+    FAKE_INDEX,
+    JOB_CONCURRENCY,
+    MAPPING_TTL,
+    MAX_FINISHED_TASKS,
+    META_FIELDS,
+    SERVE_HOST,
+    SERVE_PORT,
+    TASK_TTL,
+    default_config_fields,
+)
+from .fake_es import FakeCluster, FakeElasticsearch
+from .jobs import JobRunner, format_report
+from .profiling import PROFILE_MODES
+from .server import ExportServer, ExportService
 from .strings import cli_version
 
 
@@ -24,7 +46,15 @@ def print_version(ctx: Context, _: Parameter, value: bool) -> None:  # noqa: FBT
     ctx.exit()
 
 
-@click.command(context_settings={"show_default": True})
+@click.group(cls=DefaultCommandGroup, default_command="export")
+def cli() -> None:
+    """Elastic Search to CSV Exporter.
+
+    Runs export unless another command is named first, see esxport export --help for its options.
+    """
+
+
+@cli.command(context_settings={"show_default": True})
 @click.option(
     "-q",
     "--query",
@@ -124,6 +154,133 @@ def print_version(ctx: Context, _: Parameter, value: bool) -> None:  # noqa: FBT
     type=click.Path(exists=True),
     help="Location of Client Cert Key.",
 )
+@click.option(
+    "--incremental-field",
+    default=default_config_fields["incremental_field"],
+    help="Only export documents past the value of this field recorded in --state-file.",
+)
+@click.option(
+    "--state-file",
+    type=click.Path(dir_okay=False),
+    default=default_config_fields["state_file"],
+    help="File storing the high-watermark of --incremental-field between runs.",
+)
+@click.option(
+    "--follow",
+    is_flag=True,
+    default=default_config_fields["follow"],
+    help="Keep appending documents past --incremental-field after the export.",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0),
+    default=default_config_fields["poll_interval"],
+    help="Seconds to wait between --follow polls once caught up.",
+)
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(["csv", "ndjson"]),
+    default=default_config_fields["export_format"],
+    help="Output format. NDJSON copies the documents as returned by Elasticsearch.",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=default_config_fields["stream"],
+    help="Parse each page while it is downloaded instead of holding the whole response, for large scroll sizes.",
+)
+@click.option(
+    "--max-memory",
+    type=BYTE_SIZE,
+    default=default_config_fields["max_memory"],
+    help="Bound pages, flush buffer and writer chunks to about this many bytes, e.g. 512M. 0 for no bound.",
+)
+@click.option(
+    "--stats-json",
+    type=click.Path(dir_okay=False),
+    default=default_config_fields["stats_json"],
+    help="Write the time spent in each phase, throughput and request latencies to this JSON file.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    default=default_config_fields["metrics_file"],
+    help="Keep this file updated with Prometheus metrics of the export, for the node_exporter textfile collector.",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default=default_config_fields["trace"],
+    help="Write OpenTelemetry spans of the export to this file as JSON lines, - for stdout. Needs esxport[otel].",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(PROFILE_MODES),
+    default=None,
+    help="Profile the export and write the reports next to the output file, to attach to bug reports.",
+)
+@click.option(
+    "--estimate",
+    is_flag=True,
+    default=default_config_fields["estimate"],
+    help="Only predict the documents, output size, disk space and duration of the export, failing if space is short.",
+)
+@click.option(
+    "--pit",
+    is_flag=True,
+    default=default_config_fields["pit"],
+    help="Read every index at one point in time, consistent across indexes and slices, paged with search_after.",
+)
+@click.option(
+    "--slices",
+    type=click.IntRange(min=1),
+    default=default_config_fields["slices"],
+    help="Read the --pit in this many slices at once.",
+)
+@click.option(
+    "--processes",
+    type=click.IntRange(min=0),
+    default=default_config_fields["processes"],
+    help="Worker processes decoding and serializing the output. 0 or 1 keeps it in this process.",
+)
+@click.option(
+    "--async-search",
+    is_flag=True,
+    default=default_config_fields["async_search"],
+    help="Read a point in time with one async search per page, each submitted once and polled.",
+)
+@click.option(
+    "--ids-file",
+    type=click.Path(dir_okay=False),
+    default=default_config_fields["ids_file"],
+    help="Export the documents whose _id is listed in this file, one per line, with batched mget.",
+)
+@click.option(
+    "--lookup",
+    type=JSON,
+    multiple=True,
+    default=default_config_fields["lookup"],
+    help='Join every hit with a document of another index, e.g. {"index": "customers", "key": "customer_id"}.',
+)
+@click.option(
+    "--transform",
+    type=JSON,
+    multiple=True,
+    default=default_config_fields["transform"],
+    help='Transform each batch of records, e.g. {"name": "rename", "fields": {"old": "new"}}. Runs in order.',
+)
+@click.option(
+    "--aggregate",
+    type=JSON,
+    default=default_config_fields["aggregate"],
+    help='Export one row per bucket of a composite aggregation, e.g. {"sources": [...], "aggs": {...}}.',
+)
+@click.option(
+    "--esql",
+    default=default_config_fields["esql"],
+    help="Export the result of an ES|QL query instead. --query is applied as a filter, FROM defaults to the indexes.",
+)
 @click.option(
     "-v",
     "--version",
@@ -138,12 +295,176 @@ def print_version(ctx: Context, _: Parameter, value: bool) -> None:  # noqa: FBT
     default=default_config_fields["debug"],
     help="Debug mode on.",
 )
-def cli(**kwargs: Any) -> None:
-    """Elastic Search to CSV Exporter."""
+def export(**kwargs: Any) -> None:
+    """Elastic Search to CSV Exporter.
+
+    Run `esxport run-jobs --help` to run many exports in one process.
+    """
     cli_options = CliOptions(kwargs)
     es = EsXport(cli_options)
     es.export()
 
 
+@cli.command("run-jobs", context_settings={"show_default": True})
+@click.argument("jobs_file", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-c",
+    "--concurrency",
+    type=click.IntRange(min=1),
+    help="Exports running at the same time. Overrides the job file.",
+)
+@click.option(
+    "-r",
+    "--retries",
+    type=click.IntRange(min=0),
+    help="Extra attempts of a failed export. Overrides the job file.",
+)
+@click.pass_context
+def run_jobs(ctx: Context, jobs_file: str, concurrency: int | None, retries: int | None) -> None:
+    """Run the exports defined in JOBS_FILE in one process."""
+    results = JobRunner.from_file(jobs_file, concurrency=concurrency, retries=retries).run()
+    click.echo(format_report(results))
+    if any(result.status == "failed" for result in results):
+        ctx.exit(1)
+
+
+@cli.command(context_settings={"show_default": True})
+@click.option("--host", default=SERVE_HOST, help="Address to listen on.")
+@click.option("--port", type=click.IntRange(min=0, max=65535), default=SERVE_PORT, help="Port to listen on.")
+@click.option("-w", "--workers", type=click.IntRange(min=1), default=JOB_CONCURRENCY, help="Exports running at once.")
+@click.option(
+    "--mapping-ttl",
+    type=click.FloatRange(min=0),
+    default=MAPPING_TTL,
+    help="Seconds index mappings stay cached between exports.",
+)
+@click.option(
+    "--task-ttl",
+    type=click.FloatRange(min=0),
+    default=TASK_TTL,
+    help="Seconds finished exports stay listed.",
+)
+@click.option(
+    "--max-tasks",
+    type=click.IntRange(min=0),
+    default=MAX_FINISHED_TASKS,
+    help="Finished exports kept listed, the oldest are dropped first.",
+)
+def serve(  # noqa: PLR0913, PLR0917
+    host: str,
+    port: int,
+    workers: int,
+    mapping_ttl: float,
+    task_ttl: float,
+    max_tasks: int,
+) -> None:
+    """Serve a local HTTP API to submit, poll and cancel exports."""
+    service = ExportService(workers=workers, mapping_ttl=mapping_ttl, task_ttl=task_ttl, max_finished=max_tasks)
+    ExportServer((host, port), service).serve()
+
+
+@cli.command(context_settings={"show_default": True})
+@click.option(
+    "-q",
+    "--query",
+    type=JSON,
+    default='{"query": {"match_all": {}}}',
+    help="Query string in Query DSL syntax.",
+)
+@click.option("-i", "--index-prefixes", required=True, multiple=True, help="Index name prefix(es).")
+@click.option(
+    "-u",
+    "--url",
+    type=UrlParamType(may_have_port=True, simple_host=True),
+    default=default_config_fields["url"],
+    help="Elasticsearch host URL.",
+)
+@click.option("-U", "--user", default=default_config_fields["user"], help="Elasticsearch basic authentication user.")
+@click.password_option(
+    "-p",
+    "--password",
+    required=True,
+    confirmation_prompt=False,
+    help="Elasticsearch basic authentication password.",
+)
+@click.option(
+    "-f",
+    "--fields",
+    default=default_config_fields["fields"],
+    multiple=True,
+    help="List of _source fields to read.",
+)
+@click.option("-S", "--sort", type=sort, multiple=True, help="List of fields to sort on in form <field>:<direction>")
+@click.option("--verify-certs", is_flag=True, help="Verify SSL certificates.")
+@click.option("--ca-certs", type=click.Path(exists=True), help="Location of CA bundle.")
+@click.option("--client-cert", type=click.Path(exists=True), help="Location of Client Auth cert.")
+@click.option("--client-key", type=click.Path(exists=True), help="Location of Client Cert Key.")
+@click.option(
+    "--page-size",
+    "page_sizes",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=BENCH_PAGE_SIZES,
+    help="Page sizes to probe.",
+)
+@click.option(
+    "--slices",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=BENCH_SLICES,
+    help="Slice counts to probe, 1 scrolls like a plain export and more page a point in time like --pit --slices.",
+)
+@click.option(
+    "--duration",
+    type=click.FloatRange(min=0, min_open=True),
+    default=BENCH_DURATION,
+    help="Seconds each configuration is probed for.",
+)
+def bench(
+    page_sizes: tuple[int, ...],
+    slices: tuple[int, ...],
+    duration: float,
+    **kwargs: Any,
+) -> None:
+    """Probe the throughput of the query with several page sizes and slice counts, writing nothing."""
+    probes = Bench(
+        CliOptions({**kwargs, "output_file": ""}),
+        page_sizes=page_sizes,
+        slices=slices,
+        duration=duration,
+    )
+    click.echo(format_bench_report(probes.run()))
+
+
+@cli.command(name="fake-es", context_settings={"show_default": True})
+@click.option("--host", default=SERVE_HOST, help="Address to listen on.")
+@click.option("--port", type=click.IntRange(min=0, max=65535), default=FAKE_ES_PORT, help="Port to listen on.")
+@click.option("--index", default=FAKE_INDEX, help="Name of the served index.")
+@click.option("-n", "--documents", type=click.IntRange(min=0), default=FAKE_DOCUMENTS, help="Documents in the index.")
+@click.option(
+    "--document-size",
+    type=click.IntRange(min=0),
+    default=FAKE_DOCUMENT_SIZE,
+    help="Approximate JSON bytes of a document source.",
+)
+@click.option(
+    "--latency",
+    type=click.FloatRange(min=0),
+    default=0.0,
+    help="Seconds added to every search and scroll response.",
+)
+def fake_es(  # noqa: PLR0913, PLR0917
+    host: str,
+    port: int,
+    index: str,
+    documents: int,
+    document_size: int,
+    latency: float,
+) -> None:
+    """Serve deterministic documents over the subset of the Elasticsearch API esxport uses."""
+    cluster = FakeCluster(documents=documents, document_size=document_size, latency=latency, index=index)
+    FakeElasticsearch((host, port), cluster).serve()
+
+
 if __name__ == "__main__":
     cli()
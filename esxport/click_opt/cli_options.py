@@ -9,6 +9,7 @@ from typing import Any
 from typing_extensions import Self
 
 from esxport.constant import default_config_fields
+from esxport.memory import parse_size
 
 
 class CliOptions(object):
@@ -32,7 +33,27 @@ class CliOptions(object):
     client_cert: str
     client_key: str
     debug: bool
+    incremental_field: str
+    state_file: str
+    follow: bool
+    poll_interval: float
+    aggregate: dict[str, Any] | None
+    esql: str
+    async_search: bool
+    ids_file: str
+    lookup: list[dict[str, Any]]
+    transform: list[dict[str, Any]]
+    processes: int
     export_format: str
+    stream: bool
+    max_memory: int
+    stats_json: str
+    metrics_file: str
+    trace: str
+    profile: str
+    estimate: bool
+    pit: bool
+    slices: int
 
     def __init__(self: Self, myclass_kwargs: dict[str, Any]) -> None:
         # All keys that you want to set as attributes
@@ -54,6 +75,27 @@ class CliOptions(object):
             "client_cert",
             "client_key",
             "debug",
+            "incremental_field",
+            "state_file",
+            "follow",
+            "poll_interval",
+            "aggregate",
+            "esql",
+            "async_search",
+            "ids_file",
+            "lookup",
+            "transform",
+            "processes",
+            "export_format",
+            "stream",
+            "max_memory",
+            "stats_json",
+            "metrics_file",
+            "trace",
+            "profile",
+            "estimate",
+            "pit",
+            "slices",
         }
 
         for attr in attrs_to_set:
@@ -65,9 +107,24 @@ class CliOptions(object):
         self.meta_fields: list[str] = list(self.meta_fields)
         if isinstance(self.query, str):
             self.query = ast.literal_eval(self.query)
+        if isinstance(self.aggregate, str):
+            self.aggregate = json.loads(self.aggregate)
+        self.lookup = self._json_list(self.lookup)
+        self.transform = self._json_list(self.transform)
         self.max_results = self.query["size"] if self.query.get("size") else int(self.max_results)
         self.scroll_size = int(self.scroll_size)
-        self.export_format: str = "csv"
+        self.poll_interval = float(self.poll_interval)
+        self.processes = int(self.processes)
+        self.slices = int(self.slices)
+        self.max_memory = parse_size(self.max_memory)
+        self.profile = self.profile or ""
+
+    @staticmethod
+    def _json_list(value: Any) -> list[dict[str, Any]]:
+        """Normalise a repeatable JSON option to a list of dicts."""
+        if isinstance(value, (str, dict)):
+            value = [value]
+        return [json.loads(item) if isinstance(item, str) else item for item in value or []]
 
     def __str__(self: Self) -> str:
         """Print the class."""
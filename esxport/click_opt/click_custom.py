@@ -5,9 +5,10 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from click import Context, Parameter, ParamType
+from click import Context, Group, Parameter, ParamType
 from typing_extensions import Self
 
+from esxport.memory import parse_size
 from esxport.strings import invalid_query_format, invalid_sort_format
 
 
@@ -57,3 +58,36 @@ class Json(ParamType[dict[str, Any]]):
 
 
 JSON = Json()
+
+
+class ByteSize(ParamType[int]):
+    """Size in bytes, with an optional K, M, G or T suffix."""
+
+    name = "size"
+
+    def convert(self: Self, value: Any, param: Parameter | None, ctx: Context | None) -> int:
+        """Convert input to bytes."""
+        try:
+            return parse_size(value)
+        except ValueError as exc:
+            self.fail(str(exc), param, ctx)
+
+
+BYTE_SIZE = ByteSize()
+
+
+class DefaultCommandGroup(Group):
+    """Group running ``default_command`` unless a sub command, or only the help option, is given first."""
+
+    def __init__(self: Self, *args: Any, default_command: str, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self: Self, ctx: Context, args: list[str]) -> list[str]:
+        """Route the arguments to the default command when no sub command is given.
+
+        A leading help option stays with the group, so its help lists every sub command.
+        """
+        if not args or (args[0] not in self.commands and args[0] not in ctx.help_option_names):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
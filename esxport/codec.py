@@ -0,0 +1,68 @@
+"""JSON encoding and decoding used on the hot paths of an export.
+
+orjson is used when it is installed (``pip install esxport[fast]``), the standard library otherwise. Both produce the
+same compact, UTF-8 output so files do not depend on which codec wrote them. CSV cells holding objects or lists are
+not written with this codec, they keep the output of ``json.dumps``.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, time
+from typing import TYPE_CHECKING, Any
+
+try:
+    import orjson
+    from elasticsearch.serializer import OrjsonSerializer
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from elastic_transport import Serializer
+
+
+def _default(value: Any) -> str:
+    """Encode values JSON has no type for, dates as ISO 8601 like orjson does."""
+    return value.isoformat() if isinstance(value, (date, time)) else str(value)
+
+
+def json_dumps(value: Any) -> str:
+    """Encode with the standard library."""
+    return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Decode with the standard library."""
+    return json.loads(data)
+
+
+def orjson_dumps(value: Any) -> str:
+    """Encode with orjson."""
+    try:
+        return orjson.dumps(value, default=str).decode("utf-8")
+    except TypeError:
+        # Integers beyond 64 bits are not supported by orjson.
+        return json_dumps(value)
+
+
+def orjson_loads(data: str | bytes) -> Any:
+    """Decode with orjson."""
+    return orjson.loads(data)
+
+
+if orjson is not None:
+    NAME = "orjson"
+    dumps = orjson_dumps
+    loads = orjson_loads
+else:  # pragma: no cover - exercised when orjson is not installed
+    NAME = "json"
+    dumps = json_dumps
+    loads = json_loads
+
+
+def client_serializers() -> dict[str, Serializer]:
+    """Serializers decoding Elasticsearch responses with the fast codec, none when it is not installed."""
+    if orjson is None:  # pragma: no cover - exercised when orjson is not installed
+        return {}
+    serializer = OrjsonSerializer()
+    return {"application/json": serializer, "application/vnd.elasticsearch+json": serializer}
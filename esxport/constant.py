@@ -4,7 +4,41 @@ FLUSH_BUFFER = 1000  # Chunk of docs to flush in temp file
 CONNECTION_TIMEOUT = 120
 TIMES_TO_TRY = 3
 RETRY_DELAY = 60
+JOB_CONCURRENCY = 4  # Exports running at the same time in run-jobs
+JOB_RETRIES = 0  # Extra attempts of a failed run-jobs export
+MAPPING_TTL = 300  # Seconds index mappings stay cached in serve mode
+TASK_TTL = 3600  # Seconds finished exports stay listed in serve mode
+MAX_FINISHED_TASKS = 1000  # Finished exports kept in serve mode, the oldest are dropped first
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8765
 META_FIELDS = ["_id", "_index", "_score"]
+AGGREGATION_NAME = "esxport"  # Name of the composite aggregation paged by --aggregate
+ASYNC_WAIT = "30s"  # Longest wait of a single request polling an async query
+ASYNC_KEEP_ALIVE = "5m"  # How long an async search result is kept without being polled
+ASYNC_TIMEOUT = 6 * 3600  # Seconds an async query is polled before it is deleted and the export fails
+MGET_CONCURRENCY = 4  # Id batches fetched at the same time by --ids-file
+LOOKUP_CACHE_SIZE = 10000  # Lookup documents kept in memory by each --lookup
+TRANSFORM_ENTRY_POINT = "esxport.transforms"  # Entry point group of --transform plugins
+PROCESS_CHUNK_SIZE = 4 * 1024 * 1024  # Bytes of temp file lines handed to a --processes worker at once
+STREAM_CHUNK_SIZE = 256 * 1024  # Bytes of a --stream response read at a time
+MEMORY_OVERHEAD = 5  # Times the JSON size a decoded document takes in memory, used by --max-memory
+METRICS_INTERVAL = 15  # Seconds between rewrites of --metrics-file
+PROFILE_TOP = 30  # Functions or lines listed in the --profile reports
+PROFILE_FRAMES = 10  # Frames of traceback kept by --profile memory for each allocation
+MEMORY_SAMPLE_SIZE = 20  # Documents fetched to size the pages of a --max-memory export
+SCROLL_KEEP_ALIVE = "1m"  # Keep-alive of export scrolls, refreshed by every scroll request
+PIT_KEEP_ALIVE = "1m"  # Keep-alive of the --pit point in time, refreshed by every page
+ESTIMATE_SAMPLE_SIZE = 100  # Documents fetched by --estimate to size the output
+MAX_RESULT_WINDOW = 10000  # Default index.max_result_window, the most hits a single search returns
+FAKE_ES_PORT = 9299  # Port of fake-es, away from a real cluster on 9200
+FAKE_INDEX = "esxport-fake"  # Index served by fake-es
+FAKE_DOCUMENTS = 1_000_000  # Documents in the index served by fake-es
+FAKE_DOCUMENT_SIZE = 512  # Approximate JSON bytes of a fake-es document source
+BENCH_PAGE_SIZES = (500, 1000, 5000)  # Page sizes probed by bench
+BENCH_SLICES = (1, 2, 4)  # Slice counts probed by bench, more than one reads a point in time
+BENCH_DURATION = 5.0  # Seconds each bench probe reads for
+BENCH_KEEP_ALIVE = "1m"  # Scroll keep-alive of bench probes, which clear their scrolls when done
+BENCH_MARGIN = 0.1  # Share of the best throughput a lighter bench configuration may lose and still be recommended
 default_config_fields = {
     "url": "https://localhost:9200",
     "user": "elastic",
@@ -20,4 +54,25 @@ default_config_fields = {
     "client_cert": "",
     "client_key": "",
     "debug": False,
+    "incremental_field": "",
+    "state_file": "",
+    "follow": False,
+    "poll_interval": 10.0,
+    "aggregate": None,
+    "esql": "",
+    "async_search": False,
+    "ids_file": "",
+    "lookup": [],
+    "transform": [],
+    "processes": 0,
+    "export_format": "csv",
+    "stream": False,
+    "max_memory": 0,
+    "stats_json": "",
+    "metrics_file": "",
+    "trace": "",
+    "profile": "",
+    "estimate": False,
+    "pit": False,
+    "slices": 1,
 }
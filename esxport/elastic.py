@@ -2,26 +2,112 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
-from urllib.parse import urlparse
+import contextlib
+import threading
+import time
+from typing import TYPE_CHECKING, Any, cast
+from urllib.parse import quote, urlparse
 
 import elasticsearch
+import urllib3
+from elastic_transport import ApiResponseMeta, HttpHeaders, Urllib3HttpNode
+from elastic_transport._node import NodeApiResponse
+from elastic_transport.client_utils import DEFAULT, DefaultType
 from elasticsearch import Elasticsearch
+from elasticsearch.serializer import CompatibilityModeJsonSerializer, JsonSerializer
 from typing_extensions import Self
 
-from .constant import CONNECTION_TIMEOUT
+from . import codec
+from .constant import CONNECTION_TIMEOUT, STREAM_CHUNK_SIZE
 from .exceptions import ScrollExpiredError
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from .click_opt.cli_options import CliOptions
 
 
+class RawJsonSerializer(JsonSerializer):
+    """Encode request bodies as JSON but hand back response bodies as undecoded text."""
+
+    def loads(self: Self, data: bytes) -> Any:
+        """Return the response body as text."""
+        return data.decode("utf-8")
+
+
+class RawCompatibilityJsonSerializer(CompatibilityModeJsonSerializer):
+    """``RawJsonSerializer`` for responses in compatibility mode."""
+
+    def loads(self: Self, data: bytes) -> Any:
+        """Return the response body as text."""
+        return data.decode("utf-8")
+
+
+class StreamJsonSerializer(JsonSerializer):
+    """Encode request bodies as JSON but hand back streamed response bodies unread."""
+
+    def loads(self: Self, data: bytes | urllib3.HTTPResponse) -> Any:
+        """Return a streamed body as is, decode an error body."""
+        return data if isinstance(data, urllib3.HTTPResponse) else super().loads(data)
+
+
+class StreamCompatibilityJsonSerializer(CompatibilityModeJsonSerializer):
+    """``StreamJsonSerializer`` for responses in compatibility mode."""
+
+    def loads(self: Self, data: bytes | urllib3.HTTPResponse) -> Any:
+        """Return a streamed body as is, decode an error body."""
+        return data if isinstance(data, urllib3.HTTPResponse) else super().loads(data)
+
+
+class StreamingHttpNode(Urllib3HttpNode):
+    """urllib3 node leaving the body of a successful response unread, so that it can be streamed.
+
+    Error responses are read whole, the client raises its usual exceptions for them.
+    """
+
+    def perform_request(
+        self: Self,
+        method: str,
+        target: str,
+        body: bytes | None = None,
+        headers: HttpHeaders | None = None,
+        request_timeout: DefaultType | float | None = DEFAULT,
+    ) -> NodeApiResponse:
+        """Send the request and return the response with its body still to be read when it succeeded."""
+        request_headers = self._headers.copy()
+        if headers:
+            request_headers.update(headers)
+        start = time.time()
+        try:
+            response = self.pool.urlopen(
+                method,
+                f"{self.path_prefix}{target}",
+                body=body,
+                retries=False,
+                headers=request_headers,
+                preload_content=False,
+                timeout=self.pool.timeout if request_timeout is DEFAULT else request_timeout,
+            )
+        except (urllib3.exceptions.ConnectTimeoutError, urllib3.exceptions.ReadTimeoutError) as e:
+            raise elasticsearch.ConnectionTimeout(str(e), errors=(e,)) from e
+        except urllib3.exceptions.HTTPError as e:
+            raise elasticsearch.ConnectionError(str(e), errors=(e,)) from e
+        meta = ApiResponseMeta(response.status, "1.1", HttpHeaders(response.headers), time.time() - start, self.config)
+        if 200 <= response.status < 300:  # noqa: PLR2004
+            # The stream serializers hand the response back to ``stream`` as it is.
+            return NodeApiResponse(meta, cast("bytes", response))
+        data = response.data
+        response.release_conn()
+        return NodeApiResponse(meta, data)
+
+
 class ElasticsearchClient:
     """Elasticsearch client."""
 
     def __init__(
         self: Self,
         cli_options: CliOptions,
+        mapping_ttl: float = 0,
     ) -> None:
         # Parse URL to determine scheme (more robust than string checking)
         parsed_url = urlparse(cli_options.url)
@@ -32,33 +118,40 @@ class ElasticsearchClient:
         timeout = CONNECTION_TIMEOUT
         auth = (cli_options.user, cli_options.password)
 
+        client_kwargs: dict[str, Any] = {"hosts": hosts, "request_timeout": timeout, "basic_auth": auth}
         # Conditionally pass TLS options for HTTPS connections only
         if is_https:
-            client = elasticsearch.Elasticsearch(
-                hosts=hosts,
-                request_timeout=timeout,
-                basic_auth=auth,
+            client_kwargs.update(
                 verify_certs=cli_options.verify_certs,
                 ca_certs=cli_options.ca_certs,
                 client_cert=cli_options.client_cert,
                 client_key=cli_options.client_key,
             )
-        else:
-            client = elasticsearch.Elasticsearch(
-                hosts=hosts,
-                request_timeout=timeout,
-                basic_auth=auth,
-            )
 
-        self.client: Elasticsearch = client
+        self.client: Elasticsearch = elasticsearch.Elasticsearch(
+            **client_kwargs,
+            serializers=codec.client_serializers(),
+        )
+        self._client_kwargs = client_kwargs
+        self._raw_client: Elasticsearch | None = None
+        self._stream_client: Elasticsearch | None = None
+        self.mapping_ttl = mapping_ttl
+        self._mappings: dict[str, tuple[float, dict[str, Any]]] = {}
 
     def indices_exists(self: Self, index: str | list[str] | tuple[str, ...]) -> bool:
         """Check if a given index exists."""
         return bool(self.client.indices.exists(index=index))
 
     def get_mapping(self: Self, index: str) -> dict[str, Any]:
-        """Get the mapping for a given index."""
-        return self.client.indices.get_mapping(index=index).raw
+        """Get the mapping for a given index, served from cache for ``mapping_ttl`` seconds."""
+        if self.mapping_ttl:
+            cached = self._mappings.get(index)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+        mapping: dict[str, Any] = self.client.indices.get_mapping(index=index).raw
+        if self.mapping_ttl:
+            self._mappings[index] = (time.monotonic() + self.mapping_ttl, mapping)
+        return mapping
 
     def search(self: Self, **kwargs: Any) -> Any:
         """Search in the index."""
@@ -72,8 +165,154 @@ class ElasticsearchClient:
             msg = f"Scroll {scroll_id} expired or {e}."
             raise ScrollExpiredError(msg) from e
 
-    def clear_scroll(self: Self, scroll_id: str) -> Any:
-        """Remove all scrolls."""
+    @property
+    def raw_client(self: Self) -> Elasticsearch:
+        """Client over the same cluster returning response bodies undecoded, created on first use."""
+        if self._raw_client is None:
+            serializers = {
+                RawJsonSerializer.mimetype: RawJsonSerializer(),
+                RawCompatibilityJsonSerializer.mimetype: RawCompatibilityJsonSerializer(),
+            }
+            self._raw_client = elasticsearch.Elasticsearch(**self._client_kwargs, serializers=serializers)
+        return self._raw_client
+
+    def search_raw(self: Self, **kwargs: Any) -> str:
+        """Search in the index and return the undecoded response body."""
+        return str(self.raw_client.search(**kwargs).body)
+
+    def scroll_raw(self: Self, scroll: str, scroll_id: str) -> str:
+        """Paginate the search results and return the undecoded response body."""
+        try:
+            return str(self.raw_client.scroll(scroll=scroll, scroll_id=scroll_id).body)
+        except (elasticsearch.NotFoundError, elasticsearch.AuthorizationException) as e:
+            msg = f"Scroll {scroll_id} expired or {e}."
+            raise ScrollExpiredError(msg) from e
+
+    @property
+    def stream_client(self: Self) -> Elasticsearch:
+        """Client over the same cluster handing back successful response bodies unread, created on first use."""
+        if self._stream_client is None:
+            serializers = {
+                StreamJsonSerializer.mimetype: StreamJsonSerializer(),
+                StreamCompatibilityJsonSerializer.mimetype: StreamCompatibilityJsonSerializer(),
+            }
+            self._stream_client = elasticsearch.Elasticsearch(
+                **self._client_kwargs,
+                node_class=StreamingHttpNode,
+                serializers=serializers,
+            )
+        return self._stream_client
+
+    def stream(
+        self: Self,
+        path: str,
+        params: dict[str, Any],
+        body: dict[str, Any],
+    ) -> Iterator[bytes]:
+        """POST ``body`` to ``path`` and yield the response body in chunks as it is received.
+
+        The request goes through the transport of ``stream_client`` like any client API call, error statuses raise the
+        same exceptions.
+        """
+        response: urllib3.HTTPResponse = self.stream_client.perform_request(
+            "POST",
+            path,
+            params=params,
+            headers={"content-type": "application/json", "accept": "application/json"},
+            body=body,
+        ).body
+        completed = False
+        try:
+            try:
+                yield from response.stream(STREAM_CHUNK_SIZE)
+            except urllib3.exceptions.HTTPError as e:
+                raise elasticsearch.ConnectionError(str(e), errors=(e,)) from e
+            completed = True
+        finally:
+            if not completed:
+                # A connection with unread body can not be reused.
+                response.close()
+            response.release_conn()
+
+    def stream_search(self: Self, index: str, body: dict[str, Any], **params: Any) -> Iterator[bytes]:
+        """Search in the index and yield the response body in chunks."""
+        return self.stream(f"/{quote(index, safe=',*')}/_search", params, body)
+
+    def stream_scroll(self: Self, scroll: str, scroll_id: str, **params: Any) -> Iterator[bytes]:
+        """Paginate the search results and yield the response body in chunks."""
+        try:
+            yield from self.stream("/_search/scroll", params, {"scroll": scroll, "scroll_id": scroll_id})
+        except (elasticsearch.NotFoundError, elasticsearch.AuthorizationException) as e:
+            msg = f"Scroll {scroll_id} expired or {e}."
+            raise ScrollExpiredError(msg) from e
+
+    def esql_submit(self: Self, query: str, query_filter: dict[str, Any] | None, wait: str) -> dict[str, Any]:
+        """Submit an ES|QL query asynchronously, its columnar result is returned if it completes within ``wait``."""
+        response: dict[str, Any] = self.client.esql.async_query(
+            query=query,
+            filter=query_filter,
+            columnar=True,
+            wait_for_completion_timeout=wait,
+        ).raw
+        return response
+
+    def esql_get(self: Self, query_id: str, wait: str) -> dict[str, Any]:
+        """Wait up to ``wait`` for an async ES|QL query and return its current state."""
+        response: dict[str, Any] = self.client.esql.async_query_get(id=query_id, wait_for_completion_timeout=wait).raw
+        return response
+
+    def esql_delete(self: Self, query_id: str) -> None:
+        """Stop an async ES|QL query and delete its stored result."""
+        with contextlib.suppress(elasticsearch.NotFoundError):
+            self.client.esql.async_query_delete(id=query_id)
+
+    def async_search_submit(self: Self, **kwargs: Any) -> dict[str, Any]:
+        """Submit an async search."""
+        response: dict[str, Any] = self.client.async_search.submit(**kwargs).raw
+        return response
+
+    def async_search_get(self: Self, search_id: str, wait: str) -> dict[str, Any]:
+        """Wait up to ``wait`` for an async search and return its current state."""
+        response: dict[str, Any] = self.client.async_search.get(id=search_id, wait_for_completion_timeout=wait).raw
+        return response
+
+    def async_search_delete(self: Self, search_id: str) -> None:
+        """Delete an async search and its stored result."""
+        with contextlib.suppress(elasticsearch.NotFoundError):
+            self.client.async_search.delete(id=search_id)
+
+    def mget(self: Self, index: str, ids: list[str], **kwargs: Any) -> list[dict[str, Any]]:
+        """Get documents by id, missing documents have ``found`` set to false."""
+        docs: list[dict[str, Any]] = self.client.mget(index=index, ids=ids, **kwargs)["docs"]
+        return docs
+
+    def open_point_in_time(self: Self, index: str, keep_alive: str) -> str:
+        """Open a point in time over ``index`` and return its id."""
+        return str(self.client.open_point_in_time(index=index, keep_alive=keep_alive)["id"])
+
+    def close_point_in_time(self: Self, pit_id: str) -> Any:
+        """Close a point in time."""
+        return self.client.close_point_in_time(id=pit_id)
+
+    def pit_search(self: Self, **kwargs: Any) -> Any:
+        """Search a point in time."""
+        try:
+            return self.client.search(**kwargs)
+        except elasticsearch.NotFoundError as e:
+            msg = f"Point in time expired or {e}."
+            raise ScrollExpiredError(msg) from e
+
+    def count(self: Self, index: str, query: dict[str, Any]) -> int:
+        """Exact number of documents matching ``query``, without the ``track_total_hits`` limit of a search."""
+        return int(self.client.count(index=index, query=query)["count"])
+
+    def store_stats(self: Self, index: str) -> tuple[int, int]:
+        """Documents and store bytes of the primary shards of ``index``."""
+        primaries = self.client.indices.stats(index=index, metric=["docs", "store"])["_all"]["primaries"]
+        return int(primaries["docs"]["count"]), int(primaries["store"]["size_in_bytes"])
+
+    def clear_scroll(self: Self, scroll_id: str | list[str]) -> Any:
+        """Remove the given scrolls."""
         return self.client.clear_scroll(scroll_id=scroll_id)
 
     def ping(self: Self) -> Any:
@@ -84,3 +323,28 @@ class ElasticsearchClient:
             dict: Cluster information if reachable, otherwise an error message.
         """
         return self.client.info()
+
+
+class ElasticsearchClientPool(object):
+    """Share clients, and so their connection pools, between exports with the same connection settings."""
+
+    def __init__(self: Self, mapping_ttl: float = 0) -> None:
+        self.mapping_ttl = mapping_ttl
+        self._clients: dict[tuple[Any, ...], ElasticsearchClient] = {}
+        self._lock = threading.Lock()
+
+    def get(self: Self, cli_options: CliOptions) -> ElasticsearchClient:
+        """Return the client for the connection settings of ``cli_options``."""
+        key = (
+            cli_options.url,
+            cli_options.user,
+            cli_options.password,
+            cli_options.verify_certs,
+            cli_options.ca_certs,
+            cli_options.client_cert,
+            cli_options.client_key,
+        )
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = ElasticsearchClient(cli_options, mapping_ttl=self.mapping_ttl)
+            return self._clients[key]
@@ -0,0 +1,127 @@
+"""Predict the size and duration of an export without running it."""
+
+from __future__ import annotations
+
+import csv
+import io
+import math
+import shutil
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from typing_extensions import Self
+
+from . import codec
+from .exceptions import InsufficientDiskSpaceError
+from .strings import estimate_disk, estimate_documents, estimate_duration, estimate_output, insufficient_disk_space
+from .writer import Writer
+
+
+class CostEstimate(object):
+    """Sizes and duration of an export, extrapolated from a sample page of its records.
+
+    The temp file holds one JSON line per record whatever the format. A CSV export needs the temp file and the output
+    at the same time, an NDJSON export renames the temp file to the output. The fetch time is modelled as a fixed cost
+    per page, the latency of the count request, plus the time the sample page took per document beyond it.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self: Self,
+        *,
+        documents: int,
+        matched: int,
+        index_documents: int,
+        store_bytes: int,
+        records: list[dict[str, Any]],
+        page_size: int,
+        request_seconds: float,
+        sample_seconds: float,
+        delimiter: str,
+    ) -> None:
+        self.documents = documents
+        self.matched = matched
+        self.index_documents = index_documents
+        self.store_bytes = store_bytes
+        self.page_size = page_size
+        self.request_seconds = request_seconds
+        self.sample = len(records)
+        self.sample_seconds = sample_seconds
+        start = time.perf_counter()
+        lines = [f"{codec.dumps(record)}\n".encode() for record in records]
+        headers = list(dict.fromkeys(key for record in records for key in record))
+        rows = Writer.csv_rows(map(codec.loads, lines), headers, delimiter)
+        self.process_seconds = time.perf_counter() - start
+        header = io.StringIO()
+        csv.writer(header, delimiter=delimiter).writerow(headers)
+        self.header_bytes = len(header.getvalue().encode())
+        self.json_bytes = sum(map(len, lines))
+        self.csv_bytes = len(rows.encode())
+
+    def _per_document(self: Self, sample_bytes: int) -> float:
+        """Bytes of a document given the bytes of the sample, the index store size without a sample."""
+        if self.sample:
+            return sample_bytes / self.sample
+        return self.store_bytes / self.index_documents if self.index_documents else 0.0
+
+    @property
+    def temp_bytes(self: Self) -> int:
+        """Bytes of the temp file."""
+        return math.ceil(self.documents * self._per_document(self.json_bytes))
+
+    def output_bytes(self: Self, export_format: str) -> int:
+        """Bytes of the output in ``export_format``."""
+        if export_format == "ndjson":
+            return self.temp_bytes
+        return self.header_bytes + math.ceil(self.documents * self._per_document(self.csv_bytes))
+
+    def disk_bytes(self: Self, export_format: str) -> int:
+        """Free bytes the export needs next to its output."""
+        return self.temp_bytes if export_format == "ndjson" else self.temp_bytes + self.output_bytes(export_format)
+
+    @property
+    def pages(self: Self) -> int:
+        """Search and scroll requests of the export."""
+        return math.ceil(self.documents / max(self.page_size, 1))
+
+    @property
+    def seconds(self: Self) -> float:
+        """Expected duration of the export."""
+        if not self.sample:
+            return 0.0
+        fetch = max(0.0, self.sample_seconds - self.request_seconds) / self.sample
+        return self.pages * self.request_seconds + self.documents * (fetch + self.process_seconds / self.sample)
+
+    def log(self: Self, export_format: str) -> None:
+        """Log the estimate for an export in ``export_format``."""
+        logger.info(
+            estimate_documents.format(
+                documents=self.documents,
+                matched=self.matched,
+                index_documents=self.index_documents,
+                store=self.store_bytes / 1024**2,
+                sample=self.sample,
+            ),
+        )
+        logger.info(
+            estimate_output.format(
+                csv=self.output_bytes("csv") / 1024**2,
+                ndjson=self.output_bytes("ndjson") / 1024**2,
+                temp=self.temp_bytes / 1024**2,
+            ),
+        )
+        logger.info(estimate_disk.format(export_format=export_format, disk=self.disk_bytes(export_format) / 1024**2))
+        logger.info(estimate_duration.format(seconds=self.seconds, pages=self.pages))
+
+    def check_free_space(self: Self, output_file: str, export_format: str) -> None:
+        """Raise if the directory of ``output_file``, which also holds the temp file, lacks the space needed."""
+        directory = Path(output_file).resolve().parent
+        while not directory.exists():
+            directory = directory.parent
+        free = shutil.disk_usage(directory).free
+        needed = self.disk_bytes(export_format)
+        if needed > free:
+            raise InsufficientDiskSpaceError(
+                insufficient_disk_space.format(directory=directory, needed=needed / 1024**2, free=free / 1024**2),
+            )
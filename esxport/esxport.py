@@ -3,7 +3,13 @@
 from __future__ import annotations
 
 import contextlib
+import contextvars
 import json
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -13,32 +19,90 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ex
 from tqdm import tqdm
 from typing_extensions import Self
 
+from . import codec
 from .click_opt.click_custom import Json
-from .constant import FLUSH_BUFFER, TIMES_TO_TRY
+from .constant import (
+    AGGREGATION_NAME,
+    ASYNC_KEEP_ALIVE,
+    ASYNC_TIMEOUT,
+    ASYNC_WAIT,
+    ESTIMATE_SAMPLE_SIZE,
+    FLUSH_BUFFER,
+    MEMORY_SAMPLE_SIZE,
+    MGET_CONCURRENCY,
+    PIT_KEEP_ALIVE,
+    SCROLL_KEEP_ALIVE,
+    TIMES_TO_TRY,
+)
 from .elastic import ElasticsearchClient
+from .estimate import CostEstimate
 from .exceptions import (
+    ConfigurationError,
+    ExportCancelledError,
     FieldNotFoundError,
     HealthCheckError,
     IndexNotFoundError,
     InvalidEsQueryError,
     MetaFieldNotFoundError,
     NoDataFoundError,
+    QueryTimeoutError,
     ScrollExpiredError,
+    StateFileError,
 )
+from .incremental import Watermark
+from .lookup import Lookup
+from .memory import MemoryBudget
+from .metrics import MetricsFile
+from .parallel import chunk_headers, ordered_map, read_line_chunks
+from .passthrough import RAW_FILTER_PATH, RawPage
+from .profiling import profile
+from .stats import ExportStats, count_retry, timed
+from .streaming import STREAM_FILTER_PATH, StreamingPage
 from .strings import (
+    aggregate_sources_missing,
+    async_query_timed_out,
+    estimate_not_supported,
+    exclusive_modes,
+    export_cancelled,
+    follow_requires_incremental_field,
+    follow_stopped,
+    following,
+    ids_file_not_found,
+    ids_missing,
+    ids_single_index,
+    incremental_not_sliced,
+    incremental_requires_state_file,
     index_not_found,
+    lookup_not_supported,
+    memory_page_size,
     meta_field_not_found,
+    mode_not_incremental,
     output_fields,
+    pit_not_supported,
     query_key_missing,
+    slices_require_pit,
     sorting_by,
+    stream_not_supported,
+    transform_not_supported,
+    using_esql,
     using_indexes,
+    using_pit,
     using_query,
+    using_watermark,
 )
-from .writer import Writer
+from .tracing import annotate, describe_response, export_spans, span
+from .transform import TransformPipeline
+from .writer import Writer, WriterParams
 
 if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+    from concurrent.futures import Future
+    from typing import TextIO
+
     from .click_opt.cli_options import CliOptions
 
+ESQL_SOURCE_COMMAND = re.compile(r"^\s*(FROM|ROW|SHOW|TS)\b", re.IGNORECASE)
+
 
 class EsXport(object):
     """Main class."""
@@ -47,9 +111,18 @@ class EsXport(object):
         self.search_args: dict[str, Any] = {}
         self.opts = opts
         self.num_results = 0
-        self.scroll_ids: list[str] = []
-        self.scroll_time = "30m"
+        self.scroll_ids: set[str] = set()
+        self.scroll_time = SCROLL_KEEP_ALIVE
+        self.pit_id: str | None = None
+        self.pit_args: dict[str, Any] = {}
         self.rows_written = 0
+        self.watermark: Watermark | None = None
+        self.headers: list[str] = []
+        self.lookups: list[Lookup] = []
+        self.transforms = TransformPipeline([])
+        self.memory = MemoryBudget(0)
+        self.stats = ExportStats()
+        self.cancelled = threading.Event()
 
         self.es_client = es_client or self._create_default_client(opts)
 
@@ -61,6 +134,7 @@ class EsXport(object):
         stop=stop_after_attempt(TIMES_TO_TRY),
         reraise=True,
         retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
     )
     def _check_indexes(self: Self) -> None:
         """Check if input indexes exist."""
@@ -84,6 +158,7 @@ class EsXport(object):
             msg = f"Unable to connect with cluster {e}."
             raise HealthCheckError(msg) from e
 
+    @timed("preflight")
     def _validate_fields(self: Self) -> None:
         all_fields_dict: dict[str, list[str]] = {}
         indices_names = list(self.opts.index_prefixes)
@@ -93,6 +168,8 @@ class EsXport(object):
             parts = sort_key.split(".")
             sort_param = parts[0] if len(parts) > 0 else sort_key
             all_expected_fields.append(sort_param)
+        if self.opts.incremental_field:
+            all_expected_fields.append(self.opts.incremental_field.split(".")[0])
         if "_all" in all_expected_fields:
             all_expected_fields.remove("_all")
 
@@ -109,6 +186,19 @@ class EsXport(object):
                 msg = f"Fields {element} doesn't exist in any index."
                 raise FieldNotFoundError(msg)
 
+    def _load_watermark(self: Self) -> Watermark:
+        """Load the incremental export state."""
+        if not self.opts.state_file:
+            if not self.opts.follow:
+                raise StateFileError(incremental_requires_state_file)
+            return Watermark(self.opts.incremental_field)
+        watermark = Watermark.load(self.opts.state_file, self.opts.incremental_field)
+        if watermark.value is not None:
+            logger.info(
+                using_watermark.format(field=watermark.field, value=watermark.value, count=len(watermark.ids)),
+            )
+        return watermark
+
     def _prepare_search_query(self: Self) -> None:
         """Prepares search query from input."""
         try:
@@ -122,9 +212,21 @@ class EsXport(object):
             if self.opts.sort:
                 self.search_args["sort"] = self.opts.sort
 
+            if self.opts.incremental_field:
+                # Shards stop collecting at terminate_after in index order, before sorting on the watermark field, so a
+                # capped run could advance the watermark past lower values it never collected. The cap is applied
+                # client-side on the sorted pages instead.
+                del self.search_args["terminate_after"]
+                self.watermark = self._load_watermark()
+                self.search_args["query"] = self.watermark.apply(self.search_args["query"])
+                self.search_args["sort"] = self.watermark.sort(self.opts.sort)
+
             if "_all" not in self.opts.fields:
                 self.search_args["_source_includes"] = ",".join(self.opts.fields)
 
+            if self.memory and not self.opts.stream:
+                self.search_args["size"] = self._bounded_page_size()
+
             if self.opts.debug:
                 logger.debug(using_indexes.format(indexes={", ".join(self.opts.index_prefixes)}))
                 query = json.dumps(self.opts.query, default=str)
@@ -134,18 +236,75 @@ class EsXport(object):
         except KeyError as e:
             raise InvalidEsQueryError(query_key_missing) from e
 
+    def _bounded_page_size(self: Self) -> int:
+        """Page size within ``--max-memory``, sized by a sample of the documents to export."""
+        if not self.memory.documents:
+            source = {key: value for key, value in self.search_args.items() if key == "_source_includes"}
+            with self.stats.request("sample"):
+                hits = self.es_client.search(
+                    index=self.search_args["index"],
+                    query=self.search_args["query"],
+                    size=MEMORY_SAMPLE_SIZE,
+                    **source,
+                )["hits"]["hits"]
+            self.memory.observe(len(hits), sum(len(codec.dumps(hit.get("_source", {}))) for hit in hits))
+        size = self.memory.page_size(self.opts.scroll_size)
+        if size < self.opts.scroll_size:
+            logger.info(
+                memory_page_size.format(size=self.opts.scroll_size, bounded=size, document=self.memory.document_size),
+            )
+        return size
+
     @retry(
         wait=wait_exponential(2),
         stop=stop_after_attempt(TIMES_TO_TRY),
         reraise=True,
         retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
     )
     def next_scroll(self: Self, scroll_id: str) -> Any:
         """Paginate to the next page."""
-        return self.es_client.scroll(scroll=self.scroll_time, scroll_id=scroll_id)
+        with self.stats.request("scroll", {"esxport.page_size": self.search_args.get("size")}) as current:
+            res = self.es_client.scroll(scroll=self.scroll_time, scroll_id=scroll_id)
+            describe_response(current, res)
+        return res
+
+    def _track_scroll(self: Self, opened: set[str], scroll_id: str | None) -> None:
+        """Remember ``scroll_id`` in the scrolls of its cursor and of the export."""
+        if scroll_id:
+            opened.add(scroll_id)
+            self.scroll_ids.add(scroll_id)
+
+    def _release_scrolls(self: Self, opened: set[str]) -> None:
+        """Clear the scrolls of a cursor as soon as it is exhausted or abandoned, not when the export ends."""
+        if not opened:
+            return
+        self.scroll_ids -= opened
+        with contextlib.suppress(Exception):
+            self.es_client.clear_scroll(scroll_id=sorted(opened))
+
+    def _scroll_pages(self: Self, res: Any) -> Generator[Any, None, None]:
+        """Yield ``res`` and the following scroll pages, a response without scroll id is a single page."""
+        opened: set[str] = set()
+        try:
+            while True:
+                self._track_scroll(opened, res.get("_scroll_id"))
+                yield res
+                if "_scroll_id" not in res or not res["hits"]["hits"]:
+                    return
+                res = self.next_scroll(res["_scroll_id"])
+        finally:
+            self._release_scrolls(opened)
 
     def _write_to_temp_file(self: Self, res: Any) -> None:
         """Write to temp file."""
+        self._write_pages(self._scroll_pages(res))
+
+    def _write_pages(self: Self, pages: Generator[Any, None, None]) -> None:
+        """Write the hits of decoded search pages to the temp file, up to the documents to export.
+
+        ``pages`` is closed once the documents to export are read, which releases its cursor at once.
+        """
         hit_list: list[dict[str, Any]] = []
         total_size = int(min(self.opts.max_results, self.num_results))
         bar = tqdm(
@@ -155,25 +314,170 @@ class EsXport(object):
             colour="green",
         )
         try:
-            while self.rows_written < total_size:
-                if res["_scroll_id"] not in self.scroll_ids:
-                    self.scroll_ids.append(res["_scroll_id"])
+            for page in pages:
+                self._check_cancelled()
+                for hit in page["hits"]["hits"]:
+                    if self.rows_written >= total_size:
+                        break
+                    self.rows_written += 1
+                    bar.update(1)
+                    hit_list.append(hit)
+                    if len(hit_list) >= self.memory.flush_size(FLUSH_BUFFER):
+                        self._flush_to_file(hit_list)
+                        hit_list = []
+                if self.rows_written >= total_size:
+                    break
+        except ScrollExpiredError:
+            logger.error("Scroll expired(multiple reads?). Saving loaded data.")
+        finally:
+            pages.close()
+            bar.close()
+            self._flush_to_file(hit_list)
+
+    def _can_pass_through(self: Self) -> bool:
+        """Whether documents can be copied from the responses to NDJSON without being decoded and encoded again."""
+        return self.opts.export_format == "ndjson" and not (
+            self.opts.meta_fields or self.opts.lookup or self.opts.transform or self.opts.incremental_field
+        )
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def next_raw_scroll(self: Self, scroll_id: str) -> RawPage:
+        """Paginate to the next undecoded page."""
+        with self.stats.request("scroll", {"esxport.page_size": self.search_args.get("size")}) as current:
+            body = self.es_client.scroll_raw(scroll=self.scroll_time, scroll_id=scroll_id)
+            annotate(current, {"esxport.bytes": len(body)})
+        with self.stats.phase("decode"):
+            return RawPage(body)
+
+    def _raw_pages(self: Self, page: RawPage) -> Generator[RawPage, None, None]:
+        """Yield ``page`` and the following undecoded scroll pages."""
+        opened: set[str] = set()
+        try:
+            while True:
+                self._track_scroll(opened, page.scroll_id)
+                yield page
+                if not page.scroll_id or not page.sources:
+                    return
+                page = self.next_raw_scroll(page.scroll_id)
+        finally:
+            self._release_scrolls(opened)
 
-                for hit in res["hits"]["hits"]:
+    def _write_raw_to_temp_file(self: Self, page: RawPage) -> None:
+        """Append the ``_source`` of every hit to the temp file as is."""
+        total_size = int(min(self.opts.max_results, self.num_results))
+        bar = tqdm(desc=f"{self.opts.output_file}.tmp", total=total_size, unit="docs", colour="green")
+        try:
+            with (
+                Path(f"{self.opts.output_file}.tmp").open(mode="a", encoding="utf-8") as tmp_file,
+                contextlib.closing(self._raw_pages(page)) as pages,
+            ):
+                for raw_page in pages:
+                    self._check_cancelled()
+                    sources = raw_page.sources[: total_size - self.rows_written]
+                    with self.stats.phase("flush"):
+                        tmp_file.writelines(f"{source}\n" for source in sources)
+                    nbytes = sum(map(len, sources))
+                    self.memory.observe(len(sources), nbytes)
+                    self.stats.observe(len(sources), nbytes)
+                    self.rows_written += len(sources)
+                    bar.update(len(sources))
+                    if self.rows_written >= total_size:
+                        break
+        except ScrollExpiredError:
+            logger.error("Scroll expired(multiple reads?). Saving loaded data.")
+        finally:
+            bar.close()
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def raw_search_query(self: Self) -> None:
+        """Search the index and copy the documents to the temp file without decoding them."""
+        self._validate_fields()
+        self._prepare_search_query()
+        with self.stats.request("search", {"esxport.page_size": self.search_args["size"]}) as current:
+            body = self.es_client.search_raw(**self.search_args, filter_path=RAW_FILTER_PATH)
+            annotate(current, {"esxport.bytes": len(body)})
+        with self.stats.phase("decode"):
+            page = RawPage(body)
+        self.num_results = page.total
+
+        export_count = min(self.opts.max_results, self.num_results)
+        logger.info(f"Found {self.num_results} results. Exporting {export_count}.")
+
+        if self.num_results == 0:
+            msg = "No Data found in index."
+            raise NoDataFoundError(msg)
+        self._write_raw_to_temp_file(page)
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def next_stream_scroll(self: Self, scroll_id: str) -> StreamingPage:
+        """Paginate to the next page, parsed as it is downloaded."""
+        chunks = self.es_client.stream_scroll(
+            scroll=self.scroll_time,
+            scroll_id=scroll_id,
+            filter_path=STREAM_FILTER_PATH,
+        )
+        # Only the time to the first hit is known, the rest of the page is read while it is written.
+        with self.stats.request("scroll"):
+            return StreamingPage(chunks)
+
+    def _stream_pages(self: Self, page: StreamingPage) -> Generator[StreamingPage, None, None]:
+        """Yield ``page`` and the following streamed scroll pages, each closed once the caller is done with it."""
+        opened: set[str] = set()
+        try:
+            while True:
+                self._track_scroll(opened, page.scroll_id)
+                try:
+                    yield page
+                finally:
+                    page.close()
+                if not page.scroll_id or not page.count:
+                    return
+                page = self.next_stream_scroll(page.scroll_id)
+        finally:
+            self._release_scrolls(opened)
+
+    def _write_stream_to_temp_file(self: Self, page: StreamingPage) -> None:
+        """Write to temp file while the pages are downloaded."""
+        hit_list: list[dict[str, Any]] = []
+        total_size = int(min(self.opts.max_results, self.num_results))
+        bar = tqdm(desc=f"{self.opts.output_file}.tmp", total=total_size, unit="docs", colour="green")
+        pages = self._stream_pages(page)
+        try:
+            for stream_page in pages:
+                self._check_cancelled()
+                for hit in stream_page.hits():
                     if self.rows_written >= total_size:
                         break
                     self.rows_written += 1
                     bar.update(1)
                     hit_list.append(hit)
-                    if len(hit_list) == FLUSH_BUFFER:
+                    if len(hit_list) >= self.memory.flush_size(FLUSH_BUFFER):
                         self._flush_to_file(hit_list)
                         hit_list = []
                 if self.rows_written >= total_size:
                     break
-                res = self.next_scroll(res["_scroll_id"])
         except ScrollExpiredError:
             logger.error("Scroll expired(multiple reads?). Saving loaded data.")
         finally:
+            pages.close()
             bar.close()
             self._flush_to_file(hit_list)
 
@@ -182,12 +486,46 @@ class EsXport(object):
         stop=stop_after_attempt(TIMES_TO_TRY),
         reraise=True,
         retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def stream_search_query(self: Self) -> None:
+        """Search the index and parse each page while it is downloaded."""
+        self._validate_fields()
+        self._prepare_search_query()
+        body = dict(self.search_args)
+        params = {key: body.pop(key) for key in ("index", "scroll", "_source_includes") if key in body}
+        with self.stats.request("search", {"esxport.page_size": body.get("size")}):
+            page = StreamingPage(self.es_client.stream_search(**params, body=body, filter_path=STREAM_FILTER_PATH))
+        self.num_results = page.total
+
+        export_count = min(self.opts.max_results, self.num_results)
+        logger.info(f"Found {self.num_results} results. Exporting {export_count}.")
+
+        if self.num_results == 0:
+            page.close()
+            msg = "No Data found in index."
+            raise NoDataFoundError(msg)
+        self._write_stream_to_temp_file(page)
+
+    def _check_cancelled(self: Self) -> None:
+        """Stop the export once ``cancelled`` is set."""
+        if self.cancelled.is_set():
+            raise ExportCancelledError(export_cancelled.format(file=self.opts.output_file))
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
     )
     def search_query(self: Self) -> Any:
         """Search the index."""
         self._validate_fields()
         self._prepare_search_query()
-        res = self.es_client.search(**self.search_args)
+        with self.stats.request("search", {"esxport.page_size": self.search_args["size"]}) as current:
+            res = self.es_client.search(**self.search_args)
+            describe_response(current, res)
         self.num_results = res["hits"]["total"]["value"]
 
         export_count = min(self.opts.max_results, self.num_results)
@@ -198,6 +536,434 @@ class EsXport(object):
             raise NoDataFoundError(msg)
         self._write_to_temp_file(res)
 
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def next_pit_page(self: Self, slice_id: int, search_after: list[Any] | None) -> Any:
+        """Search slice ``slice_id`` of the point in time past ``search_after``, refreshing its keep-alive."""
+        args = {**self.pit_args, "pit": {"id": self.pit_id, "keep_alive": PIT_KEEP_ALIVE}}
+        if self.opts.slices > 1:
+            args["slice"] = {"id": slice_id, "max": self.opts.slices}
+        if search_after is None:
+            args["track_total_hits"] = True
+        else:
+            args["search_after"] = search_after
+        request = "search" if search_after is None else "pit"
+        with self.stats.request(request, {"esxport.page_size": self.search_args["size"]}) as current:
+            res = self.es_client.pit_search(**args)
+            describe_response(current, res)
+        # Elasticsearch may return a new id for the same point in time, the latest one is used from then on.
+        self.pit_id = res.get("pit_id", self.pit_id)
+        return res
+
+    def _pit_pages(self: Self, pool: ThreadPoolExecutor, pages: list[Any]) -> Generator[Any, None, None]:
+        """Yield the first page of every slice, then keep fetching the next page of the unfinished slices at once."""
+        cursors = dict(enumerate(pages))
+        while cursors:
+            yield from cursors.values()
+            futures = {
+                slice_id: pool.submit(
+                    contextvars.copy_context().run,
+                    self.next_pit_page,
+                    slice_id,
+                    page["hits"]["hits"][-1]["sort"],
+                )
+                for slice_id, page in cursors.items()
+                if len(page["hits"]["hits"]) >= self.search_args["size"]
+            }
+            cursors = {slice_id: future.result() for slice_id, future in futures.items()}
+
+    def _open_pit(self: Self) -> None:
+        """Open a point in time of the indexes and build the arguments of the searches paging it."""
+        # Built from a copy, --follow keeps searching the indexes with search_args once the point in time is closed
+        self.pit_args = {
+            key: value for key, value in self.search_args.items() if key not in {"index", "scroll", "terminate_after"}
+        }
+        self.pit_args["sort"] = self.pit_args.get("sort") or ["_shard_doc"]
+        with self.stats.request("open_pit"):
+            self.pit_id = self.es_client.open_point_in_time(index=self.search_args["index"], keep_alive=PIT_KEEP_ALIVE)
+
+    def _close_pit(self: Self) -> None:
+        """Close the point in time opened by this export."""
+        if self.pit_id is None:
+            return
+        with contextlib.suppress(Exception):
+            self.es_client.close_point_in_time(self.pit_id)
+        self.pit_id = None
+
+    def pit_search_query(self: Self) -> None:
+        """Search every index at one point in time, paged with ``search_after`` in ``--slices`` concurrent slices.
+
+        All slices read the same point in time, so documents indexed, updated or deleted during the export are not seen
+        by some indexes or slices and missed by others. Every page refreshes the short keep-alive.
+        """
+        self._validate_fields()
+        self._prepare_search_query()
+        self._open_pit()
+        logger.info(using_pit.format(indexes=self.search_args["index"], slices=self.opts.slices))
+        try:
+            with ThreadPoolExecutor(max_workers=self.opts.slices, thread_name_prefix="esxport-slice") as pool:
+                first_pages = list(
+                    pool.map(
+                        lambda slice_id: contextvars.copy_context().run(self.next_pit_page, slice_id, None),
+                        range(self.opts.slices),
+                    ),
+                )
+                self.num_results = sum(page["hits"]["total"]["value"] for page in first_pages)
+                export_count = min(self.opts.max_results, self.num_results)
+                logger.info(f"Found {self.num_results} results. Exporting {export_count}.")
+                if self.num_results == 0:
+                    msg = "No Data found in index."
+                    raise NoDataFoundError(msg)
+                self._write_pages(self._pit_pages(pool, first_pages))
+        finally:
+            self._close_pit()
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def _poll_async_search(self: Self, search_id: str) -> dict[str, Any]:
+        """Wait for a bounded time for the async search to complete."""
+        with self.stats.request("async_search"):
+            return self.es_client.async_search_get(search_id, ASYNC_WAIT)
+
+    def _run_async_search(self: Self, search_after: list[Any] | None) -> Any:
+        """Search the page of the point in time past ``search_after`` with an async search, polled until it completes.
+
+        The search is submitted once and then only polled, so a connection error while waiting for an expensive query
+        never submits it again. A search still running after ``ASYNC_TIMEOUT`` seconds, or when the export fails or is
+        cancelled, is deleted from the cluster.
+        """
+        args = {**self.pit_args, "pit": {"id": self.pit_id, "keep_alive": PIT_KEEP_ALIVE}}
+        if search_after is None:
+            args["track_total_hits"] = True
+        else:
+            args["search_after"] = search_after
+        with self.stats.request("async_search", {"esxport.page_size": self.search_args["size"]}):
+            response = self.es_client.async_search_submit(
+                wait_for_completion_timeout=ASYNC_WAIT,
+                keep_alive=ASYNC_KEEP_ALIVE,
+                **args,
+            )
+        search_id = response.get("id")
+        deadline = time.monotonic() + ASYNC_TIMEOUT
+        try:
+            while response["is_running"]:
+                self._check_cancelled()
+                if time.monotonic() >= deadline:
+                    raise QueryTimeoutError(async_query_timed_out.format(id=search_id, seconds=ASYNC_TIMEOUT))
+                response = self._poll_async_search(str(search_id))
+        finally:
+            if search_id:
+                self.es_client.async_search_delete(search_id)
+        res = response["response"]
+        self.pit_id = res.get("pit_id", self.pit_id)
+        return res
+
+    def _async_pages(self: Self, page: Any) -> Generator[Any, None, None]:
+        """Yield ``page`` and the following pages, each an async search past the last hit of the previous one."""
+        while True:
+            yield page
+            hits = page["hits"]["hits"]
+            if len(hits) < self.search_args["size"]:
+                return
+            page = self._run_async_search(hits[-1]["sort"])
+
+    def async_search_query(self: Self) -> None:
+        """Search the indexes with one async search per page of a point in time, paged with ``search_after``.
+
+        Pages are written while the next ones are searched, so the export is not bound by the result window.
+        """
+        self._validate_fields()
+        self._prepare_search_query()
+        self._open_pit()
+        try:
+            page = self._run_async_search(None)
+            self.num_results = page["hits"]["total"]["value"]
+
+            export_count = min(self.opts.max_results, self.num_results)
+            logger.info(f"Found {self.num_results} results. Exporting {export_count}.")
+
+            if self.num_results == 0:
+                msg = "No Data found in index."
+                raise NoDataFoundError(msg)
+            self._write_pages(self._async_pages(page))
+        finally:
+            self._close_pit()
+
+    def _read_ids(self: Self) -> Iterator[list[str]]:
+        """Stream batches of ``scroll_size`` ids from the ids file, at most ``max_results`` ids in total.
+
+        Under ``--max-memory`` batches shrink as the documents fetched so far show how large they are.
+        """
+        batch: list[str] = []
+        count = 0
+        batch_size = self.memory.page_size(self.opts.scroll_size, MGET_CONCURRENCY)
+        with Path(self.opts.ids_file).open(encoding="utf-8") as ids_file:
+            for line in ids_file:
+                doc_id = line.strip()
+                if not doc_id:
+                    continue
+                if count >= self.opts.max_results:
+                    break
+                count += 1
+                batch.append(doc_id)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+                    batch_size = self.memory.page_size(self.opts.scroll_size, MGET_CONCURRENCY)
+        if batch:
+            yield batch
+
+    def _can_mget(self: Self) -> bool:
+        """Whether ids can be fetched with ``mget``, which needs a single concrete index and no query."""
+        indexes = self.opts.index_prefixes
+        single_index = len(indexes) == 1 and indexes[0] != "_all" and "*" not in indexes[0]
+        return single_index and self.search_args["query"] == {"match_all": {}}
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def _fetch_ids(self: Self, ids: list[str], *, use_mget: bool) -> list[dict[str, Any]]:
+        """Fetch the documents of a batch of ids, missing ids are left out."""
+        source = {key: value for key, value in self.search_args.items() if key == "_source_includes"}
+        if use_mget:
+            with self.stats.request("mget", {"esxport.page_size": len(ids)}):
+                docs = self.es_client.mget(self.search_args["index"], ids, **source)
+            return [doc for doc in docs if doc.get("found")]
+        query = {"bool": {"filter": [self.search_args["query"], {"ids": {"values": ids}}]}}
+        search = {"index": self.search_args["index"], "query": query, "track_total_hits": True, **source}
+        with self.stats.request("search", {"esxport.page_size": len(ids)}):
+            response = self.es_client.search(size=len(ids), **search)
+        hits: list[dict[str, Any]] = response["hits"]["hits"]
+        total = response["hits"]["total"]["value"]
+        if total > len(hits):
+            # An id can be in several of the indexes, search again sized for every match
+            with self.stats.request("search", {"esxport.page_size": total}):
+                hits = self.es_client.search(size=total, **search)["hits"]["hits"]
+        return hits
+
+    def ids_query(self: Self) -> None:
+        """Export the documents listed in the ids file.
+
+        Batches of ids are fetched concurrently, ``MGET_CONCURRENCY`` at a time, and written in the order of the file.
+        Ids which are not found are listed in ``<output_file>.missing``.
+        """
+        self._validate_fields()
+        self._prepare_search_query()
+        use_mget = self._can_mget()
+        if not use_mget:
+            logger.info(ids_single_index)
+        missing_file = f"{self.opts.output_file}.missing"
+        missing = 0
+        bar = tqdm(desc=f"{self.opts.output_file}.tmp", unit="docs", colour="green")
+        pending: deque[tuple[list[str], Future[list[dict[str, Any]]]]] = deque()
+
+        def drain(missing_ids: TextIO) -> int:
+            ids, future = pending.popleft()
+            docs = future.result()
+            self._flush_to_file(docs)
+            self.rows_written += len(docs)
+            bar.update(len(docs))
+            found = {doc["_id"] for doc in docs}
+            lost = [doc_id for doc_id in ids if doc_id not in found]
+            missing_ids.writelines(f"{doc_id}\n" for doc_id in lost)
+            return len(lost)
+
+        with (
+            ThreadPoolExecutor(max_workers=MGET_CONCURRENCY, thread_name_prefix="esxport-mget") as pool,
+            Path(missing_file).open(mode="w", encoding="utf-8") as missing_ids,
+        ):
+            try:
+                for batch in self._read_ids():
+                    self._check_cancelled()
+                    # Each request runs in a copy of this context so its span belongs to the export.
+                    fetch = pool.submit(contextvars.copy_context().run, self._fetch_ids, batch, use_mget=use_mget)
+                    pending.append((batch, fetch))
+                    if len(pending) >= MGET_CONCURRENCY:
+                        missing += drain(missing_ids)
+                while pending:
+                    missing += drain(missing_ids)
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                bar.close()
+        self.num_results = self.rows_written
+        if missing:
+            logger.warning(ids_missing.format(count=missing, file=missing_file))
+        else:
+            Path(missing_file).unlink(missing_ok=True)
+        if self.rows_written == 0:
+            msg = "No Data found in index."
+            raise NoDataFoundError(msg)
+
+    def _prepare_aggregation_query(self: Self) -> None:
+        """Prepares the composite aggregation query from input."""
+        aggregation: dict[str, Any] = self.opts.aggregate or {}
+        try:
+            query = Json().convert(self.opts.query, None, None)["query"]
+        except KeyError as e:
+            raise InvalidEsQueryError(query_key_missing) from e
+        if "sources" not in aggregation:
+            raise InvalidEsQueryError(aggregate_sources_missing)
+        composite: dict[str, Any] = {"composite": {"size": self.opts.scroll_size, "sources": aggregation["sources"]}}
+        if aggregation.get("aggs"):
+            composite["aggs"] = aggregation["aggs"]
+        self.search_args = {
+            "index": ",".join(self.opts.index_prefixes),
+            "size": 0,
+            "query": query,
+            "aggs": {AGGREGATION_NAME: composite},
+        }
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def _next_buckets(self: Self, after_key: dict[str, Any] | None) -> dict[str, Any]:
+        """Fetch the page of buckets following ``after_key``."""
+        composite = self.search_args["aggs"][AGGREGATION_NAME]["composite"]
+        if after_key is None:
+            composite.pop("after", None)
+        else:
+            composite["after"] = after_key
+        with self.stats.request("composite"):
+            result: dict[str, Any] = self.es_client.search(**self.search_args)["aggregations"][AGGREGATION_NAME]
+        return result
+
+    def aggregate_query(self: Self) -> None:
+        """Page the composite aggregation into the temp file, one line per bucket."""
+        self._validate_fields()
+        self._prepare_aggregation_query()
+        bar = tqdm(desc=f"{self.opts.output_file}.tmp", unit="buckets", colour="green")
+        after_key: dict[str, Any] | None = None
+        try:
+            while self.rows_written < self.opts.max_results:
+                self._check_cancelled()
+                result = self._next_buckets(after_key)
+                buckets = result["buckets"][: self.opts.max_results - self.rows_written]
+                self._flush_buckets_to_file(buckets)
+                self.rows_written += len(buckets)
+                bar.update(len(buckets))
+                after_key = result.get("after_key")
+                if not after_key or len(result["buckets"]) < self.opts.scroll_size:
+                    break
+        finally:
+            bar.close()
+        logger.info(f"Exported {self.rows_written} buckets.")
+        if self.rows_written == 0:
+            msg = "No Data found in index."
+            raise NoDataFoundError(msg)
+
+    @timed("flush")
+    def _flush_buckets_to_file(self: Self, buckets: list[dict[str, Any]]) -> None:
+        """Flush aggregation buckets to the temporary file.
+
+        Bucket keys become columns, followed by ``doc_count`` and one column per metric. Multi-value metrics (``stats``,
+        ``percentiles``, ...) get one ``<metric>.<key>`` column per value.
+        """
+        rows: list[dict[str, Any]] = []
+        for bucket in buckets:
+            row: dict[str, Any] = dict(bucket["key"])
+            row["doc_count"] = bucket["doc_count"]
+            for name, metric in bucket.items():
+                if name in {"key", "doc_count"} or not isinstance(metric, dict):
+                    continue
+                if "value" in metric:
+                    row[name] = metric["value"]
+                    continue
+                for key, value in metric.items():
+                    if isinstance(value, dict):
+                        row.update({f"{name}.{key}.{inner}": inner_value for inner, inner_value in value.items()})
+                    else:
+                        row[f"{name}.{key}"] = value
+            rows.append(row)
+        self._write_records(rows)
+
+    def _prepare_esql_query(self: Self) -> str:
+        """Prepares the ES|QL query from input, reading from the input indexes unless a source command is given."""
+        statement = self.opts.esql.strip()
+        if not ESQL_SOURCE_COMMAND.match(statement):
+            indexes = "*" if self.opts.index_prefixes == ["_all"] else ",".join(self.opts.index_prefixes)
+            statement = f"FROM {indexes} | {statement}"
+        statement = f"{statement} | LIMIT {self.opts.max_results}"
+        if self.opts.debug:
+            logger.debug(using_esql.format(query=statement))
+        return statement
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def _poll_esql(self: Self, query_id: str) -> dict[str, Any]:
+        """Wait for a bounded time for the ES|QL query to complete."""
+        with self.stats.request("esql"):
+            return self.es_client.esql_get(query_id, ASYNC_WAIT)
+
+    def _run_esql(self: Self, statement: str, query_filter: dict[str, Any]) -> dict[str, Any]:
+        """Submit the ES|QL query once and poll it until it completes, for at most ``ASYNC_TIMEOUT`` seconds.
+
+        Only polls are retried, so a connection error never submits the query again. A query still running when the
+        export fails, is cancelled or times out is deleted from the cluster.
+        """
+        with self.stats.request("esql"):
+            response = self.es_client.esql_submit(statement, query_filter, ASYNC_WAIT)
+        query_id = response.get("id")
+        deadline = time.monotonic() + ASYNC_TIMEOUT
+        try:
+            while response.get("is_running"):
+                self._check_cancelled()
+                if time.monotonic() >= deadline:
+                    raise QueryTimeoutError(async_query_timed_out.format(id=query_id, seconds=ASYNC_TIMEOUT))
+                response = self._poll_esql(str(query_id))
+        finally:
+            if query_id:
+                self.es_client.esql_delete(query_id)
+        return response
+
+    def esql_query(self: Self) -> None:
+        """Run the ES|QL query and write its columns straight to the output file, without per-row dicts."""
+        try:
+            query_filter = Json().convert(self.opts.query, None, None)["query"]
+        except KeyError as e:
+            raise InvalidEsQueryError(query_key_missing) from e
+        response = self._run_esql(self._prepare_esql_query(), query_filter)
+        self.headers = [column["name"] for column in response["columns"]]
+        columns: list[list[Any]] = response["values"]
+        self.num_results = len(columns[0]) if columns else 0
+        logger.info(f"Found {self.num_results} results.")
+        if self.num_results == 0:
+            msg = "No Data found in index."
+            raise NoDataFoundError(msg)
+        with self.stats.phase("write"):
+            Writer.write_columns(
+                self.opts.output_file,
+                self.headers,
+                columns,
+                delimiter=self.opts.delimiter,
+                output_format=self.opts.export_format,
+            )
+        self.rows_written = self.num_results
+
+    @timed("flush")
     def _flush_to_file(self: Self, hit_list: list[dict[str, Any]]) -> None:
         """Flush the search results to a temporary file."""
 
@@ -209,22 +975,45 @@ class EsXport(object):
                     except KeyError as e:  # noqa: PERF203
                         raise MetaFieldNotFoundError(meta_field_not_found.format(field=field)) from e
 
+        for lookup in self.lookups:
+            lookup.enrich(hit_list)
+        records: list[dict[str, Any]] = []
+        for hit in hit_list:
+            if self.watermark is not None:
+                self.watermark.observe(hit)
+            data = hit["_source"]
+            data.pop("_meta", None)
+            add_meta_fields()
+            records.append(data)
+        self._write_records(records)
+
+    def _write_records(self: Self, records: list[dict[str, Any]]) -> None:
+        """Run the transforms on a batch of records and append it to the temporary file."""
+        if self.transforms and records:
+            records = self.transforms(records)
+        lines = [f"{codec.dumps(record)}\n" for record in records]
+        nbytes = sum(map(len, lines))
+        self.memory.observe(len(lines), nbytes)
+        self.stats.observe(len(lines), nbytes)
         with Path(f"{self.opts.output_file}.tmp").open(mode="a", encoding="utf-8") as tmp_file:
-            for hit in hit_list:
-                data = hit["_source"]
-                data.pop("_meta", None)
-                add_meta_fields()
-                tmp_file.write(json.dumps(data))
-                tmp_file.write("\n")
+            tmp_file.writelines(lines)
 
     def _clean_scroll_ids(self: Self) -> None:
-        """Clear all scroll ids."""
-        with contextlib.suppress(Exception):
-            self.es_client.clear_scroll(scroll_id="_all")
+        """Clear the scroll ids this export still holds, other exports on the cluster keep theirs."""
+        self._release_scrolls(set(self.scroll_ids))
 
+    @timed("headers")
     def _extract_headers(self: Self) -> list[str]:
-        """Extract CSV headers from all documents in the temp file."""
+        """Extract CSV headers from all documents in the temp file, NDJSON output has no headers."""
         file_name = f"{self.opts.output_file}.tmp"
+        if self.opts.export_format == "ndjson":
+            return []
+        if self.opts.processes > 1:
+            merged: dict[str, None] = {}
+            chunks = read_line_chunks(file_name, chunk_size=self.memory.chunk_size(self.opts.processes))
+            for chunk in ordered_map(self.opts.processes, chunk_headers, chunks):
+                merged.update(dict.fromkeys(chunk))
+            return list(merged)
         headers: list[str] = []
         seen: set[str] = set()
         with Path(file_name).open(encoding="utf-8") as f:
@@ -232,7 +1021,7 @@ class EsXport(object):
                 stripped_line = line.strip()
                 if not stripped_line:
                     continue
-                for key in json.loads(stripped_line):
+                for key in codec.loads(stripped_line):
                     if key not in seen:
                         seen.add(key)
                         headers.append(key)
@@ -240,23 +1029,244 @@ class EsXport(object):
 
     def _export(self: Self) -> None:
         """Export the data."""
-        headers = self._extract_headers()
-        kwargs = {
+        self.headers = self._extract_headers()
+        kwargs: WriterParams = {
             "delimiter": self.opts.delimiter,
             "output_format": self.opts.export_format,
+            "processes": self.opts.processes,
+            "chunk_size": self.memory.chunk_size(self.opts.processes),
         }
-        Writer.write(
-            headers=headers,
-            total_records=self.rows_written,
-            out_file=self.opts.output_file,
-            **kwargs,
+        with self.stats.phase("write"):
+            Writer.write(
+                headers=self.headers,
+                total_records=self.rows_written,
+                out_file=self.opts.output_file,
+                **kwargs,
+            )
+
+    def _save_watermark(self: Self) -> None:
+        """Persist the incremental state, if any."""
+        if self.watermark is not None and self.opts.state_file:
+            self.watermark.save(self.opts.state_file)
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+        before_sleep=count_retry,
+    )
+    def _search_new_documents(self: Self, watermark: Watermark) -> list[dict[str, Any]]:
+        """Fetch the next batch of documents past the watermark."""
+        search_args = {
+            key: value for key, value in self.search_args.items() if key not in {"scroll", "terminate_after"}
+        }
+        search_args["query"] = watermark.apply(Json().convert(self.opts.query, None, None)["query"])
+        with self.stats.request("search"):
+            hits: list[dict[str, Any]] = self.es_client.search(**search_args)["hits"]["hits"]
+        return hits
+
+    def _append_new_documents(self: Self, watermark: Watermark) -> int:
+        """Append one batch of new documents to the output file.
+
+        Columns are fixed by the first write, fields which show up later are not added to the output.
+        """
+        hits = self._search_new_documents(watermark)
+        if not hits:
+            return 0
+        self._flush_to_file(hits)
+        self.rows_written += len(hits)
+        if self.rows_written > len(hits):
+            Writer.write(
+                headers=self.headers,
+                total_records=len(hits),
+                out_file=self.opts.output_file,
+                delimiter=self.opts.delimiter,
+                output_format=self.opts.export_format,
+                append=True,
+            )
+        else:
+            self._export()
+        self._save_watermark()
+        return len(hits)
+
+    def follow(self: Self) -> None:
+        """Keep appending new documents to the output file until interrupted."""
+        if self.watermark is None:
+            raise ConfigurationError(follow_requires_incremental_field)
+        logger.info(following.format(field=self.watermark.field, interval=self.opts.poll_interval))
+        appended = 0
+        try:
+            while True:
+                self._check_cancelled()
+                batch = self._append_new_documents(self.watermark)
+                appended += batch
+                # --max-memory may bound the page below --scroll-size, only a page shorter than requested is caught up
+                if batch < self.search_args["size"]:
+                    self.cancelled.wait(self.opts.poll_interval)
+        except (KeyboardInterrupt, ExportCancelledError):
+            logger.info(follow_stopped.format(rows=appended))
+
+    def _check_options(self: Self) -> None:
+        """Reject option combinations which can not work together."""
+        if self.opts.follow and not self.opts.incremental_field:
+            raise ConfigurationError(follow_requires_incremental_field)
+        modes = [
+            option
+            for option, enabled in (
+                ("--esql", self.opts.esql),
+                ("--aggregate", self.opts.aggregate),
+                ("--async-search", self.opts.async_search),
+                ("--ids-file", self.opts.ids_file),
+            )
+            if enabled
+        ]
+        if len(modes) > 1:
+            raise ConfigurationError(exclusive_modes.format(options=", ".join(modes)))
+        if modes:
+            self._check_mode_options(modes[0])
+        if self.opts.pit and (modes or self.opts.stream):
+            raise ConfigurationError(pit_not_supported.format(option=modes[0] if modes else "--stream"))
+        if self.opts.slices > 1 and not self.opts.pit:
+            raise ConfigurationError(slices_require_pit)
+        if self.opts.slices > 1 and self.opts.incremental_field:
+            raise ConfigurationError(incremental_not_sliced)
+
+    def _check_mode_options(self: Self, mode: str) -> None:
+        """Reject the options which can not work with the search ``mode``, the option enabling it."""
+        if mode != "--async-search" and self.opts.incremental_field:
+            raise ConfigurationError(mode_not_incremental.format(option=mode))
+        if mode in {"--esql", "--aggregate"} and self.opts.lookup:
+            raise ConfigurationError(lookup_not_supported.format(option=mode))
+        if mode == "--esql" and self.opts.transform:
+            raise ConfigurationError(transform_not_supported)
+        if self.opts.stream:
+            raise ConfigurationError(stream_not_supported.format(option=mode))
+        if mode != "--async-search" and self.opts.estimate:
+            raise ConfigurationError(estimate_not_supported.format(option=mode))
+        if mode == "--ids-file" and not Path(self.opts.ids_file).is_file():
+            raise ConfigurationError(ids_file_not_found.format(file=self.opts.ids_file))
+
+    def _report_stats(self: Self) -> None:
+        """Log the time spent in each phase and write it to ``--stats-json``, if set."""
+        output = Path(self.opts.output_file)
+        report = self.stats.report(self.rows_written, output.stat().st_size if output.exists() else 0)
+        ExportStats.log(report)
+        if self.opts.stats_json:
+            ExportStats.save(report, self.opts.stats_json)
+
+    def _fetch_to_temp_file(self: Self) -> None:
+        """Run the search the options ask for and write its documents to the temp file."""
+        if self.opts.aggregate:
+            self.aggregate_query()
+        elif self.opts.async_search:
+            self.async_search_query()
+        elif self.opts.ids_file:
+            self.ids_query()
+        elif self.opts.pit:
+            self.pit_search_query()
+        elif self.opts.stream:
+            self.stream_search_query()
+        elif self._can_pass_through():
+            self.raw_search_query()
+        else:
+            self.search_query()
+
+    def estimate(self: Self) -> CostEstimate:
+        """Predict the documents, output size, disk space and duration of the export without running it.
+
+        The documents are counted with ``_count``, which is exact whatever ``track_total_hits`` allows, and sized from a
+        sample page. Raises ``InsufficientDiskSpaceError`` if the output directory lacks the space needed.
+        """
+        with self.stats.phase("preflight"):
+            self._ping_cluster()
+            self._check_indexes()
+        self._validate_fields()
+        self._prepare_search_query()
+        index, query = self.search_args["index"], self.search_args["query"]
+        start = time.perf_counter()
+        with self.stats.request("count"):
+            matched = self.es_client.count(index=index, query=query)
+        request_seconds = time.perf_counter() - start
+        with self.stats.request("index_stats"):
+            index_documents, store_bytes = self.es_client.store_stats(index)
+        source = {key: value for key, value in self.search_args.items() if key == "_source_includes"}
+        start = time.perf_counter()
+        with self.stats.request("sample"):
+            hits = self.es_client.search(
+                index=index,
+                query=query,
+                size=min(ESTIMATE_SAMPLE_SIZE, self.search_args["size"]),
+                **source,
+            )["hits"]["hits"]
+        sample_seconds = time.perf_counter() - start
+        records = [
+            {**hit.get("_source", {}), **{field: hit[field] for field in self.opts.meta_fields if field in hit}}
+            for hit in hits
+        ]
+        if self.transforms and records:
+            records = self.transforms(records)
+        documents = min(matched, self.opts.max_results)
+        estimate = CostEstimate(
+            documents=documents,
+            matched=matched,
+            index_documents=index_documents,
+            store_bytes=store_bytes,
+            records=records,
+            page_size=self.search_args["size"],
+            request_seconds=request_seconds,
+            sample_seconds=sample_seconds,
+            delimiter=self.opts.delimiter,
         )
+        estimate.log(self.opts.export_format)
+        estimate.check_free_space(self.opts.output_file, self.opts.export_format)
+        return estimate
 
     def export(self: Self) -> None:
-        """Export the data."""
+        """Export the data, or only estimate it with ``--estimate``."""
+        self._check_options()
+        self.lookups = [Lookup(spec, self.es_client) for spec in self.opts.lookup]
+        self.transforms = TransformPipeline(self.opts.transform)
+        self.memory = MemoryBudget(self.opts.max_memory)
+        self.stats = ExportStats()
+        if self.opts.estimate:
+            self.estimate()
+            return
+        metrics: contextlib.AbstractContextManager[Any] = contextlib.nullcontext()
+        if self.opts.metrics_file:
+            metrics = MetricsFile(self.opts.metrics_file, self.stats, {"output": self.opts.output_file})
+        attributes = {"esxport.index": ",".join(self.opts.index_prefixes), "esxport.output": self.opts.output_file}
+        with (
+            profile(self.opts.profile, self.opts.output_file),
+            metrics,
+            export_spans(self.opts.trace),
+            span("esxport.export", attributes),
+        ):
+            self._run_export()
+
+    def _run_export(self: Self) -> None:
+        """Run the export once the options are checked."""
         Path(f"{self.opts.output_file}.tmp").unlink(missing_ok=True)
-        self._ping_cluster()
-        self._check_indexes()
-        self.search_query()
-        self._clean_scroll_ids()
-        self._export()
+        with self.stats.phase("preflight"):
+            self._ping_cluster()
+            self._check_indexes()
+        if self.opts.esql:
+            self.esql_query()
+            self._report_stats()
+            return
+        has_data = True
+        try:
+            self._fetch_to_temp_file()
+        except NoDataFoundError:
+            if not self.opts.follow:
+                raise
+            has_data = False
+        finally:
+            self._clean_scroll_ids()
+        if has_data:
+            self._export()
+            self._save_watermark()
+        if self.opts.follow:
+            self.follow()
+        self.transforms.report()
+        self._report_stats()
@@ -35,3 +35,27 @@ class InvalidEsQueryError(EsXportError):
 
 class NoDataFoundError(EsXportError):
     """No data found in the index."""
+
+
+class ConfigurationError(EsXportError):
+    """Invalid combination of options."""
+
+
+class StateFileError(EsXportError):
+    """Incremental state file can not be used."""
+
+
+class JobFileError(EsXportError):
+    """Job file can not be used."""
+
+
+class ExportCancelledError(EsXportError):
+    """Export was cancelled."""
+
+
+class InsufficientDiskSpaceError(EsXportError):
+    """Output directory lacks the space an export needs."""
+
+
+class QueryTimeoutError(EsXportError):
+    """Async query did not complete in time."""
@@ -0,0 +1,394 @@
+"""Local stand-in for the part of the Elasticsearch API esxport uses, to measure exports at scale without a cluster.
+
+Documents are not stored but built from their position when a page is requested, so a server of ten million documents
+starts at once and takes no memory. The same settings always produce the same documents.
+"""
+
+from __future__ import annotations
+
+import bisect
+import fnmatch
+import json
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlparse
+
+from loguru import logger
+from typing_extensions import Self
+
+from . import codec
+from .constant import FAKE_DOCUMENT_SIZE, FAKE_DOCUMENTS, FAKE_INDEX, MAX_RESULT_WINDOW
+from .strings import fake_es_serving
+
+VERSION = "9.0.0"
+START = 1704067200  # 2024-01-01T00:00:00Z, timestamp of the first document
+FILLER = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+MAPPING = {
+    "@timestamp": {"type": "date"},
+    "id": {"type": "long"},
+    "message": {"type": "text"},
+    "host": {"properties": {"name": {"type": "keyword"}, "ip": {"type": "ip"}}},
+    "status": {"type": "integer"},
+    "bytes": {"type": "long"},
+    "tags": {"type": "keyword"},
+}
+HEADERS = {"X-Elastic-Product": "Elasticsearch", "Content-Type": "application/json"}
+
+
+def filter_path(value: Any, paths: list[list[str]]) -> Any:
+    """Keep the parts of ``value`` named by the dotted ``paths`` of a ``filter_path`` parameter, arrays are crossed."""
+    if any(not path for path in paths):
+        return value
+    if isinstance(value, list):
+        return [filter_path(item, paths) for item in value]
+    if not isinstance(value, dict):
+        return value
+    kept: dict[str, Any] = {}
+    for key, item in value.items():
+        nested = [path[1:] for path in paths if path[0] == key]
+        if nested:
+            kept[key] = filter_path(item, nested)
+    return kept
+
+
+class FakeCluster(object):
+    """Deterministic documents of one index and the scrolls open on them.
+
+    Only ``match_all`` and ``ids`` queries are understood, any other query matches every document. Hits come in the
+    order of their position, which is also the order of ``@timestamp``, whatever ``sort`` asks for. Sliced searches
+    take every ``max``-th document. Sorted searches return the position as sort value, which ``search_after`` takes.
+    """
+
+    def __init__(
+        self: Self,
+        documents: int = FAKE_DOCUMENTS,
+        document_size: int = FAKE_DOCUMENT_SIZE,
+        latency: float = 0.0,
+        index: str = FAKE_INDEX,
+    ) -> None:
+        self.documents = documents
+        self.document_size = document_size
+        self.latency = latency
+        self.index = index
+        self.scrolls: dict[str, dict[str, Any]] = {}
+        self.pits: set[str] = set()
+        self._lock = threading.Lock()
+        base = len(codec.dumps(self.source(0, "")))
+        self._filler = FILLER * (max(0, document_size - base) // len(FILLER) + 2)
+        self._message_size = max(0, document_size - base)
+
+    def source(self: Self, position: int, message: str | None = None) -> dict[str, Any]:
+        """The document at ``position``."""
+        if message is None:
+            offset = position % len(FILLER)
+            message = self._filler[offset : offset + self._message_size]
+        return {
+            "@timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(START + position)),
+            "id": position,
+            "message": message,
+            "host": {"name": f"host-{position % 50}", "ip": f"10.0.{position % 256}.{position % 7}"},
+            "status": (200, 200, 200, 404, 500)[position % 5],
+            "bytes": position * 7919 % 100000,
+            "tags": ["web", f"shard-{position % 3}"],
+        }
+
+    def matches(self: Self, index: str) -> bool:
+        """Whether the comma separated index patterns ``index`` include the fake index."""
+        return any(fnmatch.fnmatchcase(self.index, pattern) for pattern in index.split(",") if pattern) or index in {
+            "_all",
+            "*",
+        }
+
+    def hit(self: Self, position: int, includes: list[str] | None) -> dict[str, Any]:
+        """The search hit of the document at ``position``, its source cut to ``includes`` if given, none if empty."""
+        source = self.source(position)
+        hit: dict[str, Any] = {"_index": self.index, "_id": str(position), "_score": 1.0}
+        if includes is None:
+            return {**hit, "_source": source}
+        if includes:
+            roots = {field.split(".")[0] for field in includes}
+            hit["_source"] = {key: value for key, value in source.items() if key in roots}
+        return hit
+
+    def positions(self: Self, query: dict[str, Any] | None) -> list[int] | range:
+        """Positions of the documents matching ``query``."""
+        ids = self._ids(query or {})
+        if ids is None:
+            return range(self.documents)
+        return sorted({int(doc_id) for doc_id in ids if doc_id.isdigit() and int(doc_id) < self.documents})
+
+    def _ids(self: Self, query: dict[str, Any]) -> list[str] | None:
+        """Ids an ``ids`` query, alone or as a ``bool`` filter, restricts to, ``None`` for any other query."""
+        if "ids" in query:
+            return [str(doc_id) for doc_id in query["ids"]["values"]]
+        clauses = query.get("bool", {}).get("filter", [])
+        for clause in clauses if isinstance(clauses, list) else [clauses]:
+            ids = self._ids(clause)
+            if ids is not None:
+                return ids
+        return None
+
+    def search(self: Self, body: dict[str, Any], params: dict[str, str]) -> dict[str, Any] | None:
+        """Run a search, opening a scroll when ``params`` ask for one, ``None`` when its point in time is not open."""
+        pit_id = body.get("pit", {}).get("id")
+        if pit_id is not None and pit_id not in self.pits:
+            return None
+        positions = self.positions(body.get("query"))
+        terminate_after = body.get("terminate_after") or params.get("terminate_after")
+        if terminate_after:
+            positions = positions[: int(terminate_after)]
+        if "slice" in body:
+            positions = positions[body["slice"]["id"] :: body["slice"]["max"]]
+        if "search_after" in body:
+            positions = positions[bisect.bisect_right(positions, body["search_after"][0]) :]
+        size = int(body.get("size", params.get("size", 10)))
+        includes = self.includes(body, params)
+        scroll_id = None
+        if "scroll" in params:
+            scroll_id = uuid.uuid4().hex
+            with self._lock:
+                self.scrolls[scroll_id] = {"positions": positions, "offset": size, "size": size, "includes": includes}
+        exact = "scroll" in params or body.get("track_total_hits")
+        response = self._page(positions, 0, size, includes, exact=exact)
+        if scroll_id:
+            response = {"_scroll_id": scroll_id, **response}
+        if "sort" in body or pit_id is not None:
+            for hit in response["hits"]["hits"]:
+                hit["sort"] = [int(hit["_id"])]
+        if pit_id is not None:
+            response = {"pit_id": pit_id, **response}
+        return response
+
+    def open_pit(self: Self) -> str:
+        """Open a point in time and return its id."""
+        pit_id = uuid.uuid4().hex
+        with self._lock:
+            self.pits.add(pit_id)
+        return pit_id
+
+    def close_pit(self: Self, pit_id: str) -> bool:
+        """Close a point in time and return whether it was open."""
+        with self._lock:
+            if pit_id not in self.pits:
+                return False
+            self.pits.remove(pit_id)
+            return True
+
+    def scroll(self: Self, scroll_id: str) -> dict[str, Any] | None:
+        """Next page of a scroll, ``None`` when it is not open."""
+        with self._lock:
+            state = self.scrolls.get(scroll_id)
+            if state is None:
+                return None
+            offset = state["offset"]
+            state["offset"] += state["size"]
+        page = self._page(state["positions"], offset, state["size"], state["includes"], exact=True)
+        return {"_scroll_id": scroll_id, **page}
+
+    def clear_scroll(self: Self, scroll_ids: list[str]) -> int:
+        """Close scrolls and return how many were open."""
+        with self._lock:
+            return sum(self.scrolls.pop(scroll_id, None) is not None for scroll_id in scroll_ids)
+
+    def mget(self: Self, ids: list[str], includes: list[str] | None) -> dict[str, Any]:
+        """Documents by id, missing ones with ``found`` false."""
+        found = set(self.positions({"ids": {"values": ids}}))
+        docs = [
+            {**self.hit(int(doc_id), includes), "found": True}
+            if doc_id.isdigit() and int(doc_id) in found
+            else {"_index": self.index, "_id": doc_id, "found": False}
+            for doc_id in ids
+        ]
+        for doc in docs:
+            doc.pop("_score", None)
+        return {"docs": docs}
+
+    def _page(
+        self: Self,
+        positions: list[int] | range,
+        offset: int,
+        size: int,
+        includes: list[str] | None,
+        *,
+        exact: Any,
+    ) -> dict[str, Any]:
+        """A search response holding ``size`` hits from ``offset``."""
+        total = len(positions)
+        relation = "eq"
+        if not exact and total > MAX_RESULT_WINDOW:
+            total, relation = MAX_RESULT_WINDOW, "gte"
+        if self.latency:
+            time.sleep(self.latency)
+        return {
+            "took": int(self.latency * 1000),
+            "timed_out": False,
+            "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+            "hits": {
+                "total": {"value": total, "relation": relation},
+                "max_score": 1.0,
+                "hits": [self.hit(position, includes) for position in positions[offset : offset + size]],
+            },
+        }
+
+    @staticmethod
+    def includes(body: dict[str, Any], params: dict[str, str]) -> list[str] | None:
+        """Fields of ``_source_includes``, from the parameters or the ``_source`` of the body, empty without source."""
+        if "_source_includes" in params:
+            return params["_source_includes"].split(",")
+        source = body.get("_source")
+        if source is False:
+            return []
+        if isinstance(source, list):
+            return [str(field) for field in source]
+        return None
+
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+    """Routes of the Elasticsearch API answered by ``FakeElasticsearch``."""
+
+    server: FakeElasticsearch
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self: Self, status: HTTPStatus, body: Any = None) -> None:
+        payload = b"" if body is None else codec.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for name, value in HEADERS.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    def _error(self: Self, status: HTTPStatus, error_type: str, reason: str) -> None:
+        self._reply(status, {"error": {"type": error_type, "reason": reason}, "status": status.value})
+
+    def _request(self: Self) -> tuple[list[str], dict[str, str], dict[str, Any]]:
+        """Path segments, query parameters and JSON body of the request."""
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else {}
+        return parts, params, body
+
+    def _respond(self: Self, response: Any, params: dict[str, str]) -> None:
+        """Reply with ``response`` reduced to the ``filter_path`` of ``params``."""
+        if "filter_path" in params:
+            response = filter_path(response, [path.split(".") for path in params["filter_path"].split(",")])
+        self._reply(HTTPStatus.OK, response)
+
+    def _search(self: Self, body: dict[str, Any], params: dict[str, str]) -> None:
+        """Answer a search, 404 when its point in time is not open."""
+        response = self.server.cluster.search(body, params)
+        if response is None:
+            self._error(HTTPStatus.NOT_FOUND, "search_context_missing_exception", "No search context found")
+            return
+        self._respond(response, params)
+
+    def _route(self: Self) -> None:  # noqa: C901, PLR0912
+        cluster = self.server.cluster
+        parts, params, body = self._request()
+        if not parts:
+            info = {"name": "fake", "cluster_name": "esxport-fake", "version": {"number": VERSION}, "tagline": "fake"}
+            self._reply(HTTPStatus.OK, info)
+            return
+        if parts[:2] == ["_search", "scroll"]:
+            scroll_ids = body.get("scroll_id", params.get("scroll_id", []))
+            if self.command == "DELETE":
+                scroll_ids = [scroll_ids] if isinstance(scroll_ids, str) else scroll_ids
+                self._reply(HTTPStatus.OK, {"succeeded": True, "num_freed": cluster.clear_scroll(scroll_ids)})
+                return
+            page = cluster.scroll(str(scroll_ids))
+            if page is None:
+                self._error(HTTPStatus.NOT_FOUND, "search_context_missing_exception", f"No search context {scroll_ids}")
+                return
+            self._respond(page, params)
+            return
+        index = parts[0]
+        if not index.startswith("_") and not cluster.matches(index):
+            self._error(HTTPStatus.NOT_FOUND, "index_not_found_exception", f"no such index [{index}]")
+            return
+        endpoint = parts[1] if len(parts) > 1 else index if index.startswith("_") else ""
+        if endpoint == "":
+            if self.command == "HEAD":
+                self._reply(HTTPStatus.OK)
+            else:
+                self._reply(HTTPStatus.OK, {cluster.index: {"mappings": {"properties": MAPPING}}})
+            return
+        if endpoint == "_mapping":
+            self._reply(HTTPStatus.OK, {cluster.index: {"mappings": {"properties": MAPPING}}})
+        elif endpoint == "_search":
+            self._search(body, params)
+        elif endpoint == "_pit" and self.command == "DELETE":
+            self._reply(HTTPStatus.OK, {"succeeded": True, "num_freed": int(cluster.close_pit(body.get("id", "")))})
+        elif endpoint == "_pit":
+            self._reply(HTTPStatus.OK, {"id": cluster.open_pit()})
+        elif endpoint == "_count":
+            self._respond({"count": len(cluster.positions(body.get("query")))}, params)
+        elif endpoint == "_stats":
+            store = {"size_in_bytes": cluster.documents * cluster.document_size}
+            primaries = {"docs": {"count": cluster.documents, "deleted": 0}, "store": store}
+            self._respond({"_all": {"primaries": primaries, "total": primaries}}, params)
+        elif endpoint == "_mget":
+            ids = body.get("ids") or [doc["_id"] for doc in body.get("docs", [])]
+            self._respond(cluster.mget([str(doc_id) for doc_id in ids], FakeCluster.includes(body, params)), params)
+        else:
+            self._error(HTTPStatus.BAD_REQUEST, "unsupported_operation", f"{self.command} {self.path} is not faked")
+
+    def do_GET(self: Self) -> None:
+        """Answer a GET request."""
+        self._route()
+
+    def do_HEAD(self: Self) -> None:
+        """Answer a HEAD request."""
+        self._route()
+
+    def do_POST(self: Self) -> None:
+        """Answer a POST request."""
+        self._route()
+
+    def do_DELETE(self: Self) -> None:
+        """Answer a DELETE request."""
+        self._route()
+
+    def log_message(self: Self, format: str, *args: Any) -> None:  # noqa: A002
+        """Route access logs to loguru."""
+        logger.debug(format % args)
+
+
+class FakeElasticsearch(ThreadingHTTPServer):
+    """HTTP server answering for a ``FakeCluster``."""
+
+    daemon_threads = True
+
+    def __init__(self: Self, address: tuple[str, int], cluster: FakeCluster) -> None:
+        super().__init__(address, FakeRequestHandler)
+        self.cluster = cluster
+
+    @property
+    def url(self: Self) -> str:
+        """Base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self: Self) -> threading.Thread:
+        """Serve on a daemon thread, for tests and benchmarks in the same process."""
+        thread = threading.Thread(target=self.serve_forever, name="esxport-fake-es", daemon=True)
+        thread.start()
+        return thread
+
+    def serve(self: Self) -> None:
+        """Serve until interrupted."""
+        logger.info(
+            fake_es_serving.format(url=self.url, documents=self.cluster.documents, index=self.cluster.index),
+        )
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
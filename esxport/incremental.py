@@ -0,0 +1,73 @@
+"""Incremental export state."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from typing_extensions import Self
+
+from .exceptions import StateFileError
+from .strings import state_field_mismatch, state_file_invalid
+
+
+class Watermark(object):
+    """High-watermark of an incremental export.
+
+    The watermark remembers the highest value of ``field`` exported so far together with the ``_id`` of every document
+    sharing that value. The next run asks for documents with ``field >= value`` while excluding those ids, so documents
+    indexed later with the very same value are not lost and the ones already exported are not duplicated.
+    """
+
+    def __init__(self: Self, field: str, value: Any = None, ids: list[str] | None = None) -> None:
+        self.field = field
+        self.value = value
+        self.ids: list[str] = ids or []
+
+    @classmethod
+    def load(cls: type[Self], state_file: str, field: str) -> Self:
+        """Load the watermark stored in ``state_file``, an empty one if the file does not exist."""
+        path = Path(state_file)
+        if not path.exists():
+            return cls(field)
+        try:
+            state = json.loads(path.read_text(encoding="utf-8"))
+            stored_field, value, ids = state["field"], state["value"], state["ids"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise StateFileError(state_file_invalid.format(file=state_file, exc=e)) from e
+        if stored_field != field:
+            raise StateFileError(state_field_mismatch.format(file=state_file, stored=stored_field, field=field))
+        return cls(field, value, list(ids))
+
+    def save(self: Self, state_file: str) -> None:
+        """Atomically persist the watermark to ``state_file``."""
+        path = Path(state_file)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps({"field": self.field, "value": self.value, "ids": self.ids}), encoding="utf-8")
+        tmp_path.replace(path)
+
+    def apply(self: Self, query: dict[str, Any]) -> dict[str, Any]:
+        """Restrict ``query`` to documents past the watermark.
+
+        Documents without the watermark field can not be tracked and are therefore never part of an incremental export.
+        """
+        bool_query: dict[str, Any] = {"filter": [query, {"exists": {"field": self.field}}]}
+        if self.value is not None:
+            bool_query["filter"].append({"range": {self.field: {"gte": self.value}}})
+        if self.ids:
+            bool_query["must_not"] = [{"ids": {"values": self.ids}}]
+        return {"bool": bool_query}
+
+    def sort(self: Self, sort: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Sort on the watermark field first so a truncated export never skips documents."""
+        return [{self.field: "asc"}, *[sort_query for sort_query in sort if self.field not in sort_query]]
+
+    def observe(self: Self, hit: dict[str, Any]) -> None:
+        """Advance the watermark with an exported hit."""
+        value = hit["sort"][0]
+        if self.value is None or value > self.value:
+            self.value = value
+            self.ids = [hit["_id"]]
+        elif value == self.value:
+            self.ids.append(hit["_id"])
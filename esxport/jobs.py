@@ -0,0 +1,212 @@
+"""Run many exports in one process."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import yaml
+from click import BadParameter
+from elasticsearch import ApiError, TransportError
+from loguru import logger
+from tenacity import Retrying, retry_if_exception, retry_if_exception_type, stop_after_attempt, wait_exponential
+from typing_extensions import Self
+
+from .click_opt.cli_options import CliOptions
+from .click_opt.click_custom import JSON, sort
+from .constant import JOB_CONCURRENCY, JOB_RETRIES
+from .elastic import ElasticsearchClientPool
+from .esxport import EsXport
+from .exceptions import JobFileError, NoDataFoundError
+from .stats import TOO_MANY_REQUESTS
+from .strings import (
+    job_failed,
+    job_file_duplicate_output,
+    job_file_invalid,
+    job_file_missing_key,
+    job_finished,
+    job_not_mapping,
+    job_query_not_object,
+    job_report_header,
+    job_report_row,
+)
+
+REQUIRED_JOB_KEYS = ("query", "output_file", "index_prefixes")
+SERVER_ERROR = 500
+
+
+def overloaded(error: BaseException) -> bool:
+    """Whether Elasticsearch answered that it is throttling or failing, which may pass by the next attempt."""
+    return isinstance(error, ApiError) and (error.status_code == TOO_MANY_REQUESTS or error.status_code >= SERVER_ERROR)
+
+
+def parse_query(name: str, query: Any) -> dict[str, Any]:
+    """Query of job ``name``, given as a mapping or as its JSON text."""
+    if isinstance(query, str):
+        try:
+            query = JSON.convert(query, None, None)
+        except BadParameter as e:
+            raise JobFileError(job_file_invalid.format(file=name, exc=e.message)) from e
+    if not isinstance(query, dict):
+        raise JobFileError(job_file_invalid.format(file=name, exc=job_query_not_object))
+    return query
+
+
+def build_options(name: str, settings: dict[str, Any]) -> CliOptions:
+    """Build the export options of job ``name`` from a mapping of ``CliOptions`` attributes.
+
+    The query is a mapping or its JSON text, as ``--query`` takes it.
+    """
+    if not isinstance(settings, dict):
+        raise JobFileError(job_not_mapping.format(name=name))
+    for key in REQUIRED_JOB_KEYS:
+        if key not in settings:
+            raise JobFileError(job_file_missing_key.format(name=name, key=key))
+    for key in ("index_prefixes", "fields", "meta_fields", "sort"):
+        if isinstance(settings.get(key), str):
+            settings[key] = [settings[key]]
+    settings["query"] = parse_query(name, settings["query"])
+    try:
+        settings["sort"] = [
+            sort.convert(value, None, None) if isinstance(value, str) else value for value in settings.get("sort", [])
+        ]
+    except BadParameter as e:
+        raise JobFileError(job_file_invalid.format(file=name, exc=e.message)) from e
+    return CliOptions(settings)
+
+
+class JobResult(object):
+    """Outcome of one export job."""
+
+    def __init__(  # noqa: PLR0913
+        self: Self,
+        name: str,
+        status: str,
+        *,
+        docs: int,
+        seconds: float,
+        attempts: int,
+        error: str = "",
+    ) -> None:
+        self.name = name
+        self.status = status
+        self.docs = docs
+        self.seconds = seconds
+        self.attempts = attempts
+        self.error = error
+
+    @property
+    def docs_per_second(self: Self) -> float:
+        """Export throughput."""
+        return self.docs / self.seconds if self.seconds else 0.0
+
+
+class JobRunner(object):
+    """Run export jobs concurrently over shared Elasticsearch connection pools.
+
+    Jobs with identical connection settings share one ``ElasticsearchClient`` so interpreter start-up, TLS handshakes
+    and connection set-up are paid once per cluster instead of once per export.
+    """
+
+    def __init__(
+        self: Self,
+        jobs: list[tuple[str, CliOptions]],
+        concurrency: int = JOB_CONCURRENCY,
+        retries: int = JOB_RETRIES,
+    ) -> None:
+        self.jobs = jobs
+        self.concurrency = concurrency
+        self.retries = retries
+        self.clients = ElasticsearchClientPool()
+
+    @classmethod
+    def from_file(cls: type[Self], jobs_file: str, concurrency: int | None = None, retries: int | None = None) -> Self:
+        """Load jobs from a YAML (or JSON) job file.
+
+        The file holds a ``jobs`` list of export options, optional ``defaults`` merged into every job and optional
+        ``concurrency``/``retries`` settings which the arguments override.
+        """
+        try:
+            config = yaml.safe_load(Path(jobs_file).read_text(encoding="utf-8"))
+            defaults: dict[str, Any] = config.get("defaults") or {}
+            raw_jobs: list[dict[str, Any]] = config["jobs"]
+        except (yaml.YAMLError, AttributeError, KeyError, TypeError) as e:
+            raise JobFileError(job_file_invalid.format(file=jobs_file, exc=e)) from e
+
+        jobs: list[tuple[str, CliOptions]] = []
+        outputs: set[str] = set()
+        for position, raw_job in enumerate(raw_jobs, start=1):
+            settings = {**defaults, **raw_job}
+            name = str(settings.pop("name", f"job-{position}"))
+            opts = build_options(name, settings)
+            if opts.output_file in outputs:
+                raise JobFileError(job_file_duplicate_output.format(name=name, output=opts.output_file))
+            outputs.add(opts.output_file)
+            jobs.append((name, opts))
+        return cls(
+            jobs,
+            concurrency=concurrency or int(config.get("concurrency", JOB_CONCURRENCY)),
+            retries=retries if retries is not None else int(config.get("retries", JOB_RETRIES)),
+        )
+
+    def _export(self: Self, opts: CliOptions) -> int:
+        """Run one export attempt."""
+        exporter = EsXport(opts, es_client=self.clients.get(opts))
+        exporter.export()
+        return exporter.rows_written
+
+    def _run_job(self: Self, name: str, opts: CliOptions) -> JobResult:
+        """Run one job, retrying attempts which failed on a transient error.
+
+        Connection errors, timeouts, throttling and server errors are retried. Configuration, query and mapping errors
+        fail the same way every time and are reported at once.
+        """
+        retrying = Retrying(
+            wait=wait_exponential(2),
+            stop=stop_after_attempt(self.retries + 1),
+            reraise=True,
+            retry=retry_if_exception_type(TransportError) | retry_if_exception(overloaded),
+        )
+        started = time.monotonic()
+        status, docs, error = "ok", 0, ""
+        try:
+            docs = retrying(self._export, opts)
+        except NoDataFoundError:
+            status = "empty"
+        except Exception as e:  # noqa: BLE001 # one failed job must not stop the others
+            logger.error(job_failed.format(name=name, exc=e))
+            status, error = "failed", str(e)
+        result = JobResult(
+            name,
+            status,
+            docs=docs,
+            seconds=time.monotonic() - started,
+            attempts=retrying.statistics["attempt_number"],
+            error=error,
+        )
+        logger.info(job_finished.format(name=name, status=result.status, docs=result.docs, seconds=result.seconds))
+        return result
+
+    def run(self: Self) -> list[JobResult]:
+        """Run all jobs, at most ``concurrency`` at a time."""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="esxport-job") as pool:
+            return list(pool.map(lambda job: self._run_job(*job), self.jobs))
+
+
+def format_report(results: list[JobResult]) -> str:
+    """Summarise job results as a table."""
+    lines = [job_report_header]
+    lines.extend(
+        job_report_row.format(
+            name=result.name,
+            status=result.status,
+            attempts=result.attempts,
+            docs=result.docs,
+            seconds=result.seconds,
+            rate=result.docs_per_second,
+        )
+        for result in results
+    )
+    return "\n".join(lines)
@@ -0,0 +1,144 @@
+"""Join exported hits with the documents of a lookup index."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from elasticsearch.exceptions import ConnectionError as ESConnectionError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from typing_extensions import Self
+
+from .constant import LOOKUP_CACHE_SIZE, TIMES_TO_TRY
+from .exceptions import ConfigurationError
+from .strings import lookup_key_missing
+
+if TYPE_CHECKING:
+    from .elastic import ElasticsearchClient
+
+Key = str | int | float | bool
+
+
+def get_path(source: dict[str, Any], path: str) -> Any:
+    """Return the value of a dotted ``path`` in ``source``, ``None`` if it is missing."""
+    value: Any = source
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class LruCache(object):
+    """Mapping holding at most ``max_size`` keys, the least recently used key is evicted first."""
+
+    def __init__(self: Self, max_size: int) -> None:
+        self.max_size = max_size
+        self._data: OrderedDict[Key, Any] = OrderedDict()
+
+    def __contains__(self: Self, key: Key) -> bool:
+        """Whether ``key`` is cached."""
+        return key in self._data
+
+    def __getitem__(self: Self, key: Key) -> Any:
+        """Return the value of ``key`` and mark it as recently used."""
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def __setitem__(self: Self, key: Key, value: Any) -> None:
+        """Cache ``value``, evicting the least recently used keys when full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def __len__(self: Self) -> int:
+        """Number of cached keys."""
+        return len(self._data)
+
+
+class Lookup(object):
+    """Enrich hits with fields of the document whose ``match`` field equals the ``key`` field of the hit.
+
+    The keys of a whole batch of hits are resolved with one ``mget`` (when matching on ``_id``) or a ``terms``
+    search, repeated for the keys crowded out of a full page by documents sharing a key.
+    Resolved documents, and keys without a document, are kept in an LRU cache shared by all batches of the export.
+    Selected ``fields`` of the matched document are added to the hit as ``<prefix><field>``.
+    """
+
+    def __init__(self: Self, spec: dict[str, Any], es_client: ElasticsearchClient) -> None:
+        for required in ("index", "key"):
+            if not spec.get(required):
+                raise ConfigurationError(lookup_key_missing.format(key=required))
+        self.index: str = spec["index"]
+        self.key: str = spec["key"]
+        self.match: str = spec.get("match", "_id")
+        self.fields: list[str] = list(spec.get("fields", []))
+        self.prefix: str = spec.get("prefix", f"{self.index}.")
+        self.cache = LruCache(int(spec.get("cache_size", LOOKUP_CACHE_SIZE)))
+        self.es_client = es_client
+
+    def _key(self: Self, source: dict[str, Any]) -> Key | None:
+        """Join key of a hit, only single values can be joined."""
+        value = get_path(source, self.key)
+        return value if isinstance(value, Key) else None
+
+    @retry(
+        wait=wait_exponential(2),
+        stop=stop_after_attempt(TIMES_TO_TRY),
+        reraise=True,
+        retry=retry_if_exception_type(ESConnectionError),
+    )
+    def _fetch(self: Self, keys: list[Key]) -> dict[Key, dict[str, Any]]:
+        """Fetch the documents matching ``keys``, keys without a document are left out."""
+        source: dict[str, Any] = {}
+        if self.fields:
+            source["_source_includes"] = ",".join(sorted({*self.fields, self.match} - {"_id"}))
+        if self.match == "_id":
+            by_id = {str(key): key for key in keys}
+            docs = self.es_client.mget(self.index, list(by_id), **source)
+            return {by_id[doc["_id"]]: doc.get("_source", {}) for doc in docs if doc.get("found")}
+        found: dict[Key, dict[str, Any]] = {}
+        wanted = keys
+        while wanted:
+            query = {"terms": {self.match: wanted}}
+            hits = self.es_client.search(index=self.index, query=query, size=len(wanted), **source)["hits"]["hits"]
+            for hit in hits:
+                found.setdefault(get_path(hit["_source"], self.match), hit["_source"])
+            # Several documents can share a key and fill the page, the keys left out are searched again
+            left = [key for key in wanted if key not in found]
+            if len(hits) < len(wanted) or len(left) == len(wanted):
+                break
+            wanted = left
+        return found
+
+    def _merge(self: Self, source: dict[str, Any], document: dict[str, Any]) -> None:
+        """Add the selected fields of ``document`` to ``source``."""
+        if self.fields:
+            for field in self.fields:
+                source[f"{self.prefix}{field}"] = get_path(document, field)
+        else:
+            for field, value in document.items():
+                source[f"{self.prefix}{field}"] = value
+
+    def enrich(self: Self, hits: list[dict[str, Any]]) -> None:
+        """Merge the looked up fields into the ``_source`` of every hit, in place."""
+        keys = [self._key(hit["_source"]) for hit in hits]
+        resolved: dict[Key, dict[str, Any] | None] = {}
+        wanted: list[Key] = []
+        for key in keys:
+            if key is None or key in resolved:
+                continue
+            if key in self.cache:
+                resolved[key] = self.cache[key]
+            else:
+                resolved[key] = None
+                wanted.append(key)
+        if wanted:
+            fetched = self._fetch(wanted)
+            for key in wanted:
+                resolved[key] = self.cache[key] = fetched.get(key)
+        for hit, key in zip(hits, keys):
+            document = resolved.get(key) if key is not None else None
+            if document is not None:
+                self._merge(hit["_source"], document)
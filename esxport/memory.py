@@ -0,0 +1,77 @@
+"""Keep an export within the bytes given by ``--max-memory``."""
+
+from __future__ import annotations
+
+import re
+
+from typing_extensions import Self
+
+from .constant import MEMORY_OVERHEAD, PROCESS_CHUNK_SIZE
+from .strings import invalid_size_format
+
+SIZE = re.compile(r"^\s*(\d+)\s*(?:([kmgt])i?)?b?\s*$", re.IGNORECASE)
+UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+PAGE_SHARE = 0.5  # Of the budget for the pages in flight
+FLUSH_SHARE = 0.25  # Of the budget for the documents waiting to be flushed to the temp file
+WRITER_SHARE = 0.25  # Of the budget for the chunks handed to --processes workers
+
+
+def parse_size(value: str | int) -> int:
+    """Bytes of a size such as ``1048576``, ``512M`` or ``2GiB``, units are powers of 1024."""
+    if isinstance(value, int):
+        return value
+    match = SIZE.match(value)
+    if not match:
+        raise ValueError(invalid_size_format.format(value=value))
+    return int(match.group(1)) * UNITS[(match.group(2) or "").lower()]
+
+
+class MemoryBudget(object):
+    """Split a memory limit between pages, flush buffer and writer, sized by the documents written so far.
+
+    The size of a document is taken from its JSON line in the temp file; decoded documents are counted at
+    ``MEMORY_OVERHEAD`` times that. A budget of 0 bounds nothing and every size is left as configured.
+    """
+
+    def __init__(self: Self, limit: int) -> None:
+        self.limit = limit
+        self.documents = 0
+        self.nbytes = 0
+
+    def __bool__(self: Self) -> bool:
+        """Whether a limit is set."""
+        return self.limit > 0
+
+    def observe(self: Self, documents: int, nbytes: int) -> None:
+        """Record the JSON size of documents written to the temp file."""
+        self.documents += documents
+        self.nbytes += nbytes
+
+    @property
+    def document_size(self: Self) -> int:
+        """Average bytes of a document in memory, 0 until a document was observed."""
+        if not self.documents:
+            return 0
+        return max(1, self.nbytes * MEMORY_OVERHEAD // self.documents)
+
+    def _documents(self: Self, share: float, size: int, parts: int = 1) -> int:
+        """At most ``size`` documents such that ``parts`` times them fit in ``share`` of the budget."""
+        if not self or not self.document_size:
+            return size
+        return max(1, min(size, int(self.limit * share) // parts // self.document_size))
+
+    def page_size(self: Self, size: int, in_flight: int = 1) -> int:
+        """Documents per page when ``in_flight`` pages are held at once."""
+        return self._documents(PAGE_SHARE, size, in_flight)
+
+    def flush_size(self: Self, size: int) -> int:
+        """Documents collected before they are flushed to the temp file, at most ``size``."""
+        return self._documents(FLUSH_SHARE, size)
+
+    def chunk_size(self: Self, processes: int) -> int:
+        """Bytes of temp file lines per ``--processes`` chunk, two chunks per process are in flight."""
+        if not self:
+            return PROCESS_CHUNK_SIZE
+        in_flight = 2 * max(processes, 1) * MEMORY_OVERHEAD
+        return max(1, min(PROCESS_CHUNK_SIZE, int(self.limit * WRITER_SHARE) // in_flight))
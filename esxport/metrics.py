@@ -0,0 +1,118 @@
+"""Write the metrics of a running export for the node_exporter textfile collector."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from typing_extensions import Self
+
+from .constant import METRICS_INTERVAL
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from .stats import ExportStats
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+REQUEST_DURATION = "esxport_request_duration_seconds"
+
+
+def _labels(labels: dict[str, str]) -> str:
+    """Render ``labels`` in the text exposition format."""
+    escaped = (
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def render(stats: ExportStats, labels: dict[str, str], *, success: bool | None = None) -> str:
+    """The metrics of ``stats`` in the Prometheus text exposition format, with the outcome once ``success`` is known."""
+    snapshot = stats.snapshot()
+    counters = snapshot["counters"]
+    lines: list[str] = []
+
+    def metric(name: str, kind: str, help_text: str, value: float) -> None:
+        lines.extend((f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name}{_labels(labels)} {value}"))
+
+    metric("esxport_documents_total", "counter", "Documents written to the temp file.", snapshot["documents"])
+    metric("esxport_fetched_bytes_total", "counter", "JSON bytes of the documents fetched.", snapshot["nbytes"])
+    metric("esxport_retries_total", "counter", "Requests retried after a connection error.", counters["retries"])
+    metric("esxport_throttled_total", "counter", "429 responses left after client retries.", counters["throttled"])
+    metric("esxport_scroll_expired_total", "counter", "Scrolls which expired.", counters["scroll_expired"])
+    metric("esxport_start_time_seconds", "gauge", "Unix time the export started.", stats.started_at)
+    metric(
+        "esxport_last_progress_time_seconds",
+        "gauge",
+        "Unix time documents were last written.",
+        snapshot["last_progress"],
+    )
+    if success is not None:
+        metric("esxport_success", "gauge", "Whether the export completed.", int(success))
+        metric("esxport_end_time_seconds", "gauge", "Unix time the export ended.", time.time())
+
+    lines.append(f"# HELP {REQUEST_DURATION} Latency of Elasticsearch requests.")
+    lines.append(f"# TYPE {REQUEST_DURATION} histogram")
+    for request, samples in sorted(snapshot["requests"].items()):
+        request_labels = {**labels, "request": request}
+        for bound in LATENCY_BUCKETS:
+            count = sum(1 for sample in samples if sample <= bound)
+            lines.append(f"{REQUEST_DURATION}_bucket{_labels({**request_labels, 'le': str(bound)})} {count}")
+        lines.append(f"{REQUEST_DURATION}_bucket{_labels({**request_labels, 'le': '+Inf'})} {len(samples)}")
+        lines.append(f"{REQUEST_DURATION}_sum{_labels(request_labels)} {sum(samples)}")
+        lines.append(f"{REQUEST_DURATION}_count{_labels(request_labels)} {len(samples)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsFile(object):
+    """Rewrite ``file_name`` with the metrics of an export every ``interval`` seconds while it runs.
+
+    The file is replaced atomically so the collector never reads half of it. Once the export ends ``esxport_success``
+    and ``esxport_end_time_seconds`` are added, so failed or stalled cron runs can be alerted on.
+    """
+
+    def __init__(
+        self: Self,
+        file_name: str,
+        stats: ExportStats,
+        labels: dict[str, str],
+        interval: float = METRICS_INTERVAL,
+    ) -> None:
+        self.file_name = file_name
+        self.stats = stats
+        self.labels = labels
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="esxport-metrics", daemon=True)
+
+    def write(self: Self, *, success: bool | None = None) -> None:
+        """Replace the file with the current metrics."""
+        temp_file = Path(f"{self.file_name}.{os.getpid()}.tmp")
+        temp_file.write_text(render(self.stats, self.labels, success=success), encoding="utf-8")
+        temp_file.replace(self.file_name)
+
+    def _run(self: Self) -> None:
+        """Write the metrics until stopped."""
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def __enter__(self: Self) -> Self:
+        """Write the metrics now and every ``interval`` seconds."""
+        self.write()
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self: Self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop writing and write the outcome of the export."""
+        self._stopped.set()
+        self._thread.join()
+        self.write(success=exc_type is None)
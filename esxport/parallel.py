@@ -0,0 +1,72 @@
+"""Spread CPU-bound decoding and serialization of the temp file over worker processes."""
+
+from __future__ import annotations
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from . import codec
+from .constant import PROCESS_CHUNK_SIZE
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from concurrent.futures import Future
+
+T = TypeVar("T")
+# Workers start from a fresh interpreter, a forked worker could inherit locks held by other threads of the export
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def read_line_chunks(
+    file_name: str,
+    limit: int | None = None,
+    chunk_size: int = PROCESS_CHUNK_SIZE,
+) -> Iterator[list[bytes]]:
+    """Yield the raw lines of ``file_name`` in chunks of about ``chunk_size`` bytes, at most ``limit`` lines overall."""
+    remaining = limit
+    with Path(file_name).open(mode="rb") as file:
+        while remaining is None or remaining > 0:
+            lines = file.readlines(chunk_size)
+            if not lines:
+                return
+            if remaining is not None:
+                lines = lines[:remaining]
+                remaining -= len(lines)
+            yield lines
+
+
+def ordered_map(
+    processes: int,
+    function: Callable[..., T],
+    chunks: Iterable[list[bytes]],
+    *args: Any,
+) -> Iterator[T]:
+    """Run ``function(chunk, *args)`` on a pool of ``processes`` and yield the results in the order of ``chunks``.
+
+    At most two chunks per process are in flight so memory stays bounded however large the file is, and the caller only
+    has to write the results in sequence.
+    """
+    pending: deque[Future[T]] = deque()
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(START_METHOD)) as pool:
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(function, chunk, *args))
+                if len(pending) >= processes * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def chunk_headers(lines: list[bytes]) -> list[str]:
+    """Keys of the records in ``lines``, in order of first appearance."""
+    headers: dict[str, None] = {}
+    for line in lines:
+        if line.strip():
+            headers.update(dict.fromkeys(codec.loads(line)))
+    return list(headers)
@@ -0,0 +1,102 @@
+"""Slice ``_source`` documents out of undecoded search responses."""
+
+from __future__ import annotations
+
+import re
+from itertools import accumulate
+
+from typing_extensions import Self
+
+from . import codec
+
+SOURCE_KEY = re.compile(r'"_source"\s*:\s*')
+SCROLL_ID = re.compile(r'"_scroll_id"\s*:\s*"([^"]*)"')
+TOTAL = re.compile(r'"total"\s*:\s*(?:\{[^}]*?"value"\s*:\s*)?(\d+)')
+RAW_FILTER_PATH = "_scroll_id,hits.total,hits.hits._source"
+HITS_START = '[{"_source":'
+HIT_SEPARATOR = '},{"_source":'
+HITS_END = "}]}}"
+# Keeps nothing but quotes and braces, escaped backslashes and quotes are dropped before
+STRUCTURE = dict.fromkeys(code for code in range(128) if chr(code) not in '{}"')
+STRING = re.compile(r'"[^"]*"')
+DEPTH = {"{": 1, "}": -1}
+# Everything up to the next brace outside of a string, strings are skipped whole with their escapes
+TO_BRACE = re.compile(r'(?:[^{}"]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+
+
+def braces(text: str) -> str:
+    """The braces of ``text`` which are not part of a string."""
+    if "\\" in text:
+        text = text.replace("\\\\", "").replace('\\"', "")
+    # Dropping two quotes next to each other leaves every brace inside or outside of its string
+    return STRING.sub("", text.translate(STRUCTURE).replace('""', ""))
+
+
+def split_sources(body: str) -> list[str] | None:
+    """Cut the sources of a compact response at the hit separators.
+
+    Elasticsearch writes the response compactly, so each source ends right before the separator of the next hit. A
+    source could contain that separator only by holding a ``_source`` key itself, that is ruled out by finding as many
+    hits, counted from the braces outside of strings, as ``_source`` keys and sources. ``None`` when the cut is not
+    safe.
+    """
+    start = body.find(HITS_START)
+    if start == -1 or not body.endswith(HITS_END):
+        return None
+    hits = body[start + 1 : len(body) - len(HITS_END) + 1]
+    found = list(accumulate(map(DEPTH.__getitem__, braces(hits)))).count(0)
+    sources = body[start + len(HITS_START) : len(body) - len(HITS_END)].split(HIT_SEPARATOR)
+    return sources if found == hits.count('"_source"') == len(sources) else None
+
+
+def object_end(body: str, start: int) -> int:
+    """Index just past the JSON object starting at ``start``, found by counting braces outside of strings."""
+    depth = 0
+    position = start
+    while True:
+        match = TO_BRACE.match(body, position)
+        position = match.end() if match else position
+        if position >= len(body):
+            msg = f"Unterminated object at {start}"
+            raise ValueError(msg)
+        depth += 1 if body[position] == "{" else -1
+        position += 1
+        if depth == 0:
+            return position
+
+
+class RawPage(object):
+    """One search or scroll response requested with ``RAW_FILTER_PATH``.
+
+    The response then holds the scroll id and total followed by nothing but ``_source`` objects. The end of each
+    ``_source`` is found from the hit separators, or by counting its braces when the response does not allow that. It
+    is sliced out of the body as is without building any Python object.
+    Only the rare document spanning several lines or holding a ``_meta`` field is decoded, to write it as the decoded
+    path does.
+    """
+
+    def __init__(self: Self, body: str) -> None:
+        first = SOURCE_KEY.search(body)
+        head = body[: first.start()] if first else body
+        scroll_id = SCROLL_ID.search(head)
+        total = TOTAL.search(head)
+        self.scroll_id = scroll_id.group(1) if scroll_id else None
+        self.total = int(total.group(1)) if total else 0
+        sources = split_sources(body)
+        if sources is None:
+            sources = []
+            while first:
+                end = object_end(body, first.end())
+                sources.append(body[first.end() : end])
+                first = SOURCE_KEY.search(body, end)
+        self.sources = [self._one_line(source) for source in sources]
+
+    @staticmethod
+    def _one_line(source: str) -> str:
+        """Write ``source`` as the decoded path does when it is not already."""
+        # Documents indexed pretty printed keep their line breaks, one document has to stay on one line.
+        if "\n" in source or "\r" in source or '"_meta"' in source:
+            document = codec.loads(source)
+            document.pop("_meta", None)
+            return codec.dumps(document)
+        return source
@@ -0,0 +1,98 @@
+"""Profile an export for bug reports about its performance."""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from .constant import PROFILE_FRAMES, PROFILE_TOP
+from .strings import profile_written
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+PROFILE_MODES = ("cpu", "memory")
+
+
+@contextlib.contextmanager
+def profile(mode: str, prefix: str) -> Iterator[None]:
+    """Profile the block and write the reports next to ``prefix``, nothing is profiled without ``mode``.
+
+    ``cpu`` runs cProfile and writes ``<prefix>.pstats`` with the top functions by cumulative time in
+    ``<prefix>.profile.txt``. ``memory`` traces allocations with tracemalloc and writes the snapshot to
+    ``<prefix>.tracemalloc`` with the top allocating lines in ``<prefix>.memory.txt``. cProfile covers the calling
+    thread and the threads started in the block, such as the slices of ``--pit`` and the fetches of ``--ids-file``;
+    worker processes of ``--processes`` are never profiled.
+    """
+    if mode == "cpu":
+        with _profile_threads() as profilers:
+            yield
+        _write_cpu(profilers, prefix)
+    elif mode == "memory":
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(PROFILE_FRAMES)
+        try:
+            yield
+        finally:
+            _write_memory(tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[1], prefix)
+            if started:
+                tracemalloc.stop()
+    else:
+        yield
+
+
+@contextlib.contextmanager
+def _profile_threads() -> Iterator[list[cProfile.Profile]]:
+    """Run cProfile over the block, yielding the profilers of the calling thread and of the threads started in it.
+
+    From Python 3.12 on a profiler sees every thread. Before, it sees the thread enabling it only, so every thread
+    started in the block enables a profiler of its own on its first call.
+    """
+    profilers = [cProfile.Profile()]
+    per_thread = sys.version_info < (3, 12)
+
+    def start_thread_profiler(*_: Any) -> None:
+        profiler = cProfile.Profile()
+        profilers.append(profiler)
+        profiler.enable()
+
+    if per_thread:
+        threading.setprofile(start_thread_profiler)
+    profilers[0].enable()
+    try:
+        yield profilers
+    finally:
+        profilers[0].disable()
+        if per_thread:
+            threading.setprofile(None)
+
+
+def _write_cpu(profilers: list[cProfile.Profile], prefix: str) -> None:
+    """Write the merged stats of ``profilers`` and a report of their top functions."""
+    report = io.StringIO()
+    stats = pstats.Stats(*profilers, stream=report)
+    stats.dump_stats(f"{prefix}.pstats")
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP)
+    Path(f"{prefix}.profile.txt").write_text(report.getvalue(), encoding="utf-8")
+    logger.info(profile_written.format(mode="cpu", files=f"{prefix}.pstats, {prefix}.profile.txt"))
+
+
+def _write_memory(snapshot: tracemalloc.Snapshot, peak: int, prefix: str) -> None:
+    """Write ``snapshot`` and a report of the lines holding most memory at the end of the export."""
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),))
+    snapshot.dump(f"{prefix}.tracemalloc")
+    statistics = snapshot.statistics("lineno")
+    lines = [f"Peak traced memory: {peak / 1024**2:.1f} MiB", f"Top {PROFILE_TOP} lines by allocated size:"]
+    lines.extend(str(statistic) for statistic in statistics[:PROFILE_TOP])
+    Path(f"{prefix}.memory.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    logger.info(profile_written.format(mode="memory", files=f"{prefix}.tracemalloc, {prefix}.memory.txt"))
@@ -0,0 +1,251 @@
+"""Local HTTP API running exports on a warm worker pool."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from typing_extensions import Self
+
+from .constant import JOB_CONCURRENCY, MAPPING_TTL, MAX_FINISHED_TASKS, TASK_TTL
+from .elastic import ElasticsearchClientPool
+from .esxport import EsXport
+from .exceptions import EsXportError, ExportCancelledError, JobFileError, NoDataFoundError
+from .jobs import build_options
+from .strings import export_failed, export_not_found, output_file_busy, serving
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+EMPTY = "empty"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = {DONE, EMPTY, FAILED, CANCELLED}
+
+
+class ExportTask(object):
+    """One export submitted to the service."""
+
+    def __init__(self: Self, task_id: str, exporter: EsXport) -> None:
+        self.id = task_id
+        self.exporter = exporter
+        self.status = QUEUED
+        self.error = ""
+        self.submitted = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.future: Future[None] | None = None
+
+    @property
+    def seconds(self: Self) -> float:
+        """Time spent running."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def to_dict(self: Self) -> dict[str, Any]:
+        """Progress and throughput of the task."""
+        seconds = self.seconds
+        docs = self.exporter.rows_written
+        return {
+            "id": self.id,
+            "status": self.status,
+            "output_file": self.exporter.opts.output_file,
+            "docs": docs,
+            "total": min(self.exporter.opts.max_results, self.exporter.num_results),
+            "seconds": round(seconds, 3),
+            "docs_per_second": round(docs / seconds, 1) if seconds else 0.0,
+            "error": self.error,
+        }
+
+
+class ExportService(object):
+    """Run submitted exports on a fixed pool of workers.
+
+    Clients are shared through an ``ElasticsearchClientPool`` that also caches index mappings, so connections and
+    mappings stay warm from one request to the next. Finished tasks are forgotten ``task_ttl`` seconds after they end,
+    or sooner once more than ``max_finished`` of them are kept.
+    """
+
+    def __init__(
+        self: Self,
+        workers: int = JOB_CONCURRENCY,
+        mapping_ttl: float = MAPPING_TTL,
+        task_ttl: float = TASK_TTL,
+        max_finished: int = MAX_FINISHED_TASKS,
+    ) -> None:
+        self.clients = ElasticsearchClientPool(mapping_ttl=mapping_ttl)
+        self.tasks: dict[str, ExportTask] = {}
+        self.task_ttl = task_ttl
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="esxport-worker")
+
+    def _evict(self: Self) -> None:
+        """Drop finished tasks past ``task_ttl`` and the oldest ones beyond ``max_finished``, with the lock held."""
+        finished = sorted(
+            (task.finished, task.id)
+            for task in self.tasks.values()
+            if task.status in FINISHED and task.finished is not None
+        )
+        expired = time.time() - self.task_ttl
+        overflow = len(finished) - self.max_finished
+        for position, (finished_at, task_id) in enumerate(finished):
+            if position < overflow or finished_at < expired:
+                del self.tasks[task_id]
+
+    def list_tasks(self: Self) -> list[ExportTask]:
+        """Tasks still known to the service."""
+        with self._lock:
+            self._evict()
+            return list(self.tasks.values())
+
+    def submit(self: Self, settings: dict[str, Any]) -> ExportTask:
+        """Queue an export described by a mapping of ``CliOptions`` attributes."""
+        task_id = uuid.uuid4().hex
+        opts = build_options(task_id, settings)
+        with self._lock:
+            self._evict()
+            for task in self.tasks.values():
+                if task.status not in FINISHED and task.exporter.opts.output_file == opts.output_file:
+                    raise JobFileError(output_file_busy.format(output=opts.output_file, id=task.id))
+            task = ExportTask(task_id, EsXport(opts, es_client=self.clients.get(opts)))
+            self.tasks[task_id] = task
+            task.future = self._pool.submit(self._run, task)
+        return task
+
+    def get(self: Self, task_id: str) -> ExportTask:
+        """Return a submitted task."""
+        try:
+            with self._lock:
+                self._evict()
+                return self.tasks[task_id]
+        except KeyError as e:
+            raise KeyError(export_not_found.format(id=task_id)) from e
+
+    def cancel(self: Self, task_id: str) -> ExportTask:
+        """Cancel a queued or running task."""
+        task = self.get(task_id)
+        task.exporter.cancelled.set()
+        if task.future is not None and task.future.cancel():
+            task.status, task.finished = CANCELLED, time.time()
+        return task
+
+    def _run(self: Self, task: ExportTask) -> None:
+        """Run a task on a worker."""
+        task.status, task.started = RUNNING, time.time()
+        try:
+            task.exporter.export()
+        except NoDataFoundError:
+            task.status = EMPTY
+        except ExportCancelledError:
+            task.status = CANCELLED
+            Path(f"{task.exporter.opts.output_file}.tmp").unlink(missing_ok=True)
+        except Exception as e:  # noqa: BLE001 # report the failure through the API
+            task.status, task.error = FAILED, str(e)
+            logger.error(export_failed.format(id=task.id, exc=e))
+        else:
+            task.status = CANCELLED if task.exporter.cancelled.is_set() else DONE
+        finally:
+            task.finished = time.time()
+
+    def shutdown(self: Self) -> None:
+        """Cancel every task and stop the workers."""
+        for task in list(self.tasks.values()):
+            self.cancel(task.id)
+        self._pool.shutdown(wait=True)
+
+
+class ExportRequestHandler(BaseHTTPRequestHandler):
+    """JSON API of ``ExportServer``.
+
+    ``POST /exports`` submits an export, ``GET /exports`` lists them, ``GET /exports/<id>`` returns the progress of one
+    and ``DELETE /exports/<id>`` cancels it.
+    """
+
+    server: ExportServer
+
+    def _reply(self: Self, status: HTTPStatus, body: Any) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _task_id(self: Self) -> str | None:
+        parts = self.path.strip("/").split("/")
+        if parts[0] != "exports":
+            return None
+        return parts[1] if len(parts) == 2 else ""  # noqa: PLR2004
+
+    def do_GET(self: Self) -> None:
+        """List exports or return one."""
+        task_id = self._task_id()
+        if task_id is None:
+            self._reply(HTTPStatus.NOT_FOUND, {"error": self.path})
+        elif not task_id:
+            self._reply(HTTPStatus.OK, [task.to_dict() for task in self.server.service.list_tasks()])
+        else:
+            try:
+                self._reply(HTTPStatus.OK, self.server.service.get(task_id).to_dict())
+            except KeyError as e:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": e.args[0]})
+
+    def do_POST(self: Self) -> None:
+        """Submit an export."""
+        if self._task_id() != "":
+            self._reply(HTTPStatus.NOT_FOUND, {"error": self.path})
+            return
+        try:
+            settings = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            task = self.server.service.submit(settings)
+        except (ValueError, TypeError, KeyError, EsXportError) as e:
+            self._reply(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        else:
+            self._reply(HTTPStatus.ACCEPTED, task.to_dict())
+
+    def do_DELETE(self: Self) -> None:
+        """Cancel an export."""
+        task_id = self._task_id()
+        if not task_id:
+            self._reply(HTTPStatus.NOT_FOUND, {"error": self.path})
+            return
+        try:
+            self._reply(HTTPStatus.ACCEPTED, self.server.service.cancel(task_id).to_dict())
+        except KeyError as e:
+            self._reply(HTTPStatus.NOT_FOUND, {"error": e.args[0]})
+
+    def log_message(self: Self, format: str, *args: Any) -> None:  # noqa: A002
+        """Route access logs to loguru."""
+        logger.debug(format % args)
+
+
+class ExportServer(ThreadingHTTPServer):
+    """HTTP server exposing an ``ExportService``."""
+
+    daemon_threads = True
+
+    def __init__(self: Self, address: tuple[str, int], service: ExportService) -> None:
+        super().__init__(address, ExportRequestHandler)
+        self.service = service
+
+    def serve(self: Self) -> None:
+        """Serve until interrupted, then cancel running exports."""
+        host, port = self.server_address[:2]
+        logger.info(serving.format(host=host, port=port))
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
+            self.service.shutdown()
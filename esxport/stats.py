@@ -0,0 +1,194 @@
+"""Time the phases of an export and report its throughput."""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, TypeVar, cast
+
+from elasticsearch import ApiError
+from loguru import logger
+from typing_extensions import Self
+
+from .exceptions import ScrollExpiredError
+from .strings import stats_phase, stats_phases_header, stats_request, stats_requests_header, stats_summary
+from .tracing import span
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from opentelemetry.trace import Span
+    from tenacity import RetryCallState
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+SEARCH_PHASE = "search"  # Phase the time of every Elasticsearch request is added to
+PERCENTILES = (50, 90, 99)
+TOO_MANY_REQUESTS = 429
+
+
+def percentile(samples: list[float], rank: int) -> float:
+    """Nearest-rank percentile of ``samples``, 0 without samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(rank / 100 * len(ordered)) - 1)]
+
+
+def timed(phase: str) -> Callable[[F], F]:
+    """Add the time spent in the decorated method to ``phase`` of the instance's ``stats``."""
+
+    def decorator(function: F) -> F:
+        @wraps(function)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            with self.stats.phase(phase):
+                return function(self, *args, **kwargs)
+
+        return cast("F", wrapper)
+
+    return decorator
+
+
+def count_retry(retry_state: RetryCallState) -> None:
+    """Count a retry of a method of an object with ``stats``, used as ``before_sleep`` of tenacity."""
+    retry_state.args[0].stats.count("retries")
+
+
+class ExportStats(object):
+    """Monotonic timers of the phases of one export and latencies of its Elasticsearch requests.
+
+    Requests run from several threads with ``--ids-file``, so their times add up to more than the wall time the search
+    phase took. Time not spent in any phase is reported as ``other``.
+    """
+
+    def __init__(self: Self) -> None:
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.phases: dict[str, list[float]] = {}
+        self.requests: dict[str, list[float]] = {}
+        self.documents = 0
+        self.nbytes = 0
+        self.last_progress = time.time()
+        self.counters = {"retries": 0, "throttled": 0, "scroll_expired": 0}
+        self._lock = threading.Lock()
+
+    def count(self: Self, counter: str) -> None:
+        """Add one to ``counter``."""
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _add(self: Self, phase: str, seconds: float) -> None:
+        """Add one call of ``seconds`` to ``phase``."""
+        with self._lock:
+            totals = self.phases.setdefault(phase, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+
+    @contextmanager
+    def phase(self: Self, name: str) -> Iterator[None]:
+        """Time the block as part of phase ``name``, in a span of the same name."""
+        start = time.perf_counter()
+        try:
+            with span(f"esxport.{name}"):
+                yield
+        finally:
+            self._add(name, time.perf_counter() - start)
+
+    @contextmanager
+    def request(self: Self, name: str, attributes: dict[str, Any] | None = None) -> Iterator[Span | None]:
+        """Time the block as an Elasticsearch request of kind ``name``, part of the search phase.
+
+        The block runs in a span with ``attributes``, which is yielded so the response can be described on it.
+        """
+        start = time.perf_counter()
+        try:
+            request_attributes = {"db.system": "elasticsearch", "db.operation": name, **(attributes or {})}
+            with span(f"elasticsearch.{name}", request_attributes) as current:
+                yield current
+        except ScrollExpiredError:
+            self.count("scroll_expired")
+            raise
+        except ApiError as e:
+            if e.status_code == TOO_MANY_REQUESTS:
+                self.count("throttled")
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self._add(SEARCH_PHASE, seconds)
+            with self._lock:
+                self.requests.setdefault(name, []).append(seconds)
+
+    def observe(self: Self, documents: int, nbytes: int) -> None:
+        """Count documents and their JSON bytes written to the temp file."""
+        with self._lock:
+            self.documents += documents
+            self.nbytes += nbytes
+            self.last_progress = time.time()
+
+    def snapshot(self: Self) -> dict[str, Any]:
+        """Copy of the counters and request latencies, consistent while other threads keep recording."""
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "nbytes": self.nbytes,
+                "last_progress": self.last_progress,
+                "counters": dict(self.counters),
+                "requests": {name: list(samples) for name, samples in self.requests.items()},
+            }
+
+    def report(self: Self, documents: int, output_bytes: int) -> dict[str, Any]:
+        """Summary of the export of ``documents`` into an output of ``output_bytes``."""
+        seconds = time.perf_counter() - self.started
+        phases = {name: {"seconds": total, "calls": int(calls)} for name, (total, calls) in self.phases.items()}
+        # Requests of several threads can overlap, only wall time not in any phase is left over.
+        phases["other"] = {"seconds": max(0.0, seconds - sum(total for total, _ in self.phases.values())), "calls": 0}
+        requests = {
+            name: {
+                "count": len(samples),
+                **{f"p{rank}": percentile(samples, rank) for rank in PERCENTILES},
+                "max": max(samples),
+            }
+            for name, samples in self.requests.items()
+        }
+        return {
+            "seconds": seconds,
+            "documents": documents,
+            "temp_bytes": self.nbytes,
+            "output_bytes": output_bytes,
+            "docs_per_second": documents / seconds if seconds else 0.0,
+            "mb_per_second": output_bytes / 1024**2 / seconds if seconds else 0.0,
+            "phases": phases,
+            "requests": requests,
+        }
+
+    @staticmethod
+    def log(report: dict[str, Any]) -> None:
+        """Log ``report`` as tables."""
+        logger.info(
+            stats_summary.format(
+                documents=report["documents"],
+                mb=report["output_bytes"] / 1024**2,
+                seconds=report["seconds"],
+                docs_per_second=report["docs_per_second"],
+                mb_per_second=report["mb_per_second"],
+            ),
+        )
+        logger.info(stats_phases_header)
+        for name, phase in report["phases"].items():
+            share = phase["seconds"] / report["seconds"] * 100 if report["seconds"] else 0.0
+            logger.info(stats_phase.format(phase=name, seconds=phase["seconds"], share=share, calls=phase["calls"]))
+        if report["requests"]:
+            logger.info(stats_requests_header)
+        for name, request in report["requests"].items():
+            milliseconds = {key: value * 1000 for key, value in request.items() if key != "count"}
+            logger.info(stats_request.format(request=name, count=request["count"], **milliseconds))
+
+    @staticmethod
+    def save(report: dict[str, Any], file_name: str) -> None:
+        """Write ``report`` as JSON to ``file_name``."""
+        Path(file_name).write_text(json.dumps(report, indent=2), encoding="utf-8")
@@ -0,0 +1,123 @@
+"""Parse search responses while they are downloaded."""
+
+from __future__ import annotations
+
+import codecs
+import re
+from typing import TYPE_CHECKING, Any
+
+from typing_extensions import Self
+
+from . import codec
+from .passthrough import SCROLL_ID, TOTAL
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+HITS_ARRAY = re.compile(r'"hits"\s*:\s*\[')
+SEPARATORS = re.compile(r"[\s,]*")
+STREAM_FILTER_PATH = "_scroll_id,hits.total,hits.hits"
+# Everything up to the next brace or quote
+OUTSIDE_STRING = re.compile(r'[^{}"]*')
+# The rest of a string with its closing quote, or as much of it as has been read when the quote group is empty
+STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*("?)')
+
+
+class StreamingPage(object):
+    """A search or scroll response requested with ``STREAM_FILTER_PATH`` and parsed one hit at a time.
+
+    Only the scroll id and total are read up front. Hits are decoded from the body as it arrives, so memory holds one
+    chunk of the body and one hit instead of the whole page, however large ``scroll_size`` and the documents are.
+    """
+
+    def __init__(self: Self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._done = False
+        self.count = 0
+        while not (match := HITS_ARRAY.search(self._buffer)) and self._read():
+            pass
+        head = self._buffer[: match.start()] if match else self._buffer
+        scroll_id = SCROLL_ID.search(head)
+        total = TOTAL.search(head)
+        self.scroll_id = scroll_id.group(1) if scroll_id else None
+        self.total = int(total.group(1)) if total else 0
+        self._in_hits = match is not None
+        self._pos = match.end() if match else len(self._buffer)
+
+    def _read(self: Self) -> bool:
+        """Append the next chunk of the body to the buffer and drop what was parsed, ``False`` once it is consumed."""
+        if self._done:
+            return False
+        chunk = next(self._chunks, None)
+        self._done = chunk is None
+        text = self._decoder.decode(chunk or b"", final=self._done)
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return not self._done or bool(text)
+
+    def _skip_separators(self: Self) -> str:
+        """Move past whitespace and commas and return the next character, empty at the end of the body."""
+        while True:
+            self._pos = SEPARATORS.match(self._buffer, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                return ""
+
+    def _decode_hit(self: Self) -> Any:
+        """Decode the hit at the cursor, reading more of the body until it is complete.
+
+        The braces of the hit are counted as the body arrives, each chunk is scanned once and the hit is decoded once
+        however many chunks it spans.
+        """
+        end = self._pos
+        depth = 0
+        in_string = False
+        while True:
+            while end < len(self._buffer):
+                if in_string:
+                    string = STRING_REST.match(self._buffer, end)
+                    end = string.end()  # type: ignore[union-attr]
+                    if not string.group(1):  # type: ignore[union-attr]
+                        break
+                    in_string = False
+                    continue
+                end = OUTSIDE_STRING.match(self._buffer, end).end()  # type: ignore[union-attr]
+                if end == len(self._buffer):
+                    break
+                character = self._buffer[end]
+                end += 1
+                if character == '"':
+                    in_string = True
+                    continue
+                depth += 1 if character == "{" else -1
+                if depth == 0:
+                    hit = codec.loads(self._buffer[self._pos : end])
+                    self._pos = end
+                    return hit
+            start = self._pos
+            if not self._read():
+                msg = f"Unterminated hit {self.count + 1}"
+                raise ValueError(msg)
+            end -= start
+
+    def hits(self: Self) -> Iterator[dict[str, Any]]:
+        """Yield the hits of the page as they are parsed."""
+        while self._in_hits:
+            next_character = self._skip_separators()
+            if next_character in {"]", ""}:
+                self._in_hits = False
+                return
+            hit = self._decode_hit()
+            self.count += 1
+            yield hit
+
+    def close(self: Self) -> None:
+        """Release the connection, also when the page was not read to the end."""
+        self._in_hits = False
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
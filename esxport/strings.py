@@ -8,5 +8,74 @@ sorting_by = "Sorting by: {sort}."
 meta_field_not_found = "Meta Field {field} not found"
 invalid_sort_format = 'Invalid input format: "{value}". Use the format "field:sort_order".'
 invalid_query_format = "{value} is not a valid json string, caused {exc}"
+invalid_size_format = "Invalid size {value}. Use a number of bytes, optionally followed by K, M, G or T."
 cli_version = "EsXport Cli {__version__}"
 query_key_missing = "Query key not found."
+state_file_invalid = "State file {file} is not valid, caused {exc}"
+state_field_mismatch = "State file {file} tracks field {stored}, not {field}."
+incremental_requires_state_file = "--incremental-field requires --state-file unless --follow is used."
+incremental_not_sliced = (
+    "--incremental-field can not be combined with --slices, slices are interleaved and not sorted on the field."
+)
+follow_requires_incremental_field = "--follow requires --incremental-field to know which documents are new."
+following = "Following {field} every {interval}s. Press Ctrl+C to stop."
+follow_stopped = "Stopped following. {rows} documents appended."
+using_watermark = "Resuming {field} from {value} (excluding {count} already exported ids)."
+job_file_invalid = "Job file {file} is not valid, caused {exc}"
+job_file_missing_key = "Job {name} is missing required key {key}."
+job_file_duplicate_output = "Job {name} writes to {output} which is used by another job."
+job_not_mapping = "Job {name} must be a mapping of options."
+job_query_not_object = "query must be a JSON object."
+job_failed = "Job {name} failed: {exc}"
+job_finished = "Job {name} finished ({status}): {docs} docs in {seconds:.1f}s."
+job_report_header = f"{'job':<30} {'status':<8} {'attempts':>8} {'docs':>12} {'seconds':>10} {'docs/s':>12}"
+job_report_row = "{name:<30} {status:<8} {attempts:>8} {docs:>12} {seconds:>10.1f} {rate:>12.1f}"
+export_cancelled = "Export to {file} was cancelled."
+export_not_found = "Export {id} not found."
+export_failed = "Export {id} failed: {exc}"
+output_file_busy = "Output file {output} is in use by export {id}."
+serving = "Serving exports on http://{host}:{port}/exports. Press Ctrl+C to stop."
+fake_es_serving = "Serving {documents} fake documents in index {index} on {url}. Press Ctrl+C to stop."
+estimate_documents = (
+    "Estimate: {documents} documents to export of {matched} matching, index holds {index_documents} documents in "
+    "{store:.1f} MB, sized from {sample} sampled documents."
+)
+estimate_output = "Estimate: CSV output {csv:.1f} MB, NDJSON output {ndjson:.1f} MB, temp file {temp:.1f} MB."
+estimate_disk = "Estimate: a {export_format} export needs {disk:.1f} MB free next to the output."
+estimate_duration = "Estimate: about {seconds:.0f}s over {pages} pages."
+pit_not_supported = "--pit can not be combined with {option}."
+slices_require_pit = "--slices requires --pit."
+using_pit = "Reading {indexes} at one point in time in {slices} slices."
+estimate_not_supported = "--estimate can not be combined with {option}."
+insufficient_disk_space = "{directory} has {free:.1f} MB free but the export needs about {needed:.1f} MB."
+bench_probe = "Probed page size {size}, {slices} slices: {rate:.0f} docs/s."
+bench_probe_failed = "Probe of page size {size}, {slices} slices failed: {exc}"
+bench_report_header = f"{'size':>6} {'slices':>6} {'docs':>10} {'docs/s':>10} {'bytes/doc':>10} {'took ms':>8} status"
+bench_report_row = "{size:>6} {slices:>6} {docs:>10} {rate:>10.0f} {bytes_per_doc:>10.0f} {took:>8.1f} {status}"
+bench_recommendation = "Recommended: {flags} ({rate:.0f} docs/s)."
+aggregate_sources_missing = "Aggregation sources key not found."
+exclusive_modes = "Only one of {options} can be used at a time."
+mode_not_incremental = "{option} can not be combined with --incremental-field/--follow."
+using_esql = "Using ES|QL query: {query}."
+async_query_timed_out = "Async query {id} was still running after {seconds} seconds and was deleted."
+ids_single_index = "--ids-file with a --query other than match_all, or several indexes, falls back to ids searches."
+ids_file_not_found = "--ids-file {file} does not exist."
+ids_missing = "{count} ids were not found, listed in {file}."
+lookup_key_missing = "--lookup requires the {key} key."
+lookup_not_supported = "--lookup can not be combined with {option}."
+stream_not_supported = "--stream can not be combined with {option}."
+memory_page_size = "--max-memory lowers the page size from {size} to {bounded} documents of about {document} bytes."
+transform_not_found = "Transform {name} not found. Available transforms: {available}."
+transform_invalid = "Transform {name} is not configured correctly, caused {exc}"
+transform_not_supported = "--transform can not be combined with --esql."
+transform_timing = "Transform {name}: {records} records in {seconds:.3f}s."
+profile_written = "Wrote the {mode} profile to {files}."
+tracing_not_installed = "--trace needs the OpenTelemetry SDK, pip install esxport[otel]."
+stats_summary = (
+    "Exported {documents} documents, {mb:.1f} MB in {seconds:.3f}s: "
+    "{docs_per_second:.0f} docs/s, {mb_per_second:.2f} MB/s."
+)
+stats_phases_header = "phase        seconds   share   calls"
+stats_phase = "{phase:<10} {seconds:>9.3f} {share:>6.1f}% {calls:>7}"
+stats_requests_header = "request      count    p50 ms    p90 ms    p99 ms    max ms"
+stats_request = "{request:<10} {count:>7} {p50:>9.1f} {p90:>9.1f} {p99:>9.1f} {max:>9.1f}"
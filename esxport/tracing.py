@@ -0,0 +1,93 @@
+"""Optional OpenTelemetry spans around the phases and requests of an export.
+
+Spans go to the tracer provider of the application when the OpenTelemetry API is installed, so esxport used as a
+library joins the traces of its caller. ``--trace`` exports them without a collector, to a file of JSON lines or to
+standard output, which needs the SDK (``pip install esxport[otel]``). Without OpenTelemetry every span is a no-op.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import sys
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import ConfigurationError
+from .strings import tracing_not_installed
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - exercised when OpenTelemetry is not installed
+    trace = None
+
+try:
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+except ImportError:  # pragma: no cover - exercised when the OpenTelemetry SDK is not installed
+    TracerProvider = None
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from opentelemetry.trace import Span, Tracer
+
+SERVICE_NAME = "esxport"
+STDOUT = "-"
+
+_tracer: ContextVar[Tracer | None] = ContextVar("esxport_tracer", default=None)
+
+
+@contextlib.contextmanager
+def span(name: str, attributes: dict[str, Any] | None = None) -> Iterator[Span | None]:
+    """Run the block in a span named ``name``, ``None`` is yielded when OpenTelemetry is not installed."""
+    if trace is None:  # pragma: no cover - exercised when OpenTelemetry is not installed
+        yield None
+        return
+    tracer = _tracer.get() or trace.get_tracer(__name__)
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def annotate(current: Span | None, attributes: dict[str, Any]) -> None:
+    """Add the attributes which are not ``None`` to ``current``."""
+    if current is not None:
+        current.set_attributes({key: value for key, value in attributes.items() if value is not None})
+
+
+@contextlib.contextmanager
+def export_spans(file_name: str) -> Iterator[None]:
+    """Export the spans started in the block to ``file_name``, one JSON span per line, or to stdout for ``-``."""
+    if not file_name:
+        yield
+        return
+    if TracerProvider is None:  # pragma: no cover - exercised when the OpenTelemetry SDK is not installed
+        raise ConfigurationError(tracing_not_installed)
+    with contextlib.ExitStack() as stack:
+        out = sys.stdout if file_name == STDOUT else stack.enter_context(Path(file_name).open("a", encoding="utf-8"))
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda finished: finished.to_json(indent=None) + "\n")
+        provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        token = _tracer.set(provider.get_tracer(__name__))
+        try:
+            yield
+        finally:
+            _tracer.reset(token)
+            provider.shutdown()
+
+
+def describe_response(current: Span | None, response: Any) -> None:
+    """Add the ``took`` and hit count of a decoded search response to ``current``."""
+    body = getattr(response, "body", response)
+    if current is None or not isinstance(body, dict):
+        return
+    hits = body.get("hits", {}).get("hits")
+    annotate(
+        current,
+        {
+            "elasticsearch.took_ms": body.get("took"),
+            "elasticsearch.hits": len(hits) if isinstance(hits, list) else None,
+            "elasticsearch.timed_out": body.get("timed_out"),
+        },
+    )
@@ -0,0 +1,143 @@
+"""Batch transforms applied to records before they are spilled to the temp file."""
+
+from __future__ import annotations
+
+import time
+from importlib.metadata import EntryPoint, entry_points
+from typing import Any, Protocol
+
+from loguru import logger
+from typing_extensions import Self
+
+from .constant import TRANSFORM_ENTRY_POINT
+from .exceptions import ConfigurationError
+from .strings import transform_invalid, transform_not_found, transform_timing
+
+Records = list[dict[str, Any]]
+
+
+class Transform(Protocol):
+    """A transform receives a whole batch of records and returns the transformed batch.
+
+    Working on batches lets a transform resolve, vectorize or cache whatever it needs once per batch instead of once
+    per record. Records may be modified in place.
+    """
+
+    def __call__(self: Self, records: Records) -> Records:
+        """Transform a batch of records."""
+        ...
+
+
+class Rename(object):
+    """Rename fields, ``{"name": "rename", "fields": {"old": "new"}}``."""
+
+    def __init__(self: Self, fields: dict[str, str]) -> None:
+        self.fields = fields
+
+    def __call__(self: Self, records: Records) -> Records:
+        """Rename the fields of every record."""
+        for record in records:
+            for old, new in self.fields.items():
+                if old in record:
+                    record[new] = record.pop(old)
+        return records
+
+
+class Drop(object):
+    """Drop fields, ``{"name": "drop", "fields": ["secret"]}``."""
+
+    def __init__(self: Self, fields: list[str]) -> None:
+        self.fields = fields
+
+    def __call__(self: Self, records: Records) -> Records:
+        """Drop the fields of every record."""
+        for record in records:
+            for field in self.fields:
+                record.pop(field, None)
+        return records
+
+
+class Mask(object):
+    """Mask all but the last ``keep`` characters of fields, ``{"name": "mask", "fields": ["card"], "keep": 4}``."""
+
+    def __init__(self: Self, fields: list[str], keep: int = 4, char: str = "*") -> None:
+        self.fields = fields
+        self.keep = keep
+        self.char = char
+
+    def __call__(self: Self, records: Records) -> Records:
+        """Mask the fields of every record."""
+        for record in records:
+            for field in self.fields:
+                value = record.get(field)
+                if value is None:
+                    continue
+                text = str(value)
+                hidden = max(len(text) - self.keep, 0)
+                record[field] = self.char * hidden + text[hidden:]
+        return records
+
+
+BUILTIN_TRANSFORMS: dict[str, Any] = {"rename": Rename, "drop": Drop, "mask": Mask}
+
+
+def available_transforms() -> dict[str, Any]:
+    """Built-in transforms and the ones installed under the ``esxport.transforms`` entry point group."""
+    transforms = {entry_point.name: entry_point for entry_point in entry_points(group=TRANSFORM_ENTRY_POINT)}
+    return {**transforms, **BUILTIN_TRANSFORMS}
+
+
+class TimedTransform(object):
+    """A configured transform and the time it took so far."""
+
+    def __init__(self: Self, name: str, transform: Transform) -> None:
+        self.name = name
+        self.transform = transform
+        self.records = 0
+        self.seconds = 0.0
+
+    def __call__(self: Self, records: Records) -> Records:
+        """Run the transform and account for its time."""
+        started = time.perf_counter()
+        records = self.transform(records)
+        self.seconds += time.perf_counter() - started
+        self.records += len(records)
+        return records
+
+
+class TransformPipeline(object):
+    """Transforms configured with ``--transform``, run in order on every batch of records."""
+
+    def __init__(self: Self, specs: list[dict[str, Any]]) -> None:
+        self.transforms: list[TimedTransform] = []
+        available = available_transforms() if specs else {}
+        for spec in specs:
+            config = dict(spec)
+            name = str(config.pop("name", ""))
+            if name not in available:
+                raise ConfigurationError(transform_not_found.format(name=name, available=", ".join(sorted(available))))
+            factory = available[name]
+            if isinstance(factory, EntryPoint):
+                factory = factory.load()
+            try:
+                transform = factory(**config)
+            except TypeError as e:
+                raise ConfigurationError(transform_invalid.format(name=name, exc=e)) from e
+            self.transforms.append(TimedTransform(name, transform))
+
+    def __bool__(self: Self) -> bool:
+        """Whether any transform is configured."""
+        return bool(self.transforms)
+
+    def __call__(self: Self, records: Records) -> Records:
+        """Run every transform on a batch of records."""
+        for transform in self.transforms:
+            records = transform(records)
+        return records
+
+    def report(self: Self) -> None:
+        """Log the time spent in each transform."""
+        for transform in self.transforms:
+            logger.info(
+                transform_timing.format(name=transform.name, records=transform.records, seconds=transform.seconds),
+            )
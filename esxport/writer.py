@@ -3,19 +3,34 @@
 from __future__ import annotations
 
 import csv
+import io
 import json
+import shutil
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from tqdm import tqdm
 from typing_extensions import NotRequired, TypedDict, Unpack
 
+from . import codec
+from .constant import PROCESS_CHUNK_SIZE
+from .parallel import ordered_map, read_line_chunks
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# Nested CSV cells keep the spaced, ASCII escaped form of ``json.dumps`` whichever codec is installed
+CELL_ENCODER = json.JSONEncoder(default=str)
+
 
 class WriterParams(TypedDict):
     """Writer parameters."""
 
     output_format: NotRequired[str]
     delimiter: NotRequired[str]
+    append: NotRequired[bool]
+    processes: NotRequired[int]
+    chunk_size: NotRequired[int]
 
 
 class Writer(object):
@@ -31,7 +46,39 @@ class Writer(object):
         """Write data to output file."""
         output_format = kwargs.get("output_format", "csv")
         if output_format == "csv":
-            Writer._write_to_csv(total_records, out_file, headers, str(kwargs.get("delimiter", ",")))
+            Writer._write_to_csv(
+                total_records,
+                out_file,
+                headers,
+                str(kwargs.get("delimiter", ",")),
+                append=kwargs.get("append", False),
+                processes=kwargs.get("processes", 0),
+                chunk_size=kwargs.get("chunk_size", PROCESS_CHUNK_SIZE),
+            )
+        elif output_format == "ndjson":
+            Writer._write_to_ndjson(out_file, append=kwargs.get("append", False))
+        else:
+            msg = f"Format {output_format} is not supported"
+            raise NotImplementedError(msg)
+
+    @staticmethod
+    def write_columns(
+        out_file: str,
+        headers: list[str],
+        columns: list[list[Any]],
+        **kwargs: Unpack[WriterParams],
+    ) -> None:
+        """Write column arrays, such as an ES|QL columnar result, to the output file, NDJSON has one object per row."""
+        output_format = kwargs.get("output_format", "csv")
+        if output_format == "csv":
+            with Path(out_file).open(mode="w", encoding="utf-8", newline="") as output_file:
+                delimiter = str(kwargs.get("delimiter", ","))
+                csv_writer = csv.writer(output_file, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL)
+                csv_writer.writerow(headers)
+                csv_writer.writerows(zip(*(map(Writer._serialize_csv_value, column) for column in columns)))
+        elif output_format == "ndjson":
+            with Path(out_file).open(mode="w", encoding="utf-8") as output_file:
+                output_file.writelines(f"{codec.dumps(dict(zip(headers, row)))}\n" for row in zip(*columns))
         else:
             msg = f"Format {output_format} is not supported"
             raise NotImplementedError(msg)
@@ -42,36 +89,81 @@ class Writer(object):
         if value is None:
             return ""
         if isinstance(value, (dict, list)):
-            return json.dumps(value, default=str)
+            return CELL_ENCODER.encode(value)
         return str(value)
 
     @staticmethod
-    def _write_to_csv(total_records: int, out_file: str, headers: list[str], delimiter: str) -> None:
-        """Write content to CSV file."""
+    def _write_to_ndjson(out_file: str, *, append: bool = False) -> None:
+        """Move the temp file, which already holds one JSON document per line, to the output file."""
+        temp_file = Path(f"{out_file}.tmp")
+        if append:
+            with Path(out_file).open(mode="ab") as output_file, temp_file.open(mode="rb") as file:
+                shutil.copyfileobj(file, output_file)
+            temp_file.unlink()
+        else:
+            temp_file.replace(out_file)
+
+    @staticmethod
+    def csv_rows(rows: Iterable[dict[str, Any]], headers: list[str], delimiter: str) -> str:
+        """Serialize documents to the CSV rows the export writes for them, without the header."""
+        buffer = io.StringIO()
+        csv_writer = csv.writer(buffer, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL)
+        for row in rows:
+            csv_writer.writerow([Writer._serialize_csv_value(row.get(header)) for header in headers])
+        return buffer.getvalue()
+
+    @staticmethod
+    def _csv_chunk(lines: list[bytes], headers: list[str], delimiter: str) -> tuple[int, str]:
+        """Decode a chunk of temp file lines and serialize it to CSV rows, in a worker process."""
+        return len(lines), Writer.csv_rows(map(codec.loads, lines), headers, delimiter)
+
+    @staticmethod
+    def _write_to_csv(  # noqa: PLR0913
+        total_records: int,
+        out_file: str,
+        headers: list[str],
+        delimiter: str,
+        *,
+        append: bool = False,
+        processes: int = 0,
+        chunk_size: int = PROCESS_CHUNK_SIZE,
+    ) -> None:
+        """Write content to CSV file, appending rows below the existing header if ``append`` is set.
+
+        With more than one of ``processes`` the temp file is decoded and serialized by worker processes in chunks of
+        raw lines of about ``chunk_size`` bytes, this process only writes the finished chunks in order.
+        """
         temp_file = f"{out_file}.tmp"
-        with Path(out_file).open(mode="w", encoding="utf-8", newline="") as output_file:
+        with Path(out_file).open(mode="a" if append else "w", encoding="utf-8", newline="") as output_file:
             csv_writer = csv.DictWriter(
                 output_file,
                 fieldnames=headers,
                 delimiter=delimiter,
                 quoting=csv.QUOTE_MINIMAL,
             )
-            csv_writer.writeheader()
+            if not append:
+                csv_writer.writeheader()
             bar = tqdm(
                 desc=out_file,
                 total=total_records,
                 unit="docs",
                 colour="green",
             )
-            with Path(temp_file).open(encoding="utf-8") as file:
-                for line_number, line in enumerate(file, start=1):
-                    if line_number > total_records:
-                        break
-                    bar.update(1)
-                    row = json.loads(line)
-                    csv_writer.writerow(
-                        {header: Writer._serialize_csv_value(row.get(header)) for header in headers},
-                    )
+            if processes > 1:
+                chunks = read_line_chunks(temp_file, total_records, chunk_size)
+                for count, text in ordered_map(processes, Writer._csv_chunk, chunks, headers, delimiter):
+                    output_file.write(text)
+                    bar.update(count)
+            else:
+                with Path(temp_file).open(encoding="utf-8") as file:
+                    for line_number, line in enumerate(file, start=1):
+                        if line_number > total_records:
+                            break
+                        bar.update(1)
+                        row = codec.loads(line)
+                        csv_writer.writerow(
+                            {header: Writer._serialize_csv_value(row.get(header)) for header in headers},
+                        )
 
             bar.close()
         Path(temp_file).unlink(missing_ok=True)
@@ -0,0 +1 @@
+"""Benchmark test cases."""
@@ -0,0 +1,70 @@
+"""Compare the JSON codecs on the hot paths of an export.
+
+Usage: python -m test.benchmark.bench_codec [documents]
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import string
+import sys
+import timeit
+from typing import Any, Callable
+
+from esxport import codec
+
+REPEAT = 5
+
+
+def make_document(position: int) -> dict[str, Any]:
+    """A log-like document with nested values."""
+    return {
+        "@timestamp": f"2024-01-01T00:{position % 60:02d}:00Z",
+        "message": "".join(random.choices(string.ascii_letters + " ", k=300)),  # noqa: S311
+        "host": {"name": f"host-{position % 50}", "ip": "10.0.0.1"},
+        "tags": ["web", "prod", str(position % 7)],
+        "bytes": position * 17,
+        "duration": position / 3,
+    }
+
+
+def best(function: Callable[[], Any]) -> float:
+    """Best wall time of ``REPEAT`` runs."""
+    return min(timeit.repeat(function, number=1, repeat=REPEAT))
+
+
+def main(documents: int) -> None:
+    """Time the stdlib and orjson codecs and print the speed-up of each path."""
+    if codec.NAME != "orjson":
+        sys.exit("orjson is not installed, pip install esxport[fast]")
+    hits: list[dict[str, Any]] = [
+        {"_index": "logs", "_id": str(i), "_source": make_document(i)} for i in range(documents)
+    ]
+    response = json.dumps({"hits": {"total": {"value": documents}, "hits": hits}}).encode("utf-8")
+    lines = [codec.dumps(hit["_source"]) for hit in hits]
+    nested = [hit["_source"]["host"] for hit in hits]
+
+    paths: dict[str, tuple[Callable[[], Any], Callable[[], Any]]] = {
+        "decode response": (lambda: json.loads(response), lambda: codec.orjson_loads(response)),
+        "flush to temp file": (
+            lambda: [codec.json_dumps(hit["_source"]) for hit in hits],
+            lambda: [codec.orjson_dumps(hit["_source"]) for hit in hits],
+        ),
+        "read temp file": (
+            lambda: [codec.json_loads(line) for line in lines],
+            lambda: [codec.orjson_loads(line) for line in lines],
+        ),
+        "nested CSV values": (
+            lambda: [codec.json_dumps(value) for value in nested],
+            lambda: [codec.orjson_dumps(value) for value in nested],
+        ),
+    }
+    print(f"{'path':<20} {'json (s)':>10} {'orjson (s)':>11} {'speed-up':>9}")  # noqa: T201
+    for name, (stdlib, fast) in paths.items():
+        stdlib_time, fast_time = best(stdlib), best(fast)
+        print(f"{name:<20} {stdlib_time:>10.3f} {fast_time:>11.3f} {stdlib_time / fast_time:>8.1f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,144 @@
+"""Benchmarks of the hot paths of an export."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from esxport import CliOptions, EsXport, codec
+from esxport.fake_es import FakeCluster
+from esxport.writer import Writer
+
+if TYPE_CHECKING:
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+    from esxport.fake_es import FakeElasticsearch
+    from test.benchmark.conftest import RegressionGate
+    from test.conftest import Exporter
+
+DOCUMENTS = 5000
+ROUNDS = 10
+cluster = FakeCluster(documents=DOCUMENTS, document_size=512)
+lines = "".join(f"{codec.dumps(cluster.source(position))}\n" for position in range(DOCUMENTS))
+
+
+def hits() -> list[dict[str, Any]]:
+    """Search hits of every document, new ones for each round as flushing changes them."""
+    return [cluster.hit(position, None) for position in range(DOCUMENTS)]
+
+
+@pytest.fixture
+def fake_cluster() -> FakeCluster:
+    """Documents of the fake server, the benchmark documents."""
+    return cluster
+
+
+@pytest.fixture
+def offline_exporter(tmp_path: Path) -> EsXport:
+    """Exporter of the fake index writing to ``tmp_path``, its client is never called."""
+    options = CliOptions(
+        {
+            "query": {"query": {"match_all": {}}},
+            "output_file": str(tmp_path / "bench.csv"),
+            "index_prefixes": [cluster.index],
+            "url": "http://127.0.0.1:9299",
+            "password": "password",
+        },
+    )
+    with patch("esxport.esxport.ElasticsearchClient"):
+        return EsXport(options)
+
+
+@pytest.fixture
+def temp_file(offline_exporter: EsXport) -> str:
+    """Temp file of the offline exporter holding every document."""
+    file_name = f"{offline_exporter.opts.output_file}.tmp"
+    Path(file_name).write_text(lines, encoding="utf-8")
+    return file_name
+
+
+def test_flush_to_file(benchmark: BenchmarkFixture, regression_gate: RegressionGate, offline_exporter: EsXport) -> None:
+    """Encode hits into the temp file."""
+    temp_file = Path(f"{offline_exporter.opts.output_file}.tmp")
+
+    def setup() -> tuple[tuple[list[dict[str, Any]]], dict[str, Any]]:
+        temp_file.unlink(missing_ok=True)
+        return (hits(),), {}
+
+    benchmark.pedantic(offline_exporter._flush_to_file, setup=setup, rounds=ROUNDS, warmup_rounds=1)
+
+    (batch,), _ = setup()
+    regression_gate.check(benchmark, DOCUMENTS, lambda: offline_exporter._flush_to_file(batch))
+    assert temp_file.read_text(encoding="utf-8").count("\n") == DOCUMENTS
+
+
+@pytest.mark.usefixtures("temp_file")
+def test_extract_headers(
+    benchmark: BenchmarkFixture,
+    regression_gate: RegressionGate,
+    offline_exporter: EsXport,
+) -> None:
+    """Collect the CSV headers of the temp file."""
+    headers = benchmark.pedantic(offline_exporter._extract_headers, rounds=ROUNDS, warmup_rounds=1)
+
+    regression_gate.check(benchmark, DOCUMENTS, offline_exporter._extract_headers)
+    assert headers == list(cluster.source(0))
+
+
+def test_write_to_csv(
+    benchmark: BenchmarkFixture,
+    regression_gate: RegressionGate,
+    offline_exporter: EsXport,
+    temp_file: str,
+) -> None:
+    """Convert the temp file to CSV."""
+    out_file = offline_exporter.opts.output_file
+    headers = list(cluster.source(0))
+
+    def setup() -> None:
+        Path(temp_file).write_text(lines, encoding="utf-8")
+
+    def write() -> None:
+        Writer._write_to_csv(DOCUMENTS, out_file, headers, ",")
+
+    benchmark.pedantic(write, setup=setup, rounds=ROUNDS, warmup_rounds=1)
+
+    setup()
+    regression_gate.check(benchmark, DOCUMENTS, write)
+    assert Path(out_file).read_text(encoding="utf-8").count("\n") == DOCUMENTS + 1
+
+
+def test_serialize_csv_value(benchmark: BenchmarkFixture, regression_gate: RegressionGate) -> None:
+    """Serialize the field values of every document."""
+    values = [value for hit in hits() for value in hit["_source"].values()] + [None] * DOCUMENTS
+
+    def serialize() -> list[str]:
+        return [Writer._serialize_csv_value(value) for value in values]
+
+    serialized = benchmark.pedantic(serialize, rounds=ROUNDS, warmup_rounds=1)
+
+    regression_gate.check(benchmark, DOCUMENTS, serialize)
+    assert serialized[: len(cluster.source(0))][-1] == json.dumps(cluster.source(0)["tags"])
+
+
+def test_export(
+    benchmark: BenchmarkFixture,
+    regression_gate: RegressionGate,
+    fake_es: FakeElasticsearch,
+    exporter: Exporter,
+    tmp_path: Path,
+) -> None:
+    """Export every document of the fake server to CSV."""
+    out_file = tmp_path / "export.csv"
+
+    def export() -> None:
+        exporter(fake_es, out_file, scroll_size=1000).export()
+
+    benchmark.pedantic(export, rounds=3, warmup_rounds=1)
+
+    regression_gate.check(benchmark, DOCUMENTS, export)
+    assert out_file.read_text(encoding="utf-8").count("\n") == DOCUMENTS + 1
@@ -0,0 +1,98 @@
+"""Regression gates of the benchmarks against the baselines stored next to them.
+
+Timings come from pytest-benchmark. Absolute speed depends on the machine, so throughput is compared relative to a
+fixed reference workload timed right after each benchmark, the same code runs about as many times faster on a
+faster or less busy runner. Peak memory is traced once per benchmark outside the timed rounds. Run with
+``--update-baselines`` to store the current results after an intended change.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from esxport import codec
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from _pytest.config import Config
+    from _pytest.config.argparsing import Parser
+    from pytest_benchmark.fixture import BenchmarkFixture
+    from typing_extensions import Self
+
+BASELINES = Path(__file__).with_name("baselines.json")
+THROUGHPUT_TOLERANCE = 0.5  # Share of the baseline throughput a benchmark may lose before failing
+MEMORY_TOLERANCE = 0.2  # Share of the baseline peak memory a benchmark may add before failing
+MEMORY_SLACK = 256 * 1024  # Bytes of peak memory always allowed on top, so small benchmarks do not flap
+REFERENCE_ROUNDS = 5
+REFERENCE_DOCUMENT = {"id": 1, "message": "reference " * 20, "tags": ["a", "b"], "nested": {"value": 1.5}}
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """Add the option storing the results as the new baselines."""
+    parser.addoption(
+        "--update-baselines",
+        action="store_true",
+        default=False,
+        help="Store the benchmark results as the new baselines instead of checking them.",
+    )
+
+
+def reference_speed() -> float:
+    """Operations per second of a fixed encode and decode loop on this machine, best of a few rounds."""
+    operations = 20000
+    best = float("inf")
+    for _ in range(REFERENCE_ROUNDS):
+        start = time.perf_counter()
+        for position in range(operations):
+            codec.loads(codec.dumps({**REFERENCE_DOCUMENT, "id": position}))
+        best = min(best, time.perf_counter() - start)
+    return operations / best
+
+
+class RegressionGate(object):
+    """Compare throughput and peak memory of benchmarks with their baselines."""
+
+    def __init__(self: Self, baselines: dict[str, dict[str, float]], *, update: bool) -> None:
+        self.baselines = baselines
+        self.update = update
+        self.results: dict[str, dict[str, float]] = {}
+
+    def check(self: Self, benchmark: BenchmarkFixture, documents: int, run: Callable[[], Any]) -> None:
+        """Check the benchmark just timed, which handled ``documents`` per round, ``run`` does one more round."""
+        if benchmark.disabled:
+            return
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        name = benchmark.name.split("[")[0]
+        throughput = documents / benchmark.stats.stats.min / reference_speed()
+        benchmark.extra_info.update({"relative_throughput": throughput, "peak_memory": peak})
+        self.results[name] = {"relative_throughput": throughput, "peak_memory": peak}
+        baseline = self.baselines.get(name)
+        if self.update or baseline is None:
+            return
+        minimum = baseline["relative_throughput"] * (1 - THROUGHPUT_TOLERANCE)
+        assert throughput >= minimum, f"{name} throughput regressed to {throughput:.4f}, baseline {minimum:.4f}"
+        maximum = baseline["peak_memory"] * (1 + MEMORY_TOLERANCE) + MEMORY_SLACK
+        assert peak <= maximum, f"{name} peak memory regressed to {peak} bytes, baseline {maximum:.0f}"
+
+
+@pytest.fixture(scope="session")
+def regression_gate(pytestconfig: Config) -> Iterator[RegressionGate]:
+    """Gate shared by the benchmarks of the session, which writes the baselines back when updating."""
+    update = bool(pytestconfig.getoption("--update-baselines"))
+    baselines = json.loads(BASELINES.read_text(encoding="utf-8")) if BASELINES.exists() else {}
+    gate = RegressionGate(baselines, update=update)
+    yield gate
+    if update and gate.results:
+        BASELINES.write_text(json.dumps({**baselines, **gate.results}, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,124 @@
+"""Bench test cases."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from click.testing import CliRunner
+
+from esxport import CliOptions
+from esxport.bench import Bench, ProbeResult, format_report, recommend
+from esxport.cli import cli
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from esxport.fake_es import FakeElasticsearch
+
+
+def options(server: FakeElasticsearch, **settings: object) -> CliOptions:
+    """Options reading the fake index."""
+    return CliOptions(
+        {
+            "query": {"query": {"match_all": {}}},
+            "output_file": "",
+            "index_prefixes": [server.cluster.index],
+            "url": server.url,
+            "password": "password",
+            **settings,
+        },
+    )
+
+
+def probe_result(page_size: int, slices: int, docs_per_second: float) -> ProbeResult:
+    """Probe result reading ``docs_per_second`` for one second."""
+    result = ProbeResult(page_size, slices)
+    result.add(int(docs_per_second), int(docs_per_second) * 100, [3, 5, 4])
+    result.seconds = 1.0
+    return result
+
+
+class TestBench:
+    """Bench test cases."""
+
+    def test_probe_reads_every_slice(self: Self, fake_es: FakeElasticsearch) -> None:
+        """Slices page a point in time to their end as ``--pit --slices`` does, then it is closed."""
+        result = Bench(options(fake_es), duration=10).probe(page_size=200, slices=4)
+
+        assert result.documents == 1000
+        assert result.bytes_per_doc > 100
+        assert len(result.took) == 4 * 2  # 200 and 50 hits for each slice
+        assert not result.error
+        assert fake_es.cluster.pits == set()
+        assert fake_es.cluster.scrolls == {}
+
+    def test_single_slice_scrolls(self: Self, fake_es: FakeElasticsearch) -> None:
+        """One slice scrolls the fields to export as a plain export does, then the scroll is cleared."""
+        bench = Bench(options(fake_es, fields=["id", "status"]), duration=10)
+
+        result = bench.probe(page_size=400, slices=1)
+
+        assert result.documents == 1000
+        assert len(result.took) == 4  # 400, 400 and 200 hits then an empty page
+        assert fake_es.cluster.scrolls == {}
+        assert bench._body(100, 0, 1, None) == {
+            "query": {"match_all": {}},
+            "size": 100,
+            "sort": ["_doc"],
+            "_source": ["id", "status"],
+        }
+        sliced = bench._body(100, 1, 2, "pit")
+        assert sliced["pit"] == {"id": "pit", "keep_alive": "1m"}
+        assert sliced["slice"] == {"id": 1, "max": 2}
+        assert sliced["sort"] == ["_shard_doc"]
+
+    def test_probe_stops_at_deadline(self: Self, fake_es: FakeElasticsearch) -> None:
+        """A probe past its duration stops after the page in flight."""
+        fake_es.cluster.latency = 0.05
+
+        result = Bench(options(fake_es), duration=0.01).probe(page_size=10, slices=1)
+
+        assert result.documents == 10
+        assert fake_es.cluster.scrolls == {}
+
+    def test_failed_probe(self: Self, fake_es: FakeElasticsearch) -> None:
+        """A configuration the cluster rejects is reported instead of stopping the bench."""
+        results = Bench(options(fake_es, index_prefixes=["missing"]), page_sizes=(10,), slices=(1, 2)).run()
+
+        assert [result.error != "" for result in results] == [True, True]
+        assert recommend(results) is None
+        assert "failed" in format_report(results)
+
+    def test_recommend_lightest_close_to_best(self: Self) -> None:
+        """The fewest slices and smallest page within the margin of the best throughput are recommended."""
+        results = [
+            probe_result(500, 1, 600),
+            probe_result(5000, 1, 950),
+            probe_result(1000, 2, 980),
+            probe_result(1000, 4, 1000),
+        ]
+
+        best = recommend(results)
+
+        assert best is not None
+        assert (best.page_size, best.slices) == (5000, 1)
+        assert best.took_ms == 4
+        assert "Recommended: --scroll-size 5000 (950 docs/s)." in format_report(results)
+
+    def test_recommend_export_flags(self: Self) -> None:
+        """Slices are recommended as the point in time export reading that way."""
+        best = recommend([probe_result(500, 1, 300), probe_result(1000, 4, 1000)])
+
+        assert best is not None
+        assert best.flags == "--scroll-size 1000 --pit --slices 4"
+
+    def test_cli(self: Self, fake_es: FakeElasticsearch) -> None:
+        """The bench command prints a row per configuration and a recommendation."""
+        args = ["bench", "-i", fake_es.cluster.index, "-u", fake_es.url, "-p", "password", "--duration", "1"]
+        args += ["--page-size", "50", "--slices", "1", "--slices", "2"]
+
+        result = CliRunner().invoke(cli, args)
+
+        assert result.exit_code == 0, result.output
+        assert result.output.count(" ok\n") == 2
+        assert "Recommended" in result.output
@@ -9,7 +9,8 @@ from click.testing import CliRunner
 from typing_extensions import Self
 
 from esxport.__init__ import __version__
-from esxport.cli import cli
+from esxport.cli import cli, export
+from esxport.constant import default_config_fields
 from esxport.esxport import EsXport
 from esxport.strings import cli_version, invalid_query_format, invalid_sort_format
 from test.esxport._export_test import TestExport
@@ -132,6 +133,21 @@ class TestCli:
         assert json_error_message in result.output
         assert result.exit_code == usage_error_code
 
+    def test_mode_options_use_config_defaults(self: Self) -> None:
+        """Options of the search modes default to the config fields, like the other options."""
+        defaults = {param.name: param.default for param in export.params}
+        for name in ("ids_file", "lookup", "transform", "aggregate"):
+            assert defaults[name] == default_config_fields[name]
+
+    def test_help_lists_commands(self: Self, cli_runner: CliRunner) -> None:
+        """The group help lists every command, the export help stays one command away."""
+        result = cli_runner.invoke(cli, ["--help"], catch_exceptions=False)
+        assert result.exit_code == 0
+        for command in ("export", "run-jobs", "serve", "bench", "fake-es"):
+            assert command in result.output
+        export_help = cli_runner.invoke(cli, ["export", "--help"], catch_exceptions=False)
+        assert "--index-prefixes" in export_help.output
+
     def test_cli_version_check(self: Self, cli_runner: CliRunner) -> None:
         """Test version is printed correctly."""
         result = cli_runner.invoke(
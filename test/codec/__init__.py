@@ -0,0 +1 @@
+"""Codec test cases."""
@@ -0,0 +1,47 @@
+"""Codec test cases."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from esxport import codec
+
+DOCUMENT = {
+    "name": "Zoë",
+    "nested": {"tags": ["a", "b"], "score": 1.5, "empty": None, "flag": True},
+    "count": 2**63,
+    "at": datetime(2024, 1, 2, tzinfo=timezone.utc),
+}
+
+
+@pytest.mark.skipif(codec.NAME != "orjson", reason="orjson is not installed")
+def test_codecs_write_the_same_output() -> None:
+    """Files do not depend on the codec that wrote them."""
+    assert codec.orjson_dumps(DOCUMENT) == codec.json_dumps(DOCUMENT)
+    encoded = codec.json_dumps(DOCUMENT)
+    assert codec.orjson_loads(encoded) == codec.json_loads(encoded.encode("utf-8"))
+
+
+@pytest.mark.skipif(codec.NAME != "orjson", reason="orjson is not installed")
+def test_orjson_falls_back_on_big_integers() -> None:
+    """Integers beyond 64 bits are still encoded."""
+    assert codec.orjson_dumps({"big": 2**70}) == f'{{"big":{2**70}}}'
+
+
+def test_output_is_compact_utf8() -> None:
+    """Values are encoded without spaces or ASCII escapes."""
+    assert codec.dumps({"name": "Zoë", "tags": [1, 2]}) == '{"name":"Zoë","tags":[1,2]}'
+    assert codec.loads('{"name":"Zoë"}') == json.loads('{"name":"Zoë"}')
+
+
+def test_client_serializers() -> None:
+    """Responses are decoded with the fast codec when it is installed."""
+    serializers = codec.client_serializers()
+    if codec.NAME != "orjson":
+        assert serializers == {}
+    else:
+        assert set(serializers) == {"application/json", "application/vnd.elasticsearch+json"}
+        assert serializers["application/json"].loads(b'{"a":1}') == {"a": 1}
@@ -7,7 +7,7 @@ import os
 import subprocess
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Protocol
 from unittest.mock import Mock, patch
 
 import pytest
@@ -19,6 +19,7 @@ from pytest_elasticsearch import factories
 from esxport.click_opt.cli_options import CliOptions
 from esxport.elastic import ElasticsearchClient
 from esxport.esxport import EsXport
+from esxport.fake_es import FakeCluster, FakeElasticsearch
 from test.esxport._prepare_search_query_test import TestSearchQuery
 
 if TYPE_CHECKING:
@@ -141,6 +142,48 @@ def esxport_obj_with_data(cli_options: CliOptions, es_client_with_data: Mock) ->
         return EsXport(cli_options)
 
 
+class Exporter(Protocol):
+    """Factory of the ``exporter`` fixture."""
+
+    def __call__(self, server: FakeElasticsearch, output_file: Path, **settings: Any) -> EsXport:
+        """Exporter of the index of ``server`` to ``output_file``."""
+
+
+@pytest.fixture
+def fake_cluster() -> FakeCluster:
+    """Documents of the fake server, override it in a module to serve others."""
+    return FakeCluster(documents=1000, document_size=200)
+
+
+@pytest.fixture
+def fake_es(fake_cluster: FakeCluster) -> Iterator[FakeElasticsearch]:
+    """Fake server of ``fake_cluster`` on a free port."""
+    server = FakeElasticsearch(("127.0.0.1", 0), fake_cluster)
+    server.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def exporter() -> Exporter:
+    """Factory of exporters of every document of a fake server, ``settings`` override the options."""
+
+    def make(server: FakeElasticsearch, output_file: Path, **settings: Any) -> EsXport:
+        options = {
+            "query": {"query": {"match_all": {}}},
+            "output_file": str(output_file),
+            "index_prefixes": [server.cluster.index],
+            "url": server.url,
+            "password": "password",
+            "max_results": server.cluster.documents,
+            **settings,
+        }
+        return EsXport(CliOptions(options))
+
+    return make
+
+
 @pytest.fixture(autouse=True)
 def _capture_wrap() -> None:
     """Avoid https://github.com/pytest-dev/pytest/issues/5502."""
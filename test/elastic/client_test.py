@@ -3,14 +3,14 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import TYPE_CHECKING
-from unittest.mock import Mock, patch
+from typing import TYPE_CHECKING, cast
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 from elastic_transport import ObjectApiResponse
 
 from esxport.click_opt.cli_options import CliOptions
-from esxport.elastic import ElasticsearchClient
+from esxport.elastic import ElasticsearchClient, ElasticsearchClientPool
 from esxport.exceptions import ScrollExpiredError
 
 if TYPE_CHECKING:
@@ -133,3 +133,51 @@ class TestElasticsearchClient:
             assert "ca_certs" not in call_kwargs
             assert "client_cert" not in call_kwargs
             assert "client_key" not in call_kwargs
+
+    @patch("esxport.elastic.elasticsearch.Elasticsearch")
+    def test_mapping_is_cached(self: Self, _: Mock, cli_options: CliOptions) -> None:
+        """Mappings are only fetched once within the cache ttl."""
+        client = ElasticsearchClient(cli_options, mapping_ttl=60)
+        get_mapping = cast("MagicMock", client.client.indices.get_mapping)
+        get_mapping.return_value.raw = {"index1": {}}
+
+        assert client.get_mapping(index="index1") == {"index1": {}}
+        assert client.get_mapping(index="index1") == {"index1": {}}
+        get_mapping.assert_called_once_with(index="index1")
+
+    @patch("esxport.elastic.elasticsearch.Elasticsearch")
+    def test_mapping_is_not_cached_by_default(self: Self, _: Mock, cli_options: CliOptions) -> None:
+        """Without a ttl every call reaches the cluster."""
+        client = ElasticsearchClient(cli_options)
+        client.get_mapping(index="index1")
+        client.get_mapping(index="index1")
+        assert cast("MagicMock", client.client.indices.get_mapping).call_count == 2
+
+    @patch("esxport.elastic.elasticsearch.Elasticsearch")
+    def test_client_pool_shares_clients(self: Self, _: Mock, cli_options: CliOptions) -> None:
+        """Clients are shared per connection settings."""
+        pool = ElasticsearchClientPool()
+        other_options = CliOptions({**cli_options.__dict__, "url": "http://other:9200"})
+        assert pool.get(cli_options) is pool.get(cli_options)
+        assert pool.get(cli_options) is not pool.get(other_options)
+
+    @patch("esxport.elastic.elasticsearch.Elasticsearch")
+    def test_esql_async_query(self: Self, _: Mock, cli_options: CliOptions) -> None:
+        """An ES|QL query is submitted for columnar results, polled and deleted by id."""
+        client = ElasticsearchClient(cli_options)
+        esql = cast("MagicMock", client.client.esql)
+        esql.async_query.return_value.raw = {"id": "q1", "is_running": True}
+        esql.async_query_get.return_value.raw = {"id": "q1", "is_running": False, "columns": [], "values": []}
+
+        assert client.esql_submit("FROM a", None, "1s")["is_running"] is True
+        assert client.esql_get("q1", "1s")["is_running"] is False
+        client.esql_delete("q1")
+
+        esql.async_query.assert_called_once_with(
+            query="FROM a",
+            filter=None,
+            columnar=True,
+            wait_for_completion_timeout="1s",
+        )
+        esql.async_query_get.assert_called_once_with(id="q1", wait_for_completion_timeout="1s")
+        esql.async_query_delete.assert_called_once_with(id="q1")
@@ -0,0 +1,131 @@
+"""Composite aggregation export test cases."""
+
+from __future__ import annotations
+
+import csv
+import inspect
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from esxport.constant import AGGREGATION_NAME
+from esxport.exceptions import ConfigurationError, InvalidEsQueryError, NoDataFoundError
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from unittest.mock import Mock
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+aggregation: dict[str, Any] = {
+    "sources": [{"host": {"terms": {"field": "host"}}}],
+    "aggs": {"avg_bytes": {"avg": {"field": "bytes"}}, "latency": {"percentiles": {"field": "took"}}},
+}
+
+
+def make_result(buckets: list[dict[str, Any]], after_key: dict[str, Any] | None) -> dict[str, Any]:
+    """Build a search response with a composite aggregation."""
+    result: dict[str, Any] = {"buckets": buckets}
+    if after_key:
+        result["after_key"] = after_key
+    return {"hits": {"total": {"value": 0}, "hits": []}, "aggregations": {AGGREGATION_NAME: result}}
+
+
+def make_bucket(host: str, count: int) -> dict[str, Any]:
+    """Build a bucket."""
+    return {
+        "key": {"host": host},
+        "doc_count": count,
+        "avg_bytes": {"value": count * 10.0},
+        "latency": {"values": {"50.0": 1.5}},
+    }
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestAggregate:
+    """Composite aggregation export test cases."""
+
+    def test_query(self: Self, _: Any, esxport_obj: EsXport) -> None:
+        """The query asks for no hits and pages the composite aggregation."""
+        esxport_obj.opts.aggregate = aggregation
+        esxport_obj._prepare_aggregation_query()
+        assert esxport_obj.search_args["size"] == 0
+        assert esxport_obj.search_args["aggs"] == {
+            AGGREGATION_NAME: {
+                "composite": {"size": esxport_obj.opts.scroll_size, "sources": aggregation["sources"]},
+                "aggs": aggregation["aggs"],
+            },
+        }
+
+    def test_sources_are_required(self: Self, _: Any, esxport_obj: EsXport) -> None:
+        """An aggregation without sources is rejected."""
+        esxport_obj.opts.aggregate = {"aggs": {}}
+        with pytest.raises(InvalidEsQueryError):
+            esxport_obj._prepare_aggregation_query()
+
+    def test_buckets_are_exported(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Every page of buckets becomes rows of the output file."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.output_file = out_file
+        esxport_obj.opts.aggregate = aggregation
+        esxport_obj.opts.scroll_size = 2
+        search = mocker.patch.object(
+            esxport_obj.es_client,
+            "search",
+            side_effect=[
+                make_result([make_bucket("a", 1), make_bucket("b", 2)], {"host": "b"}),
+                make_result([make_bucket("c", 3)], {"host": "c"}),
+            ],
+        )
+
+        esxport_obj.export()
+
+        assert search.call_count == 2
+        assert search.call_args.kwargs["aggs"][AGGREGATION_NAME]["composite"]["after"] == {"host": "b"}
+        with Path(out_file).open(encoding="utf-8") as file:
+            rows = list(csv.reader(file))
+        assert rows == [
+            ["host", "doc_count", "avg_bytes", "latency.values.50.0"],
+            ["a", "1", "10.0", "1.5"],
+            ["b", "2", "20.0", "1.5"],
+            ["c", "3", "30.0", "1.5"],
+        ]
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_buckets_stop_at_max_results(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """No more than max_results buckets are exported."""
+        esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.aggregate = aggregation
+        esxport_obj.opts.scroll_size = 2
+        esxport_obj.opts.max_results = 1
+        search = mocker.patch.object(
+            esxport_obj.es_client,
+            "search",
+            return_value=make_result([make_bucket("a", 1), make_bucket("b", 2)], {"host": "b"}),
+        )
+
+        esxport_obj.aggregate_query()
+
+        assert search.call_count == 1
+        assert esxport_obj.rows_written == 1
+        TestExport.rm_export_file(esxport_obj.opts.output_file)
+
+    def test_no_buckets(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """An empty aggregation raises NoDataFoundError."""
+        esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.aggregate = aggregation
+        mocker.patch.object(esxport_obj.es_client, "search", return_value=make_result([], None))
+        with pytest.raises(NoDataFoundError):
+            esxport_obj.aggregate_query()
+        TestExport.rm_export_file(esxport_obj.opts.output_file)
+
+    def test_follow_is_not_supported(self: Self, _: Any, esxport_obj: EsXport) -> None:
+        """Aggregations can not be followed."""
+        esxport_obj.opts.aggregate = aggregation
+        esxport_obj.opts.incremental_field = "ts"
+        with pytest.raises(ConfigurationError):
+            esxport_obj.export()
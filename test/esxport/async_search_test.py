@@ -0,0 +1,143 @@
+"""Async search test cases."""
+
+from __future__ import annotations
+
+import inspect
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest import mock
+from unittest.mock import patch
+
+import pytest
+from elasticsearch.exceptions import ConnectionError as ESConnectionError
+
+from esxport.constant import ASYNC_WAIT, MAX_RESULT_WINDOW, PIT_KEEP_ALIVE
+from esxport.exceptions import QueryTimeoutError
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from unittest.mock import Mock
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+def make_response(
+    *,
+    running: bool,
+    hits: list[dict[str, Any]] | None = None,
+    total: int | None = None,
+    search_id: str = "search-1",
+) -> dict[str, Any]:
+    """Build an async search response of a point in time."""
+    hits = hits or []
+    return {
+        "id": search_id,
+        "is_running": running,
+        "response": {
+            "pit_id": "pit-1",
+            "hits": {"total": {"value": len(hits) if total is None else total}, "hits": hits},
+        },
+    }
+
+
+def make_hits(*positions: int) -> list[dict[str, Any]]:
+    """Build hits sorted on their position."""
+    return [{"_id": str(position), "_source": {"n": position}, "sort": [position]} for position in positions]
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestAsyncSearch:
+    """Async search test cases."""
+
+    def test_query_is_submitted_once(self: Self, _: Any, mocker: Mock, esxport_obj_with_data: EsXport) -> None:
+        """A running search is polled, connection errors retry the poll and never resubmit the query."""
+        esxport_obj_with_data.opts.output_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj_with_data._poll_async_search.retry.sleep = mock.Mock()  # type: ignore[attr-defined]
+        hits = esxport_obj_with_data.es_client.search()["hits"]["hits"]
+        client = esxport_obj_with_data.es_client
+        submit = mocker.patch.object(client, "async_search_submit", return_value=make_response(running=True))
+        poll = mocker.patch.object(
+            client,
+            "async_search_get",
+            side_effect=[ESConnectionError("mocked error"), make_response(running=False, hits=hits)],
+        )
+        delete = mocker.patch.object(client, "async_search_delete")
+
+        mocker.patch.object(client, "open_point_in_time", return_value="pit-1")
+        close = mocker.patch.object(client, "close_point_in_time")
+
+        esxport_obj_with_data.async_search_query()
+
+        submit.assert_called_once()
+        kwargs = submit.call_args.kwargs
+        assert {"scroll", "index", "terminate_after"}.isdisjoint(kwargs)
+        assert kwargs["pit"] == {"id": "pit-1", "keep_alive": PIT_KEEP_ALIVE}
+        assert kwargs["size"] == esxport_obj_with_data.opts.scroll_size
+        assert kwargs["track_total_hits"] is True
+        assert poll.call_count == 2
+        poll.assert_called_with("search-1", ASYNC_WAIT)
+        delete.assert_called_once_with("search-1")
+        close.assert_called_once_with("pit-1")
+        assert esxport_obj_with_data.rows_written == len(hits)
+        with Path(f"{esxport_obj_with_data.opts.output_file}.tmp").open(encoding="utf-8") as tmp_file:
+            assert len(tmp_file.readlines()) == len(hits)
+        TestExport.rm_export_file(esxport_obj_with_data.opts.output_file)
+
+    def test_pages_past_the_result_window(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Every page is its own async search past the last hit of the previous one, up to --max-results."""
+        esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.scroll_size = 2
+        esxport_obj.opts.max_results = 5
+        client = esxport_obj.es_client
+        submit = mocker.patch.object(
+            client,
+            "async_search_submit",
+            side_effect=[
+                make_response(running=False, hits=make_hits(0, 1), total=MAX_RESULT_WINDOW * 2, search_id="s0"),
+                make_response(running=False, hits=make_hits(2, 3), search_id="s1"),
+                make_response(running=False, hits=make_hits(4, 5), search_id="s2"),
+            ],
+        )
+        delete = mocker.patch.object(client, "async_search_delete")
+        mocker.patch.object(client, "open_point_in_time", return_value="pit-1")
+        mocker.patch.object(client, "close_point_in_time")
+
+        esxport_obj.async_search_query()
+
+        assert [call.kwargs.get("search_after") for call in submit.call_args_list] == [None, [1], [3]]
+        assert [call.args[0] for call in delete.call_args_list] == ["s0", "s1", "s2"]
+        assert esxport_obj.rows_written == 5
+        with Path(f"{esxport_obj.opts.output_file}.tmp").open(encoding="utf-8") as tmp_file:
+            assert [json.loads(line)["n"] for line in tmp_file] == [0, 1, 2, 3, 4]
+        TestExport.rm_export_file(esxport_obj.opts.output_file)
+
+    def test_running_search_times_out(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """A search still running after the deadline is deleted and fails the export, the point in time is closed."""
+        client = esxport_obj.es_client
+        mocker.patch.object(client, "async_search_submit", return_value=make_response(running=True))
+        poll = mocker.patch.object(client, "async_search_get")
+        delete = mocker.patch.object(client, "async_search_delete")
+        mocker.patch.object(client, "open_point_in_time", return_value="pit-1")
+        close = mocker.patch.object(client, "close_point_in_time")
+        mocker.patch("esxport.esxport.ASYNC_TIMEOUT", 0)
+
+        with pytest.raises(QueryTimeoutError):
+            esxport_obj.async_search_query()
+
+        poll.assert_not_called()
+        delete.assert_called_once_with("search-1")
+        close.assert_called_once_with("pit-1")
+
+    def test_export_uses_async_search(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """The async search backend is used when requested."""
+        esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.async_search = True
+        async_search_query = mocker.patch.object(esxport_obj, "async_search_query")
+        search = mocker.patch.object(esxport_obj.es_client, "search")
+        mocker.patch.object(esxport_obj, "_export")
+        esxport_obj.export()
+        async_search_query.assert_called_once_with()
+        search.assert_not_called()
@@ -0,0 +1,158 @@
+"""ES|QL export test cases."""
+
+from __future__ import annotations
+
+import csv
+import inspect
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from elasticsearch.exceptions import ConnectionError as ESConnectionError
+
+from esxport.constant import ASYNC_WAIT
+from esxport.exceptions import ConfigurationError, ExportCancelledError, NoDataFoundError, QueryTimeoutError
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from unittest.mock import Mock
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+class TestEsql:
+    """ES|QL export test cases."""
+
+    @pytest.mark.parametrize(
+        ("statement", "expected"),
+        [
+            ("WHERE a > 1 | KEEP a", "FROM index1,index2 | WHERE a > 1 | KEEP a | LIMIT 100"),
+            ("from logs-* | KEEP a", "from logs-* | KEEP a | LIMIT 100"),
+        ],
+    )
+    def test_statement(self: Self, esxport_obj: EsXport, statement: str, expected: str) -> None:
+        """The input indexes are used unless the statement has its own source command."""
+        esxport_obj.opts.esql = statement
+        assert esxport_obj._prepare_esql_query() == expected
+
+    def test_all_indexes(self: Self, esxport_obj: EsXport) -> None:
+        """_all reads from every index."""
+        esxport_obj.opts.esql = "KEEP a"
+        esxport_obj.opts.index_prefixes = ["_all"]
+        assert esxport_obj._prepare_esql_query().startswith("FROM * |")
+
+    def test_columns_are_exported(self: Self, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Columnar values are written as rows, with the query used as filter."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.output_file = out_file
+        esxport_obj.opts.esql = "KEEP host, bytes, tags"
+        esql_submit = mocker.patch.object(
+            esxport_obj.es_client,
+            "esql_submit",
+            return_value={
+                "columns": [{"name": "host", "type": "keyword"}, {"name": "bytes", "type": "long"}, {"name": "tags"}],
+                "values": [["a", "b"], [1, None], [["x", "y"], "z"]],
+            },
+        )
+
+        esxport_obj.export()
+
+        esql_submit.assert_called_once_with(
+            "FROM index1,index2 | KEEP host, bytes, tags | LIMIT 100",
+            {"match_all": {}},
+            ASYNC_WAIT,
+        )
+        with Path(out_file).open(encoding="utf-8") as file:
+            assert list(csv.reader(file)) == [["host", "bytes", "tags"], ["a", "1", '["x", "y"]'], ["b", "", "z"]]
+        assert esxport_obj.rows_written == 2
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_columns_as_ndjson(self: Self, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Every row is written as one JSON object keyed by column name."""
+        out_file = f"{inspect.stack()[0].function}.ndjson"
+        esxport_obj.opts.output_file = out_file
+        esxport_obj.opts.export_format = "ndjson"
+        esxport_obj.opts.esql = "KEEP host, tags"
+        mocker.patch.object(
+            esxport_obj.es_client,
+            "esql_submit",
+            return_value={"columns": [{"name": "host"}, {"name": "tags"}], "values": [["a", "b"], [["x"], None]]},
+        )
+
+        esxport_obj.export()
+
+        lines = Path(out_file).read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [{"host": "a", "tags": ["x"]}, {"host": "b", "tags": None}]
+        assert esxport_obj.rows_written == 2
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_no_rows(self: Self, mocker: Mock, esxport_obj: EsXport) -> None:
+        """An empty result raises NoDataFoundError."""
+        esxport_obj.opts.esql = "KEEP a"
+        mocker.patch.object(
+            esxport_obj.es_client,
+            "esql_submit",
+            return_value={"columns": [{"name": "a"}], "values": [[]]},
+        )
+        with pytest.raises(NoDataFoundError):
+            esxport_obj.esql_query()
+
+    def test_running_query_is_polled_then_deleted(self: Self, mocker: Mock, esxport_obj: EsXport) -> None:
+        """A poll failing on a connection error is retried without submitting the query again."""
+        esxport_obj.opts.esql = "KEEP a"
+        submit = mocker.patch.object(
+            esxport_obj.es_client,
+            "esql_submit",
+            return_value={"id": "q1", "is_running": True},
+        )
+        poll = mocker.patch.object(
+            esxport_obj.es_client,
+            "esql_get",
+            side_effect=[ESConnectionError("down"), {"is_running": False, "columns": [{"name": "a"}], "values": [[1]]}],
+        )
+        delete = mocker.patch.object(esxport_obj.es_client, "esql_delete")
+        mocker.patch("tenacity.nap.time.sleep")
+        mocker.patch("esxport.esxport.Writer.write_columns")
+
+        esxport_obj.esql_query()
+
+        submit.assert_called_once()
+        assert poll.call_count == 2
+        delete.assert_called_once_with("q1")
+        assert esxport_obj.rows_written == 1
+
+    def test_running_query_times_out(self: Self, mocker: Mock, esxport_obj: EsXport) -> None:
+        """A query still running past the deadline is deleted and the export fails."""
+        esxport_obj.opts.esql = "KEEP a"
+        mocker.patch.object(esxport_obj.es_client, "esql_submit", return_value={"id": "q1", "is_running": True})
+        poll = mocker.patch.object(esxport_obj.es_client, "esql_get", return_value={"id": "q1", "is_running": True})
+        delete = mocker.patch.object(esxport_obj.es_client, "esql_delete")
+        mocker.patch("esxport.esxport.ASYNC_TIMEOUT", 0)
+
+        with pytest.raises(QueryTimeoutError):
+            esxport_obj.esql_query()
+
+        poll.assert_not_called()
+        delete.assert_called_once_with("q1")
+
+    def test_cancelled_query_is_deleted(self: Self, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Cancelling the export deletes the running query."""
+        esxport_obj.opts.esql = "KEEP a"
+        mocker.patch.object(esxport_obj.es_client, "esql_submit", return_value={"id": "q1", "is_running": True})
+        delete = mocker.patch.object(esxport_obj.es_client, "esql_delete")
+        esxport_obj.cancelled.set()
+
+        with pytest.raises(ExportCancelledError):
+            esxport_obj.esql_query()
+
+        delete.assert_called_once_with("q1")
+
+    def test_esql_can_not_be_aggregated(self: Self, esxport_obj: EsXport) -> None:
+        """ES|QL is its own query language."""
+        esxport_obj.opts.esql = "KEEP a"
+        esxport_obj.opts.aggregate = {"sources": []}
+        with pytest.raises(ConfigurationError):
+            esxport_obj.export()
@@ -0,0 +1,121 @@
+"""Estimate test cases."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, NamedTuple
+from unittest.mock import patch
+
+import pytest
+
+from esxport.estimate import CostEstimate
+from esxport.exceptions import ConfigurationError, InsufficientDiskSpaceError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from typing_extensions import Self
+
+    from esxport.fake_es import FakeElasticsearch
+    from test.conftest import Exporter
+
+
+class DiskUsage(NamedTuple):
+    """Result of ``shutil.disk_usage``."""
+
+    total: int
+    used: int
+    free: int
+
+
+def cost_estimate(records: list[dict[str, Any]], documents: int = 1000) -> CostEstimate:
+    """Estimate of ``documents`` sized from ``records``."""
+    return CostEstimate(
+        documents=documents,
+        matched=documents,
+        index_documents=2 * documents,
+        store_bytes=400 * documents,
+        records=records,
+        page_size=100,
+        request_seconds=0.01,
+        sample_seconds=0.02,
+        delimiter=",",
+    )
+
+
+class TestCostEstimate:
+    """Cost estimate test cases."""
+
+    def test_sizes_per_format(self: Self) -> None:
+        """CSV needs the temp file and the output, NDJSON renames the temp file."""
+        estimate = cost_estimate([{"a": 1, "b": "x"}, {"a": 2, "b": "yy"}])
+
+        assert estimate.temp_bytes == 1000 * len('{"a":1,"b":"x"}\n{"a":2,"b":"yy"}\n') // 2
+        assert estimate.output_bytes("ndjson") == estimate.temp_bytes
+        assert estimate.output_bytes("csv") == len("a,b\r\n") + 1000 * len("1,x\r\n2,yy\r\n") // 2
+        assert estimate.disk_bytes("csv") == estimate.temp_bytes + estimate.output_bytes("csv")
+        assert estimate.disk_bytes("ndjson") == estimate.temp_bytes
+        assert estimate.pages == 10
+        assert estimate.seconds >= 10 * 0.01
+
+    def test_without_sample(self: Self) -> None:
+        """Without sampled records documents are sized from the index store."""
+        estimate = cost_estimate([])
+
+        assert estimate.temp_bytes == 1000 * 200
+        assert estimate.seconds == 0
+
+
+class TestEstimateExport:
+    """Estimate export test cases."""
+
+    def test_estimate_writes_nothing(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+    ) -> None:
+        """An estimate counts and samples the documents, close to what the export then writes."""
+        output_file = tmp_path / "estimate.csv"
+        export = exporter(fake_es, output_file, max_results=750, estimate=True)
+
+        export.export()
+
+        assert not output_file.exists()
+        assert not tmp_path.joinpath("estimate.csv.tmp").exists()
+        assert set(export.stats.requests) >= {"count", "index_stats", "sample"}
+
+        estimate = export.estimate()
+        exporter(fake_es, output_file, max_results=750).export()
+        assert estimate.documents == 750
+        assert estimate.matched == 1000
+        assert estimate.output_bytes("csv") == pytest.approx(output_file.stat().st_size, rel=0.05)
+
+    def test_insufficient_disk_space(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+    ) -> None:
+        """The estimate fails when the output directory is short of space."""
+        export = exporter(fake_es, tmp_path / "missing" / "estimate.csv", estimate=True)
+
+        with (
+            patch("esxport.estimate.shutil.disk_usage", return_value=DiskUsage(1, 0, 1024)) as disk_usage,
+            pytest.raises(InsufficientDiskSpaceError),
+        ):
+            export.export()
+        disk_usage.assert_called_once_with(tmp_path)
+
+    def test_estimate_with_other_mode(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+    ) -> None:
+        """Only searches can be estimated."""
+        ids_file = tmp_path / "ids.txt"
+        ids_file.write_text("1\n", encoding="utf-8")
+        export = exporter(fake_es, tmp_path / "estimate.csv", estimate=True, ids_file=str(ids_file))
+
+        with pytest.raises(ConfigurationError):
+            export.export()
@@ -0,0 +1,103 @@
+"""Follow mode test cases."""
+
+from __future__ import annotations
+
+import csv
+import inspect
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from esxport.exceptions import ConfigurationError
+from esxport.incremental import Watermark
+from test.esxport._export_test import TestExport
+from test.esxport.incremental_test import make_hit
+
+if TYPE_CHECKING:
+    from unittest.mock import Mock
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+def make_page(*hits: dict[str, Any]) -> dict[str, Any]:
+    """Build a search response."""
+    return {"_scroll_id": "abc", "hits": {"total": {"value": len(hits)}, "hits": list(hits)}}
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestFollow:
+    """Follow mode test cases."""
+
+    def test_follow_requires_incremental_field(self: Self, _: Any, esxport_obj: EsXport) -> None:
+        """Follow mode needs a field to track."""
+        esxport_obj.opts.follow = True
+        with pytest.raises(ConfigurationError):
+            esxport_obj.export()
+
+    def test_new_documents_are_appended(self: Self, _: Any, mocker: Mock, esxport_obj_with_data: EsXport) -> None:
+        """Documents found by later polls are appended below the initial export."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.incremental_field = "ts"
+        esxport_obj_with_data.opts.follow = True
+        esxport_obj_with_data.opts.poll_interval = 0
+        search = mocker.patch.object(
+            esxport_obj_with_data.es_client,
+            "search",
+            side_effect=[
+                make_page(make_hit("a", 1)),
+                make_page(make_hit("b", 2), make_hit("c", 3)),
+                make_page(),
+                KeyboardInterrupt,
+            ],
+        )
+
+        esxport_obj_with_data.export()
+
+        with Path(out_file).open(encoding="utf-8") as file:
+            assert list(csv.reader(file)) == [["ts"], ["1"], ["2"], ["3"]]
+        follow_query = search.call_args_list[1].kwargs
+        assert "scroll" not in follow_query
+        assert follow_query["query"]["bool"]["filter"][-1] == {"range": {"ts": {"gte": 1}}}
+        assert follow_query["query"]["bool"]["must_not"] == [{"ids": {"values": ["a"]}}]
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_follow_starts_without_initial_data(
+        self: Self,
+        _: Any,
+        mocker: Mock,
+        esxport_obj_with_data: EsXport,
+    ) -> None:
+        """An empty initial export is not an error in follow mode."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.incremental_field = "ts"
+        esxport_obj_with_data.opts.follow = True
+        esxport_obj_with_data.opts.poll_interval = 0
+        mocker.patch.object(
+            esxport_obj_with_data.es_client,
+            "search",
+            side_effect=[make_page(), make_page(make_hit("a", 1)), KeyboardInterrupt],
+        )
+
+        esxport_obj_with_data.export()
+
+        with Path(out_file).open(encoding="utf-8") as file:
+            assert list(csv.reader(file)) == [["ts"], ["1"]]
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_full_bounded_pages_do_not_wait(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Pages bounded below --scroll-size by --max-memory are full, only a shorter page waits for the next poll."""
+        esxport_obj.opts.scroll_size = 100
+        esxport_obj.search_args = {"size": 2}
+        esxport_obj.watermark = Watermark("ts")
+        mocker.patch.object(esxport_obj, "_append_new_documents", side_effect=[2, 2, 1, KeyboardInterrupt])
+        wait = mocker.patch.object(esxport_obj.cancelled, "wait")
+
+        esxport_obj.follow()
+
+        wait.assert_called_once_with(esxport_obj.opts.poll_interval)
@@ -0,0 +1,122 @@
+"""Export by id list test cases."""
+
+from __future__ import annotations
+
+import inspect
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from esxport.exceptions import ConfigurationError, NoDataFoundError
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from unittest.mock import Mock
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+def make_doc(doc_id: str, *, found: bool = True) -> dict[str, Any]:
+    """Build a mget document."""
+    doc: dict[str, Any] = {"_index": "index1", "_id": doc_id, "found": found}
+    if found:
+        doc["_source"] = {"name": doc_id}
+    return doc
+
+
+def write_ids(file_name: str, ids: list[str]) -> str:
+    """Write an ids file."""
+    Path(file_name).write_text("\n".join(ids), encoding="utf-8")
+    return file_name
+
+
+def fake_mget(_: str, ids: list[str], **__: Any) -> list[dict[str, Any]]:
+    """Find every id but ``missing``."""
+    return [make_doc(doc_id, found=doc_id != "missing") for doc_id in ids]
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestIdsFile:
+    """Export by id list test cases."""
+
+    def test_ids_are_batched(self: Self, _: Any, esxport_obj: EsXport) -> None:
+        """Blank lines are skipped, ids are batched by scroll size and capped by max results."""
+        esxport_obj.opts.ids_file = write_ids(f"{inspect.stack()[0].function}.txt", ["a", "", " b ", "c", "d", "e"])
+        esxport_obj.opts.scroll_size = 2
+        esxport_obj.opts.max_results = 4
+        assert list(esxport_obj._read_ids()) == [["a", "b"], ["c", "d"]]
+        Path(esxport_obj.opts.ids_file).unlink()
+
+    def test_mget_single_index(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Documents are fetched with mget in file order and missing ids are reported."""
+        esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.index_prefixes = ["index1"]
+        esxport_obj.opts.scroll_size = 1
+        esxport_obj.opts.ids_file = write_ids(f"{inspect.stack()[0].function}.txt", ["a", "missing", "b", "c"])
+        mget = mocker.patch.object(esxport_obj.es_client, "mget", side_effect=fake_mget)
+
+        esxport_obj.ids_query()
+
+        assert mget.call_count == 4
+        assert esxport_obj.rows_written == 3
+        with Path(f"{esxport_obj.opts.output_file}.tmp").open(encoding="utf-8") as tmp_file:
+            assert [line.strip() for line in tmp_file] == ['{"name":"a"}', '{"name":"b"}', '{"name":"c"}']
+        missing_file = Path(f"{esxport_obj.opts.output_file}.missing")
+        assert missing_file.read_text(encoding="utf-8") == "missing\n"
+        missing_file.unlink()
+        Path(esxport_obj.opts.ids_file).unlink()
+        TestExport.rm_export_file(esxport_obj.opts.output_file)
+
+    def test_search_fallback(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Several indexes are searched with an ids query."""
+        esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.ids_file = write_ids(f"{inspect.stack()[0].function}.txt", ["a", "b"])
+        search = mocker.patch.object(
+            esxport_obj.es_client,
+            "search",
+            return_value={"hits": {"total": {"value": 0}, "hits": []}},
+        )
+
+        with pytest.raises(NoDataFoundError):
+            esxport_obj.ids_query()
+
+        kwargs = search.call_args.kwargs
+        assert kwargs["query"] == {"bool": {"filter": [{"match_all": {}}, {"ids": {"values": ["a", "b"]}}]}}
+        assert kwargs["size"] == 2
+        Path(f"{esxport_obj.opts.output_file}.missing").unlink()
+        Path(esxport_obj.opts.ids_file).unlink()
+        TestExport.rm_export_file(esxport_obj.opts.output_file)
+
+    def test_id_in_several_indexes(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """An id matching in several indexes is searched again sized for every match, none is dropped."""
+        docs = [make_doc("a"), make_doc("b"), {**make_doc("a"), "_index": "index2"}]
+        search = mocker.patch.object(
+            esxport_obj.es_client,
+            "search",
+            side_effect=[
+                {"hits": {"total": {"value": 3}, "hits": docs[:2]}},
+                {"hits": {"total": {"value": 3}, "hits": docs}},
+            ],
+        )
+        esxport_obj._prepare_search_query()
+
+        assert esxport_obj._fetch_ids(["a", "b"], use_mget=False) == docs
+        assert [call.kwargs["size"] for call in search.call_args_list] == [2, 3]
+        assert search.call_args.kwargs["track_total_hits"] is True
+
+    def test_missing_ids_file(self: Self, _: Any, esxport_obj: EsXport) -> None:
+        """A missing ids file is rejected before searching."""
+        esxport_obj.opts.ids_file = f"{inspect.stack()[0].function}.txt"
+        with pytest.raises(ConfigurationError, match="does not exist"):
+            esxport_obj.export()
+
+    def test_not_combined_with_incremental(self: Self, _: Any, esxport_obj: EsXport) -> None:
+        """An id list has no watermark to follow."""
+        esxport_obj.opts.ids_file = "ids.txt"
+        esxport_obj.opts.incremental_field = "ts"
+        with pytest.raises(ConfigurationError):
+            esxport_obj.export()
@@ -0,0 +1,186 @@
+"""Incremental export test cases."""
+
+from __future__ import annotations
+
+import csv
+import inspect
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from esxport.exceptions import ConfigurationError, StateFileError
+from esxport.incremental import Watermark
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from unittest.mock import Mock
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+DOCUMENTS = [("a", 5), ("b", 1), ("c", 4), ("d", 2), ("e", 3)]  # In index order, which is not the order of ts
+
+
+def make_hit(doc_id: str, value: int) -> dict[str, Any]:
+    """Build a hit sorted on the watermark field."""
+    return {"_index": "index1", "_id": doc_id, "_source": {"ts": value}, "sort": [value]}
+
+
+def fake_search(**kwargs: Any) -> dict[str, Any]:
+    """Search ``DOCUMENTS`` like a shard, which stops collecting at ``terminate_after`` in index order, then sorts."""
+    query = kwargs["query"]["bool"]
+    gte = next((clause["range"]["ts"]["gte"] for clause in query["filter"] if "range" in clause), None)
+    exported = {doc_id for clause in query.get("must_not", []) for doc_id in clause["ids"]["values"]}
+    matches = [
+        (doc_id, value) for doc_id, value in DOCUMENTS if (gte is None or value >= gte) and doc_id not in exported
+    ]
+    matches = matches[: kwargs.get("terminate_after", len(matches))]
+    hits = [make_hit(doc_id, value) for doc_id, value in sorted(matches, key=lambda match: match[1])]
+    return {"hits": {"total": {"value": len(hits)}, "hits": hits}}
+
+
+class TestWatermark:
+    """Watermark test cases."""
+
+    def test_missing_state_file_starts_empty(self: Self) -> None:
+        """A missing state file means a full export."""
+        watermark = Watermark.load(f"{inspect.stack()[0].function}.json", "ts")
+        assert watermark.value is None
+        assert watermark.ids == []
+
+    def test_save_and_load(self: Self) -> None:
+        """Saved state is loaded back."""
+        state_file = f"{inspect.stack()[0].function}.json"
+        Watermark("ts", 10, ["a", "b"]).save(state_file)
+        watermark = Watermark.load(state_file, "ts")
+        assert watermark.value == 10
+        assert watermark.ids == ["a", "b"]
+        Path(state_file).unlink()
+
+    def test_field_mismatch_raises(self: Self) -> None:
+        """State recorded for another field is rejected."""
+        state_file = f"{inspect.stack()[0].function}.json"
+        Watermark("ts", 10, ["a"]).save(state_file)
+        with pytest.raises(StateFileError):
+            Watermark.load(state_file, "other")
+        Path(state_file).unlink()
+
+    def test_invalid_state_file_raises(self: Self) -> None:
+        """Corrupt state is rejected."""
+        state_file = f"{inspect.stack()[0].function}.json"
+        Path(state_file).write_text("{not json", encoding="utf-8")
+        with pytest.raises(StateFileError):
+            Watermark.load(state_file, "ts")
+        Path(state_file).unlink()
+
+    def test_apply_without_value(self: Self) -> None:
+        """First run only requires the field to exist."""
+        query: dict[str, Any] = {"match_all": {}}
+        assert Watermark("ts").apply(query) == {"bool": {"filter": [query, {"exists": {"field": "ts"}}]}}
+
+    def test_apply_with_value(self: Self) -> None:
+        """Later runs resume from the watermark and skip already exported ids."""
+        query: dict[str, Any] = {"match_all": {}}
+        assert Watermark("ts", 10, ["a"]).apply(query) == {
+            "bool": {
+                "filter": [query, {"exists": {"field": "ts"}}, {"range": {"ts": {"gte": 10}}}],
+                "must_not": [{"ids": {"values": ["a"]}}],
+            },
+        }
+
+    def test_sort_puts_field_first(self: Self) -> None:
+        """The watermark field is the primary sort key."""
+        assert Watermark("ts").sort([{"name": "desc"}, {"ts": "desc"}]) == [{"ts": "asc"}, {"name": "desc"}]
+
+    def test_observe(self: Self) -> None:
+        """Only ids sharing the highest value are kept."""
+        watermark = Watermark("ts", 10, ["a"])
+        watermark.observe(make_hit("b", 10))
+        assert watermark.ids == ["a", "b"]
+        watermark.observe(make_hit("c", 11))
+        watermark.observe(make_hit("d", 11))
+        assert watermark.value == 11
+        assert watermark.ids == ["c", "d"]
+
+
+class TestIncrementalExport:
+    """Incremental export test cases."""
+
+    def test_state_file_is_required(self: Self, esxport_obj: EsXport) -> None:
+        """Incremental export without a state file is rejected."""
+        esxport_obj.opts.incremental_field = "ts"
+        with pytest.raises(StateFileError):
+            esxport_obj._prepare_search_query()
+
+    def test_query_is_restricted(self: Self, esxport_obj: EsXport) -> None:
+        """The stored watermark is applied to the user query."""
+        state_file = f"{inspect.stack()[0].function}.json"
+        Watermark("ts", 10, ["a"]).save(state_file)
+        esxport_obj.opts.incremental_field = "ts"
+        esxport_obj.opts.state_file = state_file
+
+        esxport_obj._prepare_search_query()
+
+        assert esxport_obj.search_args["query"] == Watermark("ts", 10, ["a"]).apply({"match_all": {}})
+        assert esxport_obj.search_args["sort"] == [{"ts": "asc"}]
+        Path(state_file).unlink()
+
+    def test_state_is_saved_after_export(self: Self, mocker: Mock, esxport_obj_with_data: EsXport) -> None:
+        """The highest exported value is persisted once the output is written."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        state_file = f"{inspect.stack()[0].function}.json"
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.incremental_field = "ts"
+        esxport_obj_with_data.opts.state_file = state_file
+        page = {
+            "_scroll_id": "abc",
+            "hits": {"total": {"value": 3}, "hits": [make_hit("a", 1), make_hit("b", 2), make_hit("c", 2)]},
+        }
+        mocker.patch.object(esxport_obj_with_data.es_client, "search", return_value=page)
+
+        with patch.object(esxport_obj_with_data, "_validate_fields"):
+            esxport_obj_with_data.export()
+
+        assert json.loads(Path(state_file).read_text(encoding="utf-8")) == {
+            "field": "ts",
+            "value": 2,
+            "ids": ["b", "c"],
+        }
+        Path(state_file).unlink()
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_capped_runs_resume_in_order(self: Self, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Capped runs over documents indexed out of order export every value once, lowest first."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        state_file = f"{inspect.stack()[0].function}.json"
+        esxport_obj.opts.output_file = out_file
+        esxport_obj.opts.incremental_field = "ts"
+        esxport_obj.opts.state_file = state_file
+        esxport_obj.opts.max_results = 2
+        mocker.patch.object(esxport_obj.es_client, "search", side_effect=fake_search)
+        runs = []
+
+        with patch.object(esxport_obj, "_validate_fields"):
+            for _ in range(3):
+                esxport_obj.rows_written = 0
+                esxport_obj.export()
+                with Path(out_file).open(encoding="utf-8") as file:
+                    runs.append([int(row["ts"]) for row in csv.DictReader(file)])
+
+        assert runs == [[1, 2], [3, 4], [5]]
+        assert "terminate_after" not in esxport_obj.search_args
+        Path(state_file).unlink()
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_not_combined_with_slices(self: Self, esxport_obj: EsXport) -> None:
+        """Interleaved slices are not sorted on the watermark field."""
+        esxport_obj.opts.incremental_field = "ts"
+        esxport_obj.opts.pit = True
+        esxport_obj.opts.slices = 2
+        with pytest.raises(ConfigurationError, match="--slices"):
+            esxport_obj.export()
@@ -0,0 +1,122 @@
+"""Lookup enrichment test cases."""
+
+from __future__ import annotations
+
+import inspect
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock
+
+import pytest
+
+from esxport.exceptions import ConfigurationError
+from esxport.lookup import Lookup, LruCache
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+CUSTOMERS = {"c1": {"name": "Ann", "tier": "gold"}, "c2": {"name": "Bob", "tier": "silver"}}
+
+
+def make_hits(*customer_ids: str | None) -> list[dict[str, Any]]:
+    """Build hits referencing customers."""
+    return [
+        {"_id": str(position), "_source": {"customer_id": customer}} for position, customer in enumerate(customer_ids)
+    ]
+
+
+def fake_mget(_: str, ids: list[str], **__: Any) -> list[dict[str, Any]]:
+    """Mget over ``CUSTOMERS``."""
+    return [{"_id": doc_id, "found": doc_id in CUSTOMERS, "_source": CUSTOMERS.get(doc_id, {})} for doc_id in ids]
+
+
+class TestLruCache:
+    """LRU cache test cases."""
+
+    def test_least_recently_used_is_evicted(self: Self) -> None:
+        """Reading a key keeps it, the oldest untouched key goes."""
+        cache = LruCache(2)
+        cache["a"], cache["b"] = 1, 2
+        assert cache["a"] == 1
+        cache["c"] = 3
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+
+class TestLookup:
+    """Lookup test cases."""
+
+    def test_index_and_key_are_required(self: Self) -> None:
+        """A lookup without index or key is rejected."""
+        with pytest.raises(ConfigurationError):
+            Lookup({"index": "customers"}, Mock())
+
+    def test_batched_mget_and_cache(self: Self) -> None:
+        """Keys of a batch are fetched once, known and missing keys are not fetched again."""
+        client = Mock()
+        client.mget.side_effect = fake_mget
+        lookup = Lookup({"index": "customers", "key": "customer_id", "fields": ["name"]}, client)
+
+        hits = make_hits("c1", "c2", "c1", "unknown", None)
+        lookup.enrich(hits)
+
+        client.mget.assert_called_once_with("customers", ["c1", "c2", "unknown"], _source_includes="name")
+        assert [hit["_source"].get("customers.name") for hit in hits] == ["Ann", "Bob", "Ann", None, None]
+
+        lookup.enrich(make_hits("c2", "unknown"))
+        client.mget.assert_called_once()
+
+    def test_terms_query(self: Self) -> None:
+        """Lookups on a field other than _id use one terms search."""
+        client = Mock()
+        client.search.return_value = {"hits": {"hits": [{"_source": {"code": "c1", "name": "Ann"}}]}}
+        lookup = Lookup({"index": "customers", "key": "customer_id", "match": "code", "prefix": "customer_"}, client)
+
+        hits = make_hits("c1", "c2")
+        lookup.enrich(hits)
+
+        client.search.assert_called_once_with(index="customers", query={"terms": {"code": ["c1", "c2"]}}, size=2)
+        assert hits[0]["_source"] == {"customer_id": "c1", "customer_code": "c1", "customer_name": "Ann"}
+        assert hits[1]["_source"] == {"customer_id": "c2"}
+
+    def test_terms_query_shared_key(self: Self) -> None:
+        """Keys crowded out of a full page by documents sharing a key are searched again, not cached as missing."""
+        client = Mock()
+        client.search.side_effect = [
+            {"hits": {"hits": [{"_source": {"code": "c1", "name": "Ann"}}, {"_source": {"code": "c1", "name": "Al"}}]}},
+            {"hits": {"hits": [{"_source": {"code": "c2", "name": "Bob"}}]}},
+        ]
+        lookup = Lookup({"index": "customers", "key": "customer_id", "match": "code", "prefix": "customer_"}, client)
+
+        hits = make_hits("c1", "c2")
+        lookup.enrich(hits)
+
+        assert client.search.call_args.kwargs == {"index": "customers", "query": {"terms": {"code": ["c2"]}}, "size": 1}
+        assert [hit["_source"]["customer_name"] for hit in hits] == ["Ann", "Bob"]
+
+
+def test_hits_are_enriched_before_flush(mocker: Mock, esxport_obj: EsXport) -> None:
+    """Looked up fields are written to the temp file."""
+    esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+    mocker.patch.object(esxport_obj.es_client, "mget", side_effect=fake_mget)
+    spec = {"index": "customers", "key": "customer_id", "fields": ["tier"]}
+    esxport_obj.lookups = [Lookup(spec, esxport_obj.es_client)]
+
+    esxport_obj._flush_to_file(make_hits("c2"))
+
+    with Path(f"{esxport_obj.opts.output_file}.tmp").open(encoding="utf-8") as tmp_file:
+        assert json.loads(tmp_file.readline()) == {"customer_id": "c2", "customers.tier": "silver"}
+    TestExport.rm_export_file(esxport_obj.opts.output_file)
+
+
+def test_not_combined_with_aggregate(esxport_obj: EsXport) -> None:
+    """Buckets have no documents to enrich."""
+    esxport_obj.opts.aggregate = {"sources": []}
+    esxport_obj.opts.lookup = [{"index": "customers", "key": "customer_id"}]
+    with pytest.raises(ConfigurationError):
+        esxport_obj.export()
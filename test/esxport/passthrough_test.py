@@ -0,0 +1,160 @@
+"""NDJSON passthrough test cases."""
+
+from __future__ import annotations
+
+import inspect
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+from unittest.mock import patch
+
+from esxport.esxport import EsXport
+from esxport.passthrough import RAW_FILTER_PATH, RawPage
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from unittest.mock import MagicMock, Mock
+
+    from typing_extensions import Self
+
+    from esxport.click_opt.cli_options import CliOptions
+
+
+SOURCES: list[dict[str, Any]] = [
+    {"a": 1, "_meta": {"b": 2}},
+    {"b": {"_source": {"c": "}{"}}, "name": "café"},
+    {"d": [1, {"e": 'quote " and \\ backslash'}, {"_source": 1}]},
+    {"f": None, "g": [1.5, True, "x"]},
+]
+
+
+def make_body(
+    sources: list[dict[str, Any]],
+    scroll_id: str | None = "abc",
+    total: int | None = None,
+    *,
+    compact: bool = False,
+) -> str:
+    """Build a raw response filtered with ``RAW_FILTER_PATH``, ``compact`` writes it as Elasticsearch does."""
+    hits = [{"_source": source} for source in sources]
+    response: dict[str, Any] = {"hits": {"total": {"value": len(sources) if total is None else total}, "hits": hits}}
+    if scroll_id:
+        response = {"_scroll_id": scroll_id, **response}
+    if compact:
+        return json.dumps(response, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(response)
+
+
+class TestRawPage:
+    """Raw page test cases."""
+
+    def test_sources_are_sliced(self: Self) -> None:
+        """Each source is copied as it appears in the body, even one holding a ``_source`` key itself."""
+        sources: list[dict[str, Any]] = [
+            {"a": 1},
+            {"b": {"_source": {"c": "}"}}},
+            {"d": [1, {"e": 'quote " and \\ backslash'}]},
+        ]
+        page = RawPage(make_body(sources, total=10))
+
+        assert page.scroll_id == "abc"
+        assert page.total == 10
+        assert page.sources == [json.dumps(source) for source in sources]
+
+    def test_compact_sources_are_sliced(self: Self) -> None:
+        """Sources of a compact response are cut at the hit separators, unless they hold a ``_source`` key."""
+        sources = [source for source in SOURCES if "_meta" not in source]
+        page = RawPage(make_body(sources, compact=True))
+
+        assert page.sources == [json.dumps(source, separators=(",", ":"), ensure_ascii=False) for source in sources]
+
+    def test_meta_is_dropped(self: Self) -> None:
+        """A ``_meta`` field is left out as the decoded path does."""
+        page = RawPage(make_body([{"a": 1, "_meta": {"b": 2}}, {"c": 3}], compact=True))
+        assert page.sources == ['{"a":1}', '{"c":3}']
+
+    def test_pretty_printed_source_is_compacted(self: Self) -> None:
+        """A source spanning several lines is written on one line."""
+        body = '{"hits": {"total": {"value": 1}, "hits": [{"_source": {\n  "a": 1\n}}]}}'
+        page = RawPage(body)
+
+        assert page.scroll_id is None
+        assert page.sources == ['{"a":1}']
+
+    def test_empty_page(self: Self) -> None:
+        """A page without hits has no sources."""
+        page = RawPage(make_body([], total=3))
+        assert page.total == 3
+        assert page.sources == []
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestPassthroughExport:
+    """NDJSON passthrough export test cases."""
+
+    def test_documents_are_copied(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Sources of every scroll page end up in the NDJSON output, capped by max results."""
+        out_file = f"{inspect.stack()[0].function}.ndjson"
+        esxport_obj.opts.output_file = out_file
+        esxport_obj.opts.export_format = "ndjson"
+        esxport_obj.opts.max_results = 3
+        client = cast("MagicMock", esxport_obj.es_client)
+        search_raw = mocker.patch.object(client, "search_raw", return_value=make_body([{"n": 1}, {"n": 2}], total=5))
+        mocker.patch.object(client, "scroll_raw", return_value=make_body([{"n": 3}, {"n": 4}], total=5))
+
+        esxport_obj.export()
+
+        assert search_raw.call_args.kwargs["filter_path"] == RAW_FILTER_PATH
+        client.search.assert_not_called()
+        assert Path(out_file).read_text(encoding="utf-8").splitlines() == ['{"n": 1}', '{"n": 2}', '{"n": 3}']
+        assert not Path(f"{out_file}.tmp").exists()
+        client.clear_scroll.assert_called_once_with(scroll_id=["abc"])
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_same_output_as_decoded_path(
+        self: Self,
+        _: Any,
+        mocker: Mock,
+        cli_options: CliOptions,
+        es_client_without_data: MagicMock,
+    ) -> None:
+        """Passing documents through writes the very NDJSON the decoded path writes."""
+        cli_options.export_format = "ndjson"
+        client = es_client_without_data
+        mocker.patch.object(client, "search_raw", return_value=make_body(SOURCES, compact=True))
+        mocker.patch.object(client, "scroll_raw", return_value=make_body([], compact=True))
+        hits = {
+            "total": {"value": len(SOURCES)},
+            "hits": [{"_id": str(n), "_source": s} for n, s in enumerate(SOURCES)],
+        }
+        mocker.patch.object(client, "search", return_value={"_scroll_id": "abc", "hits": hits})
+        mocker.patch.object(client, "scroll", return_value={"_scroll_id": "abc", "hits": {"hits": []}})
+        outputs = []
+        for passthrough in (True, False):
+            out_file = f"{inspect.stack()[0].function}_{passthrough}.ndjson"
+            cli_options.output_file = out_file
+            with patch("esxport.esxport.ElasticsearchClient", return_value=client):
+                esxport_obj = EsXport(cli_options)
+            mocker.patch.object(esxport_obj, "_can_pass_through", return_value=passthrough)
+            esxport_obj.export()
+            outputs.append(Path(out_file).read_bytes())
+            TestExport.rm_csv_export_file(out_file)
+
+        assert outputs[0] == outputs[1]
+        assert len(outputs[0].splitlines()) == len(SOURCES)
+
+    def test_meta_fields_use_decoded_path(self: Self, _: Any, mocker: Mock, esxport_obj_with_data: EsXport) -> None:
+        """Documents needing meta fields are decoded and written as NDJSON."""
+        out_file = f"{inspect.stack()[0].function}.ndjson"
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.export_format = "ndjson"
+        esxport_obj_with_data.opts.meta_fields = ["_id"]
+        search_raw = mocker.patch.object(esxport_obj_with_data.es_client, "search_raw")
+
+        esxport_obj_with_data.export()
+
+        search_raw.assert_not_called()
+        rows = [json.loads(line) for line in Path(out_file).read_text(encoding="utf-8").splitlines()]
+        assert rows
+        assert all("_id" in row for row in rows)
+        TestExport.rm_csv_export_file(out_file)
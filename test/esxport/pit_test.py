@@ -0,0 +1,138 @@
+"""Point in time export test cases."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from esxport.exceptions import ConfigurationError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from unittest.mock import Mock
+
+    from typing_extensions import Self
+
+    from esxport.fake_es import FakeElasticsearch
+    from test.conftest import Exporter
+
+
+PIT: dict[str, Any] = {"pit": True, "export_format": "ndjson", "scroll_size": 64}
+
+
+class TestPitExport:
+    """Point in time export test cases."""
+
+    def test_exports_every_document_once(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+    ) -> None:
+        """A point in time paged with search_after exports the whole index and closes the point in time."""
+        output_file = tmp_path / "out.ndjson"
+
+        exporter(fake_es, output_file, **PIT).export()
+
+        lines = output_file.read_text().splitlines()
+        assert len(lines) == 1000
+        assert len(set(lines)) == 1000
+        assert fake_es.cluster.pits == set()
+
+    @pytest.mark.parametrize("slices", [2, 3])
+    def test_slices_cover_every_document(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+        slices: int,
+    ) -> None:
+        """Slices of the point in time are disjoint and together cover the index."""
+        output_file = tmp_path / "out.ndjson"
+
+        export = exporter(fake_es, output_file, slices=slices, **PIT)
+        export.export()
+
+        lines = output_file.read_text().splitlines()
+        assert len(lines) == 1000
+        assert len(set(lines)) == 1000
+        assert export.num_results == 1000
+        assert fake_es.cluster.pits == set()
+
+    def test_max_results(self: Self, fake_es: FakeElasticsearch, exporter: Exporter, tmp_path: Path) -> None:
+        """Exporting stops at --max-results and still closes the point in time."""
+        output_file = tmp_path / "out.ndjson"
+
+        exporter(fake_es, output_file, max_results=100, slices=2, **PIT).export()
+
+        assert len(output_file.read_text().splitlines()) == 100
+        assert fake_es.cluster.pits == set()
+
+    def test_pit_closed_on_failure(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+        mocker: Mock,
+    ) -> None:
+        """The point in time is closed when the export fails."""
+        export = exporter(fake_es, tmp_path / "out.ndjson", **PIT)
+        mocker.patch.object(export, "_write_pages", side_effect=OSError("disk full"))
+
+        with pytest.raises(OSError, match="disk full"):
+            export.export()
+
+        assert fake_es.cluster.pits == set()
+
+    def test_follow_after_pit(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+        mocker: Mock,
+    ) -> None:
+        """Searches for new documents after a point in time export still target the indexes."""
+        export = exporter(
+            fake_es,
+            tmp_path / "out.ndjson",
+            incremental_field="@timestamp",
+            state_file=str(tmp_path / "state.json"),
+            **PIT,
+        )
+        export.export()
+        assert export.watermark is not None
+        search = mocker.spy(export.es_client, "search")
+
+        export._search_new_documents(export.watermark)
+
+        assert search.call_args.kwargs["index"] == fake_es.cluster.index
+        assert "pit" not in search.call_args.kwargs
+
+
+class TestPitOptions:
+    """Point in time option test cases."""
+
+    @pytest.mark.parametrize(
+        ("settings", "option"),
+        [
+            ({"stream": True}, "--stream"),
+            ({"async_search": True}, "--async-search"),
+        ],
+    )
+    def test_unsupported_modes(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+        settings: dict[str, Any],
+        option: str,
+    ) -> None:
+        """Modes that do not page a search can not read a point in time."""
+        with pytest.raises(ConfigurationError, match=option):
+            exporter(fake_es, tmp_path / "out.ndjson", **settings, **PIT).export()
+
+    def test_slices_require_pit(self: Self, fake_es: FakeElasticsearch, exporter: Exporter, tmp_path: Path) -> None:
+        """Slices are only read from a point in time."""
+        with pytest.raises(ConfigurationError, match="--slices requires --pit"):
+            exporter(fake_es, tmp_path / "out.ndjson", slices=2).export()
@@ -0,0 +1,86 @@
+"""Scroll lifecycle test cases."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from typing_extensions import Self
+
+    from esxport import EsXport
+    from esxport.fake_es import FakeCluster, FakeElasticsearch
+    from test.conftest import Exporter
+
+MODES = [{}, {"export_format": "ndjson"}, {"stream": True}]
+
+
+def open_scrolls_at_export(export: EsXport, cluster: FakeCluster) -> list[set[str]]:
+    """Record the scrolls open on ``cluster`` when the output starts being written."""
+    seen: list[set[str]] = []
+    write = export._export
+
+    def recording_export() -> None:
+        seen.append(set(cluster.scrolls))
+        write()
+
+    export._export = recording_export  # type: ignore[method-assign]
+    return seen
+
+
+class TestScrollLifecycle:
+    """Scroll lifecycle test cases."""
+
+    @pytest.mark.parametrize("settings", MODES)
+    def test_released_when_exhausted(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+        settings: dict[str, Any],
+    ) -> None:
+        """The scroll is cleared as soon as its last page is read, before the output is written."""
+        export = exporter(fake_es, tmp_path / "out", **settings)
+        seen = open_scrolls_at_export(export, fake_es.cluster)
+
+        export.export()
+
+        assert seen == [set()]
+        assert export.scroll_ids == set()
+
+    @pytest.mark.parametrize("settings", MODES)
+    def test_released_when_abandoned(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+        settings: dict[str, Any],
+    ) -> None:
+        """A scroll left once --max-results are read is cleared at once too."""
+        export = exporter(fake_es, tmp_path / "out", max_results=120, **settings)
+        seen = open_scrolls_at_export(export, fake_es.cluster)
+
+        export.export()
+
+        assert seen == [set()]
+        assert len((tmp_path / "out").read_text().splitlines()) == 120 + (not settings.get("export_format"))
+
+    def test_other_scrolls_are_kept(self: Self, fake_es: FakeElasticsearch, exporter: Exporter, tmp_path: Path) -> None:
+        """Only the scrolls of the export are cleared, other clients keep theirs."""
+        other = fake_es.cluster.search({"size": 10}, {"scroll": "1m"})
+        assert other is not None
+
+        exporter(fake_es, tmp_path / "out").export()
+
+        assert set(fake_es.cluster.scrolls) == {other["_scroll_id"]}
+
+    def test_short_keep_alive(self: Self, fake_es: FakeElasticsearch, exporter: Exporter, tmp_path: Path) -> None:
+        """Scrolls are kept alive for a minute, refreshed by every page, rather than for the whole export."""
+        export = exporter(fake_es, tmp_path / "out")
+
+        export.export()
+
+        assert export.search_args["scroll"] == "1m"
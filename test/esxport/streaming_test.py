@@ -0,0 +1,138 @@
+"""Streaming response parsing test cases."""
+
+from __future__ import annotations
+
+import csv
+import inspect
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+from unittest.mock import patch
+
+import pytest
+
+from esxport import codec
+from esxport.exceptions import ConfigurationError
+from esxport.streaming import STREAM_FILTER_PATH, StreamingPage
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+    from unittest.mock import MagicMock, Mock
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+def make_chunks(
+    sources: list[dict[str, Any]],
+    scroll_id: str | None = "abc",
+    total: int | None = None,
+    chunk_size: int = 7,
+) -> Iterator[bytes]:
+    """Split a response filtered with ``STREAM_FILTER_PATH`` into chunks of ``chunk_size`` bytes."""
+    hits = [{"_index": "logs", "_id": str(position), "_source": source} for position, source in enumerate(sources)]
+    response: dict[str, Any] = {"hits": {"total": {"value": len(sources) if total is None else total}, "hits": hits}}
+    if scroll_id:
+        response = {"_scroll_id": scroll_id, **response}
+    body = json.dumps(response, ensure_ascii=False, indent=1).encode("utf-8")
+    return iter([body[start : start + chunk_size] for start in range(0, len(body), chunk_size)])
+
+
+class TestStreamingPage:
+    """Streaming page test cases."""
+
+    def test_hits_split_across_chunks(self: Self) -> None:
+        """Hits and multibyte characters cut in the middle by chunk boundaries are decoded whole."""
+        sources: list[dict[str, Any]] = [{"name": "Zoë ☃"}, {"nested": {"hits": [1, 2], "text": "] , ["}}, {"n": 3}]
+        page = StreamingPage(make_chunks(sources, total=10))
+
+        assert page.scroll_id == "abc"
+        assert page.total == 10
+        assert [hit["_source"] for hit in page.hits()] == sources
+        assert page.count == 3
+
+    def test_hit_is_decoded_once(self: Self, mocker: Mock) -> None:
+        """A hit spanning many chunks is decoded once its closing brace arrives, not again with every chunk."""
+        loads = mocker.spy(codec, "loads")
+        sources: list[dict[str, Any]] = [{"text": '"} \\ {' * 50, "nested": {"a": [{"b": 1}]}}, {"n": 2}]
+        page = StreamingPage(make_chunks(sources, chunk_size=3))
+
+        assert [hit["_source"] for hit in page.hits()] == sources
+        assert loads.call_count == len(sources)
+
+    def test_truncated_body(self: Self) -> None:
+        """A body ending in the middle of a hit is an error."""
+        body = b"".join(make_chunks([{"n": 1}]))
+        page = StreamingPage(iter([body[:-10]]))
+
+        with pytest.raises(ValueError, match="Unterminated hit 1"):
+            list(page.hits())
+
+    def test_empty_page(self: Self) -> None:
+        """A page without hits yields nothing."""
+        page = StreamingPage(make_chunks([], scroll_id=None, total=4))
+
+        assert page.scroll_id is None
+        assert page.total == 4
+        assert list(page.hits()) == []
+        assert page.count == 0
+
+    def test_close_stops_reading(self: Self) -> None:
+        """Closing a page part way closes the body and ends the hits."""
+        chunks = make_chunks([{"n": 1}, {"n": 2}])
+
+        def body() -> Generator[bytes, None, None]:
+            yield from chunks
+
+        generator = body()
+        page = StreamingPage(generator)
+        hits = page.hits()
+        next(hits)
+        page.close()
+
+        assert inspect.getgeneratorstate(generator) == inspect.GEN_CLOSED
+        assert list(page.hits()) == []
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestStreamingExport:
+    """Streaming export test cases."""
+
+    def test_pages_are_streamed(self: Self, _: Any, mocker: Mock, esxport_obj: EsXport) -> None:
+        """Every streamed page ends up in the output, capped by max results, and its scroll is cleared."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj.opts.output_file = out_file
+        esxport_obj.opts.stream = True
+        esxport_obj.opts.max_results = 3
+        client = cast("MagicMock", esxport_obj.es_client)
+        stream_search = mocker.patch.object(
+            client,
+            "stream_search",
+            return_value=make_chunks([{"n": 1}, {"n": 2}], total=5),
+        )
+        stream_scroll = mocker.patch.object(
+            client,
+            "stream_scroll",
+            return_value=make_chunks([{"n": 3}, {"n": 4}], total=5),
+        )
+
+        esxport_obj.export()
+
+        assert stream_search.call_args.kwargs["filter_path"] == STREAM_FILTER_PATH
+        assert "scroll" in stream_search.call_args.kwargs
+        assert "query" in stream_search.call_args.kwargs["body"]
+        stream_scroll.assert_called_once()
+        client.search.assert_not_called()
+        with Path(out_file).open(encoding="utf-8") as file:
+            assert [row["n"] for row in csv.DictReader(file)] == ["1", "2", "3"]
+        client.clear_scroll.assert_called_once_with(scroll_id=["abc"])
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_stream_with_other_mode(self: Self, _: Any, esxport_obj: EsXport) -> None:
+        """Streaming only applies to scroll searches."""
+        esxport_obj.opts.stream = True
+        esxport_obj.opts.async_search = True
+        with pytest.raises(ConfigurationError):
+            esxport_obj.export()
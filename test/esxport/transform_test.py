@@ -0,0 +1,83 @@
+"""Batch transform test cases."""
+
+from __future__ import annotations
+
+import inspect
+import json
+from importlib.metadata import EntryPoint
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from esxport.exceptions import ConfigurationError
+from esxport.transform import TransformPipeline
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+class Upper(object):
+    """Plugin transform used through an entry point."""
+
+    def __init__(self: Self, field: str) -> None:
+        self.field = field
+        self.batches: list[int] = []
+
+    def __call__(self: Self, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Upper-case one field of the batch."""
+        self.batches.append(len(records))
+        for record in records:
+            record[self.field] = record[self.field].upper()
+        return records
+
+
+class TestTransformPipeline:
+    """Transform pipeline test cases."""
+
+    def test_builtin_transforms_run_in_order(self: Self) -> None:
+        """Rename, mask and drop are applied in the configured order."""
+        pipeline = TransformPipeline(
+            [
+                {"name": "rename", "fields": {"card_number": "card"}},
+                {"name": "mask", "fields": ["card"], "keep": 2},
+                {"name": "drop", "fields": ["secret"]},
+            ],
+        )
+        records = pipeline([{"card_number": "123456", "secret": "x", "name": "a"}, {"name": "b"}])
+        assert records == [{"name": "a", "card": "****56"}, {"name": "b"}]
+        assert [transform.records for transform in pipeline.transforms] == [2, 2, 2]
+
+    def test_entry_point_plugin(self: Self) -> None:
+        """Transforms installed under the entry point group are loaded and receive whole batches."""
+        entry_point = EntryPoint(name="upper", value=f"{__name__}:Upper", group="esxport.transforms")
+        with patch("esxport.transform.entry_points", return_value=[entry_point]):
+            pipeline = TransformPipeline([{"name": "upper", "field": "name"}])
+        assert pipeline([{"name": "a"}, {"name": "b"}]) == [{"name": "A"}, {"name": "B"}]
+        assert pipeline.transforms[0].transform.batches == [2]  # type: ignore[attr-defined]
+
+    def test_unknown_transform(self: Self) -> None:
+        """An unknown transform is rejected."""
+        with pytest.raises(ConfigurationError):
+            TransformPipeline([{"name": "nope"}])
+
+    def test_invalid_configuration(self: Self) -> None:
+        """A transform missing its settings is rejected."""
+        with pytest.raises(ConfigurationError):
+            TransformPipeline([{"name": "drop"}])
+
+
+def test_records_are_transformed_before_flush(esxport_obj: EsXport) -> None:
+    """The temp file holds the transformed records."""
+    esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+    esxport_obj.transforms = TransformPipeline([{"name": "drop", "fields": ["secret"]}])
+
+    esxport_obj._flush_to_file([{"_id": "1", "_source": {"name": "a", "secret": "x"}}])
+
+    with Path(f"{esxport_obj.opts.output_file}.tmp").open(encoding="utf-8") as tmp_file:
+        assert json.loads(tmp_file.readline()) == {"name": "a"}
+    TestExport.rm_export_file(esxport_obj.opts.output_file)
@@ -0,0 +1 @@
+"""Fake Elasticsearch server test cases."""
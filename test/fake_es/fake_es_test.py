@@ -0,0 +1,142 @@
+"""Fake Elasticsearch server test cases."""
+
+from __future__ import annotations
+
+import csv
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from click.testing import CliRunner
+
+from esxport import CliOptions
+from esxport.cli import cli
+from esxport.elastic import ElasticsearchClient
+from esxport.exceptions import IndexNotFoundError, ScrollExpiredError
+from esxport.fake_es import FakeCluster, FakeElasticsearch, filter_path
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from typing_extensions import Self
+
+    from test.conftest import Exporter
+
+
+class TestFakeCluster:
+    """Document generation test cases."""
+
+    def test_documents_are_deterministic(self: Self) -> None:
+        """The same settings build the same documents, of about the requested size."""
+        first, second = FakeCluster(documents=10, document_size=1000), FakeCluster(documents=10, document_size=1000)
+
+        assert first.source(7) == second.source(7)
+        assert first.source(7) != first.source(8)
+        assert 900 < len(json.dumps(first.source(7))) < 1100
+
+    def test_ids_query(self: Self) -> None:
+        """Ids queries, alone or in a bool filter, match only existing ids."""
+        cluster = FakeCluster(documents=10)
+        query = {"bool": {"filter": [{"ids": {"values": ["3", "1", "99", "x"]}}]}}
+
+        assert cluster.positions(query) == [1, 3]
+        assert cluster.positions({"match_all": {}}) == range(10)
+
+    def test_total_without_scroll_is_capped(self: Self) -> None:
+        """Totals past the result window are a lower bound unless tracked or scrolled."""
+        cluster = FakeCluster(documents=20000)
+
+        def total(body: dict[str, Any], params: dict[str, str]) -> Any:
+            response = cluster.search(body, params)
+            assert response is not None
+            return response["hits"]["total"]
+
+        assert total({"size": 0}, {}) == {"value": 10000, "relation": "gte"}
+        assert total({"size": 0, "track_total_hits": True}, {})["value"] == 20000
+        assert total({"size": 0}, {"scroll": "1m"})["value"] == 20000
+
+    def test_filter_path(self: Self) -> None:
+        """Dotted paths cross arrays and drop everything else."""
+        response = {"_scroll_id": "a", "took": 1, "hits": {"total": 2, "hits": [{"_id": "1", "_source": {"n": 1}}]}}
+
+        assert filter_path(response, [["_scroll_id"], ["hits", "hits", "_source"]]) == {
+            "_scroll_id": "a",
+            "hits": {"hits": [{"_source": {"n": 1}}]},
+        }
+
+
+class TestFakeElasticsearch:
+    """Exports against the fake server test cases."""
+
+    def test_client_api(self: Self, fake_es: FakeElasticsearch) -> None:
+        """The calls of esxport get the answers of a cluster."""
+        client = ElasticsearchClient(CliOptions({**self._settings(fake_es), "output_file": "unused.csv"}))
+
+        assert client.ping()
+        assert client.indices_exists(index="esxport-*")
+        assert not client.indices_exists(index="missing")
+        mapping = client.get_mapping(index=fake_es.cluster.index)
+        assert "message" in mapping[fake_es.cluster.index]["mappings"]["properties"]
+        docs = client.mget(index=fake_es.cluster.index, ids=["2", "1000"])
+        assert [doc["found"] for doc in docs] == [True, False]
+        response = client.search(index=fake_es.cluster.index, scroll="1m", size=100, body={})
+        client.clear_scroll(scroll_id=[response["_scroll_id"]])
+        with pytest.raises(ScrollExpiredError):
+            client.scroll(scroll="1m", scroll_id=response["_scroll_id"])
+
+    def test_stream_api(self: Self, fake_es: FakeElasticsearch) -> None:
+        """Streamed searches and scrolls go through the client transport and raise its exceptions."""
+        client = ElasticsearchClient(CliOptions({**self._settings(fake_es), "output_file": "unused.csv"}))
+
+        response = json.loads(b"".join(client.stream_search(fake_es.cluster.index, {"size": 5}, scroll="1m")))
+        assert len(response["hits"]["hits"]) == 5
+        client.clear_scroll(scroll_id=[response["_scroll_id"]])
+        with pytest.raises(ScrollExpiredError):
+            list(client.stream_scroll("1m", response["_scroll_id"]))
+
+    @pytest.mark.parametrize("options", [{}, {"stream": True}])
+    def test_export_csv(
+        self: Self,
+        fake_es: FakeElasticsearch,
+        exporter: Exporter,
+        tmp_path: Path,
+        options: dict[str, Any],
+    ) -> None:
+        """Every document is exported in order and every scroll is cleared."""
+        output_file = tmp_path / "fake.csv"
+
+        exporter(fake_es, output_file, **options).export()
+
+        with output_file.open(encoding="utf-8") as file:
+            assert [int(row["id"]) for row in csv.DictReader(file)] == list(range(fake_es.cluster.documents))
+        assert fake_es.cluster.scrolls == {}
+
+    def test_export_ndjson(self: Self, fake_es: FakeElasticsearch, exporter: Exporter, tmp_path: Path) -> None:
+        """Passthrough exports write the generated sources."""
+        output_file = tmp_path / "fake.ndjson"
+
+        exporter(fake_es, output_file, export_format="ndjson", max_results=100).export()
+
+        lines = output_file.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [fake_es.cluster.source(position) for position in range(100)]
+
+    def test_missing_index(self: Self, fake_es: FakeElasticsearch, exporter: Exporter, tmp_path: Path) -> None:
+        """Indexes other than the fake one do not exist."""
+        with pytest.raises(IndexNotFoundError):
+            exporter(fake_es, tmp_path / "fake.csv", index_prefixes=["missing"]).export()
+
+    def test_cli(self: Self) -> None:
+        """The fake-es command documents its options."""
+        result = CliRunner().invoke(cli, ["fake-es", "--help"])
+
+        assert result.exit_code == 0
+        assert "--document-size" in result.output
+
+    @staticmethod
+    def _settings(server: FakeElasticsearch) -> dict[str, Any]:
+        return {
+            "query": {"query": {"match_all": {}}},
+            "index_prefixes": [server.cluster.index],
+            "url": server.url,
+            "password": "password",
+        }
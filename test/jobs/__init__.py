@@ -0,0 +1 @@
+"""Job runner test cases."""
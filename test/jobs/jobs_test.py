@@ -0,0 +1,154 @@
+"""Job runner test cases."""
+
+from __future__ import annotations
+
+import inspect
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock, patch
+
+import pytest
+import yaml
+from elasticsearch import ApiError
+from elasticsearch.exceptions import ConnectionError as ESConnectionError
+
+from esxport.cli import cli
+from esxport.esxport import EsXport
+from esxport.exceptions import ConfigurationError, JobFileError, NoDataFoundError
+from esxport.jobs import JobResult, JobRunner, format_report
+
+if TYPE_CHECKING:
+    from click.testing import CliRunner
+    from typing_extensions import Self
+
+
+def write_job_file(file_name: str, config: dict[str, Any]) -> str:
+    """Write a job file."""
+    Path(file_name).write_text(yaml.safe_dump(config), encoding="utf-8")
+    return file_name
+
+
+def job_config(*outputs: str) -> dict[str, Any]:
+    """Build a job file with one job per output file."""
+    return {
+        "defaults": {"password": "password", "query": {"query": {"match_all": {}}}, "index_prefixes": "index1"},
+        "concurrency": 2,
+        "jobs": [{"name": output, "output_file": output, "sort": ["ts:asc"]} for output in outputs],
+    }
+
+
+class TestJobRunner:
+    """Job runner test cases."""
+
+    def test_jobs_are_loaded_with_defaults(self: Self) -> None:
+        """Defaults are merged into every job."""
+        job_file = write_job_file(f"{inspect.stack()[0].function}.yaml", job_config("a.csv", "b.csv"))
+        runner = JobRunner.from_file(job_file, retries=1)
+
+        assert [name for name, _ in runner.jobs] == ["a.csv", "b.csv"]
+        opts = runner.jobs[0][1]
+        assert opts.index_prefixes == ["index1"]
+        assert opts.sort == [{"ts": "asc"}]
+        assert runner.concurrency == 2
+        assert runner.retries == 1
+        Path(job_file).unlink()
+
+    @pytest.mark.parametrize(
+        "config",
+        [
+            {"jobs": [{"output_file": "a.csv"}]},
+            job_config("a.csv", "a.csv"),
+            {"no_jobs": []},
+            ["not", "a", "mapping"],
+        ],
+    )
+    def test_invalid_job_file(self: Self, config: Any) -> None:
+        """Incomplete jobs, duplicated outputs and malformed files are rejected."""
+        job_file = write_job_file(f"{inspect.stack()[0].function}.yaml", config)
+        with pytest.raises(JobFileError):
+            JobRunner.from_file(job_file)
+        Path(job_file).unlink()
+
+    def test_jobs_share_client(self: Self) -> None:
+        """Jobs against the same cluster reuse one client."""
+        job_file = write_job_file(f"{inspect.stack()[0].function}.yaml", job_config("a.csv", "b.csv"))
+        runner = JobRunner.from_file(job_file)
+        with patch("esxport.elastic.ElasticsearchClient") as client:
+            assert runner.clients.get(runner.jobs[0][1]) is runner.clients.get(runner.jobs[1][1])
+            client.assert_called_once()
+        Path(job_file).unlink()
+
+    def test_failed_jobs_are_retried(self: Self, mocker: Mock) -> None:
+        """A failing job is retried and does not stop the other jobs."""
+        job_file = write_job_file(f"{inspect.stack()[0].function}.yaml", job_config("a.csv", "b.csv", "c.csv"))
+        runner = JobRunner.from_file(job_file, retries=1)
+        outcomes: dict[str, list[Exception | int]] = {
+            "a.csv": [ESConnectionError("down"), 5],
+            "b.csv": [NoDataFoundError("empty")],
+            "c.csv": [ApiError("unavailable", meta=Mock(status=503), body={}), 7],
+        }
+
+        def export(opts: Any) -> int:
+            outcome = outcomes[opts.output_file].pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return int(outcome)
+
+        mocker.patch.object(runner, "_export", side_effect=export)
+        mocker.patch("tenacity.nap.time.sleep")
+
+        results = {result.name: result for result in runner.run()}
+
+        assert (results["a.csv"].status, results["a.csv"].docs, results["a.csv"].attempts) == ("ok", 5, 2)
+        assert (results["b.csv"].status, results["b.csv"].attempts) == ("empty", 1)
+        assert (results["c.csv"].docs, results["c.csv"].attempts) == (7, 2)
+        Path(job_file).unlink()
+
+    def test_deterministic_failures_are_not_retried(self: Self, mocker: Mock) -> None:
+        """Errors which would fail the next attempt the same way are reported after the first attempt."""
+        job_file = write_job_file(f"{inspect.stack()[0].function}.yaml", job_config("a.csv", "b.csv"))
+        runner = JobRunner.from_file(job_file, retries=3)
+        errors = {
+            "a.csv": ConfigurationError("bad options"),
+            "b.csv": ApiError("bad query", meta=Mock(status=400), body={}),
+        }
+
+        def export(opts: Any) -> int:
+            raise errors[opts.output_file]
+
+        attempts = mocker.patch.object(runner, "_export", side_effect=export)
+
+        results = runner.run()
+
+        assert [(result.status, result.attempts) for result in results] == [("failed", 1), ("failed", 1)]
+        assert attempts.call_count == 2
+        Path(job_file).unlink()
+
+    def test_jobs_clear_only_their_scrolls(self: Self, mocker: Mock) -> None:
+        """A finished job clears its own scrolls, the jobs still running on the cluster keep theirs."""
+        job_file = write_job_file(f"{inspect.stack()[0].function}.yaml", job_config("a.csv", "b.csv"))
+        runner = JobRunner.from_file(job_file)
+        client = mocker.Mock()
+        first, second = (EsXport(opts, client) for _, opts in runner.jobs)
+        first.scroll_ids, second.scroll_ids = {"a"}, {"b"}
+
+        first._clean_scroll_ids()
+
+        client.clear_scroll.assert_called_once_with(scroll_id=["a"])
+        assert (first.scroll_ids, second.scroll_ids) == (set(), {"b"})
+        Path(job_file).unlink()
+
+    def test_report(self: Self) -> None:
+        """The report has a row per job with its throughput."""
+        report = format_report([JobResult("logs", "ok", docs=100, seconds=4, attempts=1)]).splitlines()
+        assert len(report) == 2
+        assert report[1].split() == ["logs", "ok", "1", "100", "4.0", "25.0"]
+
+    def test_run_jobs_command_fails_on_failed_job(self: Self, cli_runner: CliRunner) -> None:
+        """The command exits non-zero when a job failed."""
+        job_file = write_job_file(f"{inspect.stack()[0].function}.yaml", job_config("a.csv"))
+        with patch.object(JobRunner, "_export", side_effect=ValueError("boom")):
+            result = cli_runner.invoke(cli, ["run-jobs", job_file], catch_exceptions=False)
+        assert result.exit_code == 1
+        assert "failed" in result.output
+        Path(job_file).unlink()
@@ -0,0 +1 @@
+"""Memory budget test cases."""
@@ -0,0 +1,92 @@
+"""Memory budget test cases."""
+
+from __future__ import annotations
+
+import inspect
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+from unittest.mock import patch
+
+import pytest
+
+from esxport.constant import FLUSH_BUFFER, MEMORY_OVERHEAD, MEMORY_SAMPLE_SIZE, PROCESS_CHUNK_SIZE
+from esxport.memory import MemoryBudget, parse_size
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from unittest.mock import MagicMock
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+class TestParseSize:
+    """Size parsing test cases."""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [("1000", 1000), ("4k", 4096), ("512M", 512 * 1024**2), ("2GiB", 2 * 1024**3), (" 1 tb ", 1024**4), (7, 7)],
+    )
+    def test_sizes(self: Self, value: str | int, expected: int) -> None:
+        """Units are powers of 1024 with optional i and B."""
+        assert parse_size(value) == expected
+
+    def test_invalid_size(self: Self) -> None:
+        """Anything else is rejected."""
+        with pytest.raises(ValueError, match="Invalid size"):
+            parse_size("lots")
+
+
+class TestMemoryBudget:
+    """Memory budget test cases."""
+
+    def test_unbounded(self: Self) -> None:
+        """Without a limit every size is left as configured."""
+        budget = MemoryBudget(0)
+        budget.observe(10, 10 * 1024**2)
+
+        assert not budget
+        assert budget.page_size(5000) == 5000
+        assert budget.flush_size(FLUSH_BUFFER) == FLUSH_BUFFER
+        assert budget.chunk_size(4) == PROCESS_CHUNK_SIZE
+
+    def test_sizes_follow_documents(self: Self) -> None:
+        """Sizes shrink as larger documents are observed, never below one document."""
+        budget = MemoryBudget(100 * 1024**2)
+        assert budget.page_size(5000) == 5000
+
+        budget.observe(10, 10 * 1024)
+        assert budget.document_size == 1024 * MEMORY_OVERHEAD
+        assert budget.page_size(50000) == 50 * 1024**2 // (1024 * MEMORY_OVERHEAD)
+        assert budget.page_size(50000, in_flight=4) == 50 * 1024**2 // 4 // (1024 * MEMORY_OVERHEAD)
+        assert budget.flush_size(FLUSH_BUFFER) == FLUSH_BUFFER
+
+        budget.observe(10, 1000 * 1024**2)
+        assert budget.page_size(50000) == 1
+        assert budget.flush_size(FLUSH_BUFFER) == 1
+
+    def test_chunk_size(self: Self) -> None:
+        """Writer chunks of all processes fit in the writer share."""
+        budget = MemoryBudget(80 * 1024**2)
+        assert budget.chunk_size(2) == 20 * 1024**2 // (4 * MEMORY_OVERHEAD)
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestBoundedExport:
+    """Export under a memory limit test cases."""
+
+    def test_page_size_is_sampled(self: Self, _: Any, esxport_obj_with_data: EsXport) -> None:
+        """A sample of the documents lowers the page size to what fits in the budget."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.scroll_size = 10000
+        esxport_obj_with_data.opts.max_memory = 64 * 1024
+
+        esxport_obj_with_data.export()
+
+        sample, search = cast("MagicMock", esxport_obj_with_data.es_client.search).call_args_list[:2]
+        assert sample.kwargs["size"] == MEMORY_SAMPLE_SIZE
+        assert 1 <= search.kwargs["size"] < 10000
+        assert Path(out_file).exists()
+        TestExport.rm_csv_export_file(out_file)
@@ -0,0 +1 @@
+"""Metrics file test cases."""
@@ -0,0 +1,94 @@
+"""Metrics file test cases."""
+
+from __future__ import annotations
+
+import inspect
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import Mock, patch
+
+import pytest
+from elasticsearch import ApiError
+
+from esxport.exceptions import ScrollExpiredError
+from esxport.metrics import MetricsFile, render
+from esxport.stats import ExportStats
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+def samples(text: str) -> dict[str, float]:
+    """Samples of a rendered metrics file by name and labels."""
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if line and not line.startswith("#")
+    }
+
+
+class TestRender:
+    """Rendering test cases."""
+
+    def test_counters_and_histogram(self: Self) -> None:
+        """Counters, errors and a cumulative latency histogram per request kind."""
+        stats = ExportStats()
+        stats.observe(5, 500)
+        stats.requests["scroll"] = [0.01, 0.3, 100.0]
+        with pytest.raises(ScrollExpiredError), stats.request("scroll"):
+            raise ScrollExpiredError
+        throttled = ApiError("throttled", meta=Mock(status=429), body={})
+        with pytest.raises(ApiError), stats.request("search"):
+            raise throttled
+
+        metrics = samples(render(stats, {"output": 'a "b".csv'}))
+
+        labels = '{output="a \\"b\\".csv"}'
+        assert metrics[f"esxport_documents_total{labels}"] == 5
+        assert metrics[f"esxport_fetched_bytes_total{labels}"] == 500
+        assert metrics[f"esxport_scroll_expired_total{labels}"] == 1
+        assert metrics[f"esxport_throttled_total{labels}"] == 1
+        scroll = 'output="a \\"b\\".csv",request="scroll"'
+        assert metrics[f'esxport_request_duration_seconds_bucket{{{scroll},le="0.05"}}'] == 2
+        assert metrics[f'esxport_request_duration_seconds_bucket{{{scroll},le="0.5"}}'] == 3
+        assert metrics[f'esxport_request_duration_seconds_bucket{{{scroll},le="+Inf"}}'] == 4
+        assert metrics[f"esxport_request_duration_seconds_count{{{scroll}}}"] == 4
+        assert f"esxport_success{labels}" not in metrics
+
+
+class TestMetricsFile:
+    """Metrics file test cases."""
+
+    def test_outcome_is_written(self: Self, tmp_path: Path) -> None:
+        """The file exists while the export runs and records whether it failed."""
+        file_name = str(tmp_path / "esxport.prom")
+        metrics_file = MetricsFile(file_name, ExportStats(), {"output": "x"})
+        metrics_file.__enter__()
+        assert Path(file_name).exists()
+        metrics_file.__exit__(RuntimeError, RuntimeError(), None)
+
+        assert samples(Path(file_name).read_text(encoding="utf-8"))['esxport_success{output="x"}'] == 0
+        assert list(tmp_path.iterdir()) == [Path(file_name)]
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestMetricsExport:
+    """Metrics of an export test cases."""
+
+    def test_metrics_file(self: Self, _: Any, esxport_obj_with_data: EsXport, tmp_path: Path) -> None:
+        """A successful export leaves its documents and success in the metrics file."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        metrics_file = tmp_path / "esxport.prom"
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.metrics_file = str(metrics_file)
+
+        esxport_obj_with_data.export()
+
+        metrics = samples(metrics_file.read_text(encoding="utf-8"))
+        labels = f'{{output="{out_file}"}}'
+        assert metrics[f"esxport_documents_total{labels}"] == esxport_obj_with_data.rows_written
+        assert metrics[f"esxport_success{labels}"] == 1
+        TestExport.rm_csv_export_file(out_file)
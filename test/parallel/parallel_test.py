@@ -0,0 +1,58 @@
+"""Worker process helpers test cases."""
+
+from __future__ import annotations
+
+import inspect
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from esxport.parallel import START_METHOD, chunk_headers, ordered_map, read_line_chunks
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from unittest.mock import Mock
+
+    from esxport.esxport import EsXport
+
+
+def test_read_line_chunks() -> None:
+    """Chunks end on line boundaries and stop at the line limit."""
+    file_name = f"{inspect.stack()[0].function}.ndjson"
+    Path(file_name).write_bytes(b"".join(b'{"n": %d}\n' % i for i in range(10)))
+
+    chunks = list(read_line_chunks(file_name, limit=7, chunk_size=20))
+
+    assert all(line.endswith(b"\n") for chunk in chunks for line in chunk)
+    assert [json.loads(line)["n"] for chunk in chunks for line in chunk] == list(range(7))
+    assert len(chunks) > 1
+    Path(file_name).unlink()
+
+
+def test_ordered_map_keeps_chunk_order() -> None:
+    """Results come back in the order the chunks were read."""
+    chunks = [[b'{"a": 1}\n'], [b'{"b": 1, "a": 2}\n'], [b"\n", b'{"c": 1}\n']] * 5
+    assert list(ordered_map(2, chunk_headers, chunks)) == [["a"], ["b", "a"], ["c"]] * 5
+
+
+def test_workers_are_not_forked(mocker: Mock) -> None:
+    """Workers start from a fresh interpreter rather than a fork of the threaded export."""
+    pool = mocker.patch("esxport.parallel.ProcessPoolExecutor", wraps=ProcessPoolExecutor)
+    assert list(ordered_map(1, chunk_headers, [[b'{"a": 1}\n']])) == [["a"]]
+    assert pool.call_args.kwargs["mp_context"].get_start_method() == START_METHOD != "fork"
+
+
+def test_extract_headers_with_processes(esxport_obj: EsXport) -> None:
+    """Headers found by worker processes keep their order of first appearance."""
+    esxport_obj.opts.output_file = f"{inspect.stack()[0].function}.csv"
+    documents = [{"a": 1}, {"b": 2, "a": 3}, {"c": 4}]
+    Path(f"{esxport_obj.opts.output_file}.tmp").write_text(
+        "".join(f"{json.dumps(document)}\n" for document in documents),
+        encoding="utf-8",
+    )
+    expected = esxport_obj._extract_headers()
+    esxport_obj.opts.processes = 2
+
+    assert esxport_obj._extract_headers() == expected == ["a", "b", "c"]
+    TestExport.rm_export_file(esxport_obj.opts.output_file)
@@ -0,0 +1 @@
+"""Profiling test cases."""
@@ -0,0 +1,78 @@
+"""Profiling test cases."""
+
+from __future__ import annotations
+
+import pstats
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+from esxport.profiling import profile
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+def allocate() -> list[bytes]:
+    """Allocate something worth reporting."""
+    return [bytes(1024) for _ in range(1000)]
+
+
+class TestProfile:
+    """Profile test cases."""
+
+    def test_cpu(self: Self, tmp_path: Path) -> None:
+        """The cProfile stats and a report of the top functions are written."""
+        prefix = str(tmp_path / "out.csv")
+        with profile("cpu", prefix):
+            allocate()
+
+        assert any(function[2] == "allocate" for function in pstats.Stats(f"{prefix}.pstats").stats)  # type: ignore[attr-defined]
+        assert "allocate" in Path(f"{prefix}.profile.txt").read_text(encoding="utf-8")
+
+    def test_cpu_covers_threads(self: Self, tmp_path: Path) -> None:
+        """Functions run by threads started while profiling are in the stats, as the slices of ``--pit`` are."""
+        prefix = str(tmp_path / "out.csv")
+        with profile("cpu", prefix), ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda _: allocate(), range(2)))
+
+        assert any(function[2] == "allocate" for function in pstats.Stats(f"{prefix}.pstats").stats)  # type: ignore[attr-defined]
+
+    def test_memory(self: Self, tmp_path: Path) -> None:
+        """The tracemalloc snapshot and a report of the top allocating lines are written."""
+        prefix = str(tmp_path / "out.csv")
+        with profile("memory", prefix):
+            kept = allocate()
+
+        assert kept
+        assert not tracemalloc.is_tracing()
+        assert tracemalloc.Snapshot.load(f"{prefix}.tracemalloc").traces
+        report = Path(f"{prefix}.memory.txt").read_text(encoding="utf-8")
+        assert report.startswith("Peak traced memory")
+        assert "profiling_test.py" in report
+
+    def test_no_profile(self: Self, tmp_path: Path) -> None:
+        """Nothing is written without a mode."""
+        with profile("", str(tmp_path / "out.csv")):
+            allocate()
+        assert list(tmp_path.iterdir()) == []
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestProfiledExport:
+    """Profiled export test cases."""
+
+    def test_hot_paths_are_profiled(self: Self, _: Any, esxport_obj_with_data: EsXport, tmp_path: Path) -> None:
+        """The CPU profile of an export covers its temp file and write paths."""
+        out_file = str(tmp_path / "out.csv")
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.profile = "cpu"
+
+        esxport_obj_with_data.export()
+
+        functions = {function[2] for function in pstats.Stats(f"{out_file}.pstats").stats}  # type: ignore[attr-defined]
+        assert {"_write_to_temp_file", "_write_to_csv"} <= functions
@@ -0,0 +1 @@
+"""Export server test cases."""
@@ -0,0 +1,177 @@
+"""Export server test cases."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from esxport.esxport import EsXport
+from esxport.exceptions import ExportCancelledError, JobFileError
+from esxport.server import CANCELLED, DONE, FAILED, ExportServer, ExportService
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from typing_extensions import Self
+
+settings: dict[str, Any] = {
+    "query": {"query": {"match_all": {}}},
+    "output_file": "served.csv",
+    "index_prefixes": ["index1"],
+    "url": "http://localhost:9200",
+    "password": "password",
+}
+
+
+def fake_export(exporter: EsXport) -> None:
+    """Pretend to export five documents."""
+    exporter.rows_written = 5
+
+
+def blocking_export(exporter: EsXport) -> None:
+    """Run until cancelled."""
+    exporter.cancelled.wait(5)
+    raise ExportCancelledError(exporter.opts.output_file)
+
+
+@pytest.fixture
+def service() -> Iterator[ExportService]:
+    """Export service with two workers."""
+    export_service = ExportService(workers=2)
+    yield export_service
+    export_service.shutdown()
+
+
+def request(server: ExportServer, method: str, path: str, body: Any = None) -> tuple[int, Any]:
+    """Call the server API."""
+    host, port = str(server.server_address[0]), server.server_address[1]
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urlopen(Request(f"http://{host}:{port}{path}", data=data, method=method)) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestExportService:
+    """Export service test cases."""
+
+    def test_submit_and_poll(self: Self, service: ExportService) -> None:
+        """A finished task reports its progress and throughput."""
+        with patch.object(EsXport, "export", autospec=True, side_effect=fake_export):
+            task = service.submit(dict(settings))
+            assert task.future is not None
+            task.future.result()
+
+        progress = service.get(task.id).to_dict()
+        assert progress["status"] == DONE
+        assert progress["docs"] == 5
+        assert progress["output_file"] == "served.csv"
+
+    def test_failed_task(self: Self, service: ExportService) -> None:
+        """A failed export is reported with its error."""
+        with patch.object(EsXport, "export", autospec=True, side_effect=ValueError("boom")):
+            task = service.submit(dict(settings))
+            assert task.future is not None
+            task.future.result()
+        assert (task.status, task.error) == (FAILED, "boom")
+
+    def test_cancel_running_task(self: Self, service: ExportService) -> None:
+        """A running export stops once cancelled."""
+        with patch.object(EsXport, "export", autospec=True, side_effect=blocking_export):
+            task = service.submit(dict(settings))
+            service.cancel(task.id)
+            assert task.future is not None
+            task.future.result()
+        assert task.status == CANCELLED
+
+    def test_output_file_in_use(self: Self, service: ExportService) -> None:
+        """Two running exports can not write the same file."""
+        with patch.object(EsXport, "export", autospec=True, side_effect=blocking_export):
+            task = service.submit(dict(settings))
+            with pytest.raises(JobFileError):
+                service.submit(dict(settings))
+            service.cancel(task.id)
+
+    def test_finished_tasks_expire(self: Self) -> None:
+        """Finished tasks are dropped after the ttl, running ones are kept."""
+        export_service = ExportService(workers=2, task_ttl=60)
+        with patch.object(EsXport, "export", autospec=True, side_effect=blocking_export):
+            running = export_service.submit(dict(settings))
+        with patch.object(EsXport, "export", autospec=True, side_effect=fake_export):
+            finished = export_service.submit({**settings, "output_file": "other.csv"})
+            assert finished.future is not None
+            finished.future.result()
+
+        finished.finished = time.time() - 61
+        assert export_service.list_tasks() == [running]
+        with pytest.raises(KeyError):
+            export_service.get(finished.id)
+        export_service.shutdown()
+
+    def test_finished_tasks_are_capped(self: Self) -> None:
+        """Only the latest finished tasks are kept."""
+        export_service = ExportService(workers=1, max_finished=2)
+        with patch.object(EsXport, "export", autospec=True, side_effect=fake_export):
+            tasks = [export_service.submit({**settings, "output_file": f"{name}.csv"}) for name in "abc"]
+            for position, task in enumerate(tasks):
+                assert task.future is not None
+                task.future.result()
+                task.finished = time.time() - len(tasks) + position
+
+        assert export_service.list_tasks() == tasks[1:]
+        export_service.shutdown()
+
+    def test_tasks_share_clients(self: Self, service: ExportService) -> None:
+        """Exports against one cluster reuse the same client."""
+        with patch.object(EsXport, "export", autospec=True, side_effect=fake_export):
+            first = service.submit(dict(settings))
+            second = service.submit({**settings, "output_file": "other.csv"})
+        assert first.exporter.es_client is second.exporter.es_client
+
+
+class TestExportServer:
+    """HTTP API test cases."""
+
+    @pytest.fixture
+    def server(self: Self, service: ExportService) -> Iterator[ExportServer]:
+        """Serve on a random local port."""
+        export_server = ExportServer(("127.0.0.1", 0), service)
+        thread = threading.Thread(target=export_server.serve_forever, daemon=True)
+        thread.start()
+        yield export_server
+        export_server.shutdown()
+        export_server.server_close()
+
+    def test_submit_poll_cancel(self: Self, server: ExportServer) -> None:
+        """Exports are submitted, listed, polled and cancelled over HTTP."""
+        with patch.object(EsXport, "export", autospec=True, side_effect=blocking_export):
+            status, task = request(server, "POST", "/exports", settings)
+            assert status == 202
+            assert request(server, "GET", "/exports")[1][0]["id"] == task["id"]
+            assert request(server, "GET", f"/exports/{task['id']}")[1]["output_file"] == "served.csv"
+            assert request(server, "DELETE", f"/exports/{task['id']}")[0] == 202
+            server.service.get(task["id"]).future.result()  # type: ignore[union-attr]
+        assert request(server, "GET", f"/exports/{task['id']}")[1]["status"] == CANCELLED
+
+    def test_errors(self: Self, server: ExportServer) -> None:
+        """Unknown exports, paths and invalid submissions are rejected."""
+        assert request(server, "GET", "/exports/unknown")[0] == 404
+        assert request(server, "DELETE", "/exports/unknown")[0] == 404
+        assert request(server, "GET", "/other")[0] == 404
+        assert request(server, "POST", "/exports", {"output_file": "x.csv"})[0] == 400
+
+    @pytest.mark.parametrize("body", [{**settings, "query": "{not json"}, {**settings, "query": 5}, ["served.csv"]])
+    def test_malformed_submissions(self: Self, server: ExportServer, body: Any) -> None:
+        """A query which is not a JSON object, or a body which is not a mapping, is a bad request."""
+        status, error = request(server, "POST", "/exports", body)
+        assert status == 400
+        assert error["error"]
+        assert request(server, "GET", "/exports")[1] == []
@@ -0,0 +1 @@
+"""Export statistics test cases."""
@@ -0,0 +1,73 @@
+"""Export statistics test cases."""
+
+from __future__ import annotations
+
+import inspect
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+from esxport.stats import ExportStats, percentile
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+
+class TestExportStats:
+    """Export statistics test cases."""
+
+    def test_percentile(self: Self) -> None:
+        """Nearest-rank percentiles."""
+        samples = [float(value) for value in range(1, 101)]
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 99) == 99.0
+        assert percentile([3.0], 90) == 3.0
+        assert percentile([], 50) == 0.0
+
+    def test_report(self: Self) -> None:
+        """Phases, requests and throughput end up in the report."""
+        stats = ExportStats()
+        with stats.phase("flush"):
+            pass
+        with stats.phase("flush"):
+            pass
+        for _ in range(3):
+            with stats.request("scroll"):
+                pass
+
+        report = stats.report(documents=10, output_bytes=2048)
+
+        assert report["documents"] == 10
+        assert report["output_bytes"] == 2048
+        assert report["phases"]["flush"]["calls"] == 2
+        assert report["phases"]["search"]["calls"] == 3
+        assert report["requests"]["scroll"]["count"] == 3
+        assert set(report["requests"]["scroll"]) == {"count", "p50", "p90", "p99", "max"}
+        assert report["phases"]["other"]["seconds"] >= 0
+        assert report["docs_per_second"] > 0
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestStatsExport:
+    """Export statistics of an export test cases."""
+
+    def test_stats_json(self: Self, _: Any, esxport_obj_with_data: EsXport) -> None:
+        """The report of an export is written to ``--stats-json``."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        stats_file = f"{inspect.stack()[0].function}.json"
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.stats_json = stats_file
+
+        esxport_obj_with_data.export()
+
+        report = json.loads(Path(stats_file).read_text(encoding="utf-8"))
+        assert report["documents"] == esxport_obj_with_data.rows_written
+        assert report["output_bytes"] == Path(out_file).stat().st_size
+        assert {"preflight", "search", "flush", "headers", "write", "other"} <= set(report["phases"])
+        assert report["requests"]["search"]["count"] == 1
+        Path(stats_file).unlink()
+        TestExport.rm_csv_export_file(out_file)
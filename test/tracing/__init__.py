@@ -0,0 +1 @@
+"""Tracing test cases."""
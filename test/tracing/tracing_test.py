@@ -0,0 +1,72 @@
+"""Tracing test cases."""
+
+from __future__ import annotations
+
+import inspect
+import json
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from esxport.tracing import annotate, export_spans, span
+from test.esxport._export_test import TestExport
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from typing_extensions import Self
+
+    from esxport.esxport import EsXport
+
+pytest.importorskip("opentelemetry.sdk.trace", reason="OpenTelemetry SDK is not installed")
+
+
+def read_spans(file_name: Path) -> dict[str, dict[str, Any]]:
+    """Spans of a trace file by name, the last one wins."""
+    spans = [json.loads(line) for line in file_name.read_text(encoding="utf-8").splitlines()]
+    return {exported["name"]: exported for exported in spans}
+
+
+class TestSpans:
+    """Span test cases."""
+
+    def test_spans_are_exported(self: Self, tmp_path: Path) -> None:
+        """Spans started under ``export_spans`` are written as JSON lines with their attributes."""
+        trace_file = tmp_path / "trace.jsonl"
+        with export_spans(str(trace_file)), span("outer", {"a": 1}), span("inner") as inner:
+            annotate(inner, {"b": "x", "skipped": None})
+
+        spans = read_spans(trace_file)
+        assert spans["outer"]["attributes"] == {"a": 1}
+        assert spans["inner"]["attributes"] == {"b": "x"}
+        assert spans["inner"]["parent_id"] == spans["outer"]["context"]["span_id"]
+
+    def test_without_file(self: Self, tmp_path: Path) -> None:
+        """Nothing is exported without a file."""
+        with export_spans(""), span("outer"):
+            pass
+        assert list(tmp_path.iterdir()) == []
+
+
+@patch("esxport.esxport.EsXport._validate_fields")
+class TestTracedExport:
+    """Traced export test cases."""
+
+    def test_export_spans(self: Self, _: Any, esxport_obj_with_data: EsXport, tmp_path: Path) -> None:
+        """Phases and requests of an export are spans below the export span."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        trace_file = tmp_path / "trace.jsonl"
+        esxport_obj_with_data.opts.output_file = out_file
+        esxport_obj_with_data.opts.trace = str(trace_file)
+
+        esxport_obj_with_data.export()
+
+        spans = read_spans(trace_file)
+        export_id = spans["esxport.export"]["context"]["span_id"]
+        for name in ("esxport.preflight", "elasticsearch.search", "esxport.flush", "esxport.headers", "esxport.write"):
+            assert spans[name]["parent_id"] == export_id
+        search = spans["elasticsearch.search"]["attributes"]
+        assert search["db.system"] == "elasticsearch"
+        assert search["esxport.page_size"] == esxport_obj_with_data.opts.scroll_size
+        TestExport.rm_csv_export_file(out_file)
@@ -10,7 +10,7 @@ from typing import TYPE_CHECKING, Any
 
 from faker import Faker
 
-from esxport.writer import Writer
+from esxport.writer import Writer, WriterParams
 from test.esxport._export_test import TestExport
 
 if TYPE_CHECKING:
@@ -46,7 +46,7 @@ class TestWriter:
         """Test write_to_csv function."""
         out_file = f"{inspect.stack()[0].function}.csv"
         TestWriter.setup_data(out_file)
-        kwargs = {"delimiter": ","}
+        kwargs: WriterParams = {"delimiter": ","}
         Writer.write(self.no_of_records, out_file, self.csv_header, **kwargs)
         assert Path(out_file).exists(), "File does not exist"
         with Path(out_file).open() as file:
@@ -86,13 +86,27 @@ class TestWriter:
         TestExport.rm_csv_export_file(out_file)
         Path(f"{out_file}.tmp").unlink(missing_ok=True)
 
+    def test_append_to_csv(self: Self) -> None:
+        """Appended rows go below the existing header."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        for document in ({"age": 1, "name": "first"}, {"age": 2, "name": "second"}):
+            with Path(f"{out_file}.tmp").open(mode="w", encoding="utf-8") as tmp_file:
+                tmp_file.write(json.dumps(document))
+                tmp_file.write("\n")
+            Writer.write(1, out_file, self.csv_header, append=Path(out_file).exists())
+
+        with Path(out_file).open(encoding="utf-8") as file:
+            assert list(csv.reader(file)) == [self.csv_header, ["1", "first"], ["2", "second"]]
+
+        TestExport.rm_csv_export_file(out_file)
+
     def test_write_to_csv_with_nested_fields(self: Self) -> None:
-        """Nested dict/list values are serialized for CSV export."""
+        """Nested dict/list values are serialized for CSV export as ``json.dumps`` writes them."""
         out_file = f"{inspect.stack()[0].function}.csv"
         documents = [
             {
                 "message": "line, with comma",
-                "event": {"type": "log", "module": "system"},
+                "event": {"type": "log", "module": "système"},
                 "tags": ["filebeat", "nginx"],
             },
         ]
@@ -108,8 +122,51 @@ class TestWriter:
             rows = list(csv.DictReader(file))
 
         assert rows[0]["message"] == "line, with comma"
-        assert json.loads(rows[0]["event"]) == {"type": "log", "module": "system"}
-        assert json.loads(rows[0]["tags"]) == ["filebeat", "nginx"]
+        assert rows[0]["event"] == '{"type": "log", "module": "syst\\u00e8me"}'
+        assert rows[0]["tags"] == '["filebeat", "nginx"]'
 
         TestExport.rm_csv_export_file(out_file)
         Path(f"{out_file}.tmp").unlink(missing_ok=True)
+
+    def test_write_to_csv_with_processes(self: Self) -> None:
+        """Worker processes write the same file as the in-process writer, in order."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        headers = ["id", "message", "tags"]
+        documents = [{"id": i, "message": f"line {i}, with comma", "tags": ["a", str(i)]} for i in range(50)]
+        outputs = []
+        for processes in (0, 3):
+            with Path(f"{out_file}.tmp").open(mode="w", encoding="utf-8") as tmp_file:
+                tmp_file.writelines(f"{json.dumps(document)}\n" for document in documents)
+            Writer.write(40, out_file, headers, delimiter=",", processes=processes, chunk_size=256)
+            outputs.append(Path(out_file).read_bytes())
+
+        assert outputs[0] == outputs[1]
+        with Path(out_file).open(encoding="utf-8") as file:
+            assert [row["id"] for row in csv.DictReader(file)] == [str(i) for i in range(40)]
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_csv_rows(self: Self) -> None:
+        """Documents serialize to the rows the export writes below the header."""
+        out_file = f"{inspect.stack()[0].function}.csv"
+        headers = ["id", "message", "tags"]
+        documents: list[dict[str, Any]] = [{"id": 1, "message": "line, with comma", "tags": ["a"]}, {"id": 2}]
+        with Path(f"{out_file}.tmp").open(mode="w", encoding="utf-8") as tmp_file:
+            tmp_file.writelines(f"{json.dumps(document)}\n" for document in documents)
+        Writer.write(len(documents), out_file, headers, delimiter=";")
+
+        rows = Writer.csv_rows(documents, headers, ";")
+
+        assert rows == '1;line, with comma;"[""a""]"\r\n2;;\r\n'
+        assert Path(out_file).read_text(encoding="utf-8").split("\n", 1)[1] == rows.replace("\r\n", "\n")
+        TestExport.rm_csv_export_file(out_file)
+
+    def test_write_to_ndjson(self: Self) -> None:
+        """The temp file becomes the NDJSON output, later batches are appended."""
+        out_file = f"{inspect.stack()[0].function}.ndjson"
+        for document in ({"age": 1}, {"age": 2}):
+            Path(f"{out_file}.tmp").write_text(f"{json.dumps(document)}\n", encoding="utf-8")
+            Writer.write(1, out_file, [], output_format="ndjson", append=Path(out_file).exists())
+            assert not Path(f"{out_file}.tmp").exists()
+
+        assert Path(out_file).read_text(encoding="utf-8") == '{"age": 1}\n{"age": 2}\n'
+        TestExport.rm_csv_export_file(out_file)